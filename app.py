@@ -1,17 +1,33 @@
 from flask import Flask, request, render_template, jsonify, session, redirect, url_for, send_from_directory
 import json
 import os
+import atexit
 from datetime import datetime
 from dotenv import load_dotenv
-from config.settings import TARGET_AUDIENCES, MODEL_OPTIONS, CARE_AREAS, JOURNEY_STAGES, ARTICLE_CATEGORIES, FORMAT_TYPES, BUSINESS_CATEGORIES, CONSUMER_NEEDS, TONE_OF_VOICE
-from database.database_manager import DatabaseManager
+from config.settings import TARGET_AUDIENCES, MODEL_OPTIONS, CARE_AREAS, JOURNEY_STAGES, ARTICLE_CATEGORIES, FORMAT_TYPES, BUSINESS_CATEGORIES, CONSUMER_NEEDS, TONE_OF_VOICE, FORMAT_LLM_FALLBACK
+from config.settings import SCHEDULER_ENABLED, KEYWORD_REFRESH_INTERVAL, LLM_BACKENDS, CRAWLER_INTERVAL, CRAWLER_PROMPT_CHARS, BACKUP_INTERVAL
+from config.settings import ORPHAN_SWEEP_INTERVAL, DB_OPTIMIZE_INTERVAL, DB_VACUUM_INTERVAL, WAL_CHECKPOINT_INTERVAL
+from database.database_manager import DatabaseManager, VersionConflict
 from database.community_manager import CommunityClient
-from services.llm_service import query_llm_api
-from services.semrush_service import get_keyword_suggestions
-from services.community_service import get_care_area_details
+from database.backup_database import backup_database, backup_status
+from services.llm_service import query_llm_api, query_llm_json, get_rate_limiter, TitleOutline
+from services.llm_backends import LLMError
+from services.semrush_service import get_keyword_suggestions, INTENT_NAMES, semrush_limiter
+from services.semrush_usage import semrush_usage
+from services.keyword_research_service import bulk_research_jobs
+from services.keyword_refresh_service import refresh_keyword_metrics
+from services.keyword_cluster_service import keyword_cluster_index
+from services.keyword_coverage_service import keyword_coverage
+from services.scheduler import scheduler
+from services.db_maintenance import sweep_orphans, optimize_database, incremental_vacuum, checkpoint_wal, database_is_quiet, database_stats
+from services.community_service import get_care_area_details, get_site_content_text
+from services.community_crawler import community_crawler, crawl_all_communities
+from services.page_store import page_store
+from services.autosave_buffer import autosave_buffer
 from services.article_service import ArticleService
 from services.project_service import ProjectService
-from utils.json_cleaner import clean_json_response
+from utils.markdown_formatter import format_markdown, find_format_issues
+from utils.single_flight import SingleFlight, prompt_hash
 
 load_dotenv()  # Load environment variables from .env file
 
@@ -71,6 +87,31 @@ comm_manager = CommunityClient()
 project_service = ProjectService(db)
 article_service = ArticleService(db)
 
+# Autosaves are coalesced in memory and flushed in batches; reads see pending edits
+db.pending_writes = autosave_buffer
+autosave_buffer.start()
+atexit.register(autosave_buffer.close)
+
+# Identical generation requests (double-clicks, two open tabs) share one LLM call
+generation_flights = SingleFlight()
+
+# Crawled pages only notify when their text changed, so this logs real site updates
+page_store.subscribe(lambda page: app.logger.info(
+    f"Site content changed for community {page['community_id']}: {page['page_type']} ({page['url']})"
+))
+
+# Background jobs. Runs are claimed through the DB, so several workers won't double up.
+if SCHEDULER_ENABLED:
+    scheduler.add_job("keyword_refresh", KEYWORD_REFRESH_INTERVAL, refresh_keyword_metrics)
+    scheduler.add_job("community_crawl", CRAWLER_INTERVAL, lambda: crawl_all_communities(comm_manager))
+    scheduler.add_job("orphan_sweep", ORPHAN_SWEEP_INTERVAL, sweep_orphans)
+    scheduler.add_job("db_optimize", DB_OPTIMIZE_INTERVAL, optimize_database, run_if=database_is_quiet)
+    scheduler.add_job("db_incremental_vacuum", DB_VACUUM_INTERVAL, incremental_vacuum, run_if=database_is_quiet)
+    scheduler.add_job("wal_checkpoint", WAL_CHECKPOINT_INTERVAL, checkpoint_wal, run_if=database_is_quiet)
+    if BACKUP_INTERVAL > 0:
+        scheduler.add_job("db_backup", BACKUP_INTERVAL, backup_database)
+    scheduler.start()
+
 # Helper function to initialize session if needed
 def init_session():
     if 'selected_model' not in session:
@@ -108,7 +149,7 @@ def index():
         
         # Get all articles for the project
         try:
-            articles = db.get_all_articles_for_project(session['project_id'])
+            articles = db.get_all_articles_for_project(session['project_id'], include_content=False)
         except Exception as e:
             app.logger.error(f"Error fetching articles: {str(e)}")
             articles = []
@@ -224,11 +265,39 @@ def update_project():
     updated_id = db.update_project_state(project_id, project_data)
     return redirect(url_for('index'))
 
+@app.route('/projects/duplicate', methods=['POST'])
+def duplicate_project():
+    project_id = session.get('project_id')
+    if not project_id:
+        return jsonify({'error': 'No project selected'}), 400
+
+    try:
+        result = db.duplicate_project(
+            project_id,
+            name=request.form.get('project_name'),
+            changes_note=request.form.get('changes_note'),
+            include_community_articles=request.form.get('include_community_articles') == 'on',
+        )
+    except Exception as e:
+        app.logger.error(f"Error duplicating project {project_id}: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+    if result:
+        app.logger.info(
+            f"Duplicated project {project_id} as {result['project_id']}: {result['keywords']} keywords, "
+            f"{result['base_articles']} articles, {result['community_articles']} community articles"
+        )
+        session['project_id'] = result['project_id']
+        session['article_id'] = None
+        session['community_article_id'] = None
+    return redirect(url_for('index'))
+
 @app.route('/projects/delete', methods=['POST'])
 def delete_project():
     project_id = session.get('project_id')
     if project_id:
-        db.delete_project(project_id)
+        removed = db.delete_project(project_id)
+        app.logger.info(f"Deleted project {project_id}: {removed}")
         session['project_id'] = None
         session['article_id'] = None
     return redirect(url_for('index'))
@@ -258,9 +327,58 @@ def add_keyword():
     
     if keyword:
         db.add_keyword(project_id, keyword.strip(), search_volume, None, kw_difficulty)
-        return jsonify({'success': True})
+        # Warn when other projects already target a near-identical phrase
+        similar = keyword_cluster_index.similar(db, keyword.strip(), exclude_project_id=project_id)
+        return jsonify({'success': True, 'similar': similar[:10]})
     return jsonify({'error': 'No keyword provided'}), 400
 
+@app.route('/keywords/similar')
+def similar_keywords():
+    """Keywords in other projects that are near-duplicates of the given phrase."""
+    keyword = request.args.get('keyword', '').strip()
+    if not keyword:
+        return jsonify({'error': 'No keyword provided'}), 400
+    try:
+        similar = keyword_cluster_index.similar(db, keyword, exclude_project_id=session.get('project_id'))
+        return jsonify({'keyword': keyword, 'similar': similar[:25]})
+    except Exception as e:
+        app.logger.error(f"Error finding similar keywords: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/keywords/overlap')
+def keyword_overlap_report():
+    """Keyword clusters shared between projects (potential cannibalisation)."""
+    try:
+        return jsonify(keyword_cluster_index.overlap_report(db))
+    except Exception as e:
+        app.logger.error(f"Error building keyword overlap report: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+def form_version():
+    """The article version the editor loaded, if it sent one."""
+    version = request.form.get('version', '')
+    return int(version) if version.isdigit() else None
+
+def buffered_save(table, row_id, fields):
+    """
+    Editor save. Autosaves go to the write-behind buffer; explicit saves are written
+    immediately. Returns the article's new version.
+    """
+    if request.form.get('autosave') == '1':
+        return autosave_buffer.put(table, row_id, fields, form_version())
+    return autosave_buffer.save_now(table, row_id, fields, form_version())
+
+def version_conflict_response(e):
+    """409 telling the editor its copy is stale, so it can reload instead of overwriting."""
+    return jsonify({
+        'error': 'This article was changed in another tab or by another user since you loaded it.',
+        'conflict': True,
+        'current_version': e.current_version,
+    }), 409
+
+def project_keyword_list(project_id):
+    return [k['keyword'] for k in db.get_project_keywords(project_id)] if project_id else []
+
 @app.route('/keywords/delete', methods=['POST'])
 def delete_keyword():
     keyword_id = request.form.get('keyword_id')
@@ -280,9 +398,62 @@ def research_keywords():
         return jsonify({'error': 'No lookup type provided'}), 400
     
     debug_mode = session.get('debug_mode', False)
-    data = get_keyword_suggestions(keyword.strip(), debug_mode=debug_mode, lookup_type=lookup_type)
+    use_cache = request.form.get('refresh', 'false').lower() != 'true'
+    data = get_keyword_suggestions(keyword.strip(), debug_mode=debug_mode, lookup_type=lookup_type,
+                                   use_cache=use_cache, project_id=session.get('project_id'))
     return jsonify(data)
 
+@app.route('/keywords/bulk_research', methods=['POST'])
+def start_bulk_research():
+    """Start a background research job for many seed keywords at once."""
+    seeds_text = request.form.get('seeds', '')
+    seeds = [line.strip() for line in seeds_text.replace(',', '\n').split('\n') if line.strip()]
+    lookup_type = request.form.get('lookup_type', 'phrase_related')
+
+    try:
+        job_id = bulk_research_jobs.start(seeds, lookup_type=lookup_type, project_id=session.get('project_id'))
+        return jsonify({'job_id': job_id})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/keywords/bulk_research/<job_id>')
+def get_bulk_research(job_id):
+    job = bulk_research_jobs.get(job_id)
+    if not job:
+        return jsonify({'error': 'Research job not found'}), 404
+    return jsonify(job)
+
+@app.route('/keywords/bulk_add', methods=['POST'])
+def bulk_add_keywords():
+    """Add or refresh many keywords on the current project in one transaction."""
+    project_id = session.get('project_id')
+    if not project_id:
+        return jsonify({'error': 'No project selected'}), 400
+
+    payload = request.get_json(silent=True) or {}
+    selected = payload.get('keywords', [])
+    if not selected:
+        return jsonify({'error': 'No keywords provided'}), 400
+
+    keywords = []
+    for item in selected:
+        intents = item.get('In')
+        if isinstance(intents, list):
+            intents = ', '.join(INTENT_NAMES.get(i, str(i)) for i in intents)
+        keywords.append({
+            'keyword': item.get('Ph') or item.get('keyword'),
+            'search_volume': item.get('Nq', item.get('search_volume')),
+            'search_intent': intents or None,
+            'keyword_difficulty': item.get('Kd', item.get('keyword_difficulty')),
+        })
+
+    try:
+        counts = db.add_keywords(project_id, keywords)
+        return jsonify({'success': True, **counts})
+    except Exception as e:
+        app.logger.error(f"Error adding keywords: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 # Article Routes
 @app.route('/articles/select', methods=['POST'])
 def select_article():
@@ -340,7 +511,7 @@ def list_articles():
     print(project_id)
     
     try:
-        articles = db.get_all_articles_for_project(project_id)
+        articles = db.get_all_articles_for_project(project_id, include_content=False)
         
         # Format the articles for display
         formatted_articles = []
@@ -478,7 +649,11 @@ Return ONLY a JSON object with this structure:
     "article_outline": "H1/Title, H2, H3, etc.",
 }}
 """
-    response, token_usage, raw_response = query_llm_api(llm_model, full_article_prompt)
+    try:
+        outline, token_usage, raw_response = query_llm_json(llm_model, full_article_prompt, TitleOutline, task="title_outline")
+    except LLMError as e:
+        app.logger.error(f"Error generating title and outline: {str(e)}")
+        return jsonify({'error': str(e)}), e.http_status
     
     # Track token usage
     token_usage_history = session.get('token_usage_history', [])
@@ -491,40 +666,13 @@ Return ONLY a JSON object with this structure:
     # costs = calculate_token_costs(token_usage)
     costs = 1
     
-    # Parse response
-    try:
-        # First check if response_data is a string and try to parse it
-        response_data = clean_json_response(response)
-        
-        # Debug information
-        print("Type of response_data:", type(response_data))
-        print("Content of response_data:", response_data)
-        
-        # If response_data is a string, try to parse it as JSON
-        if isinstance(response_data, str):
-            try:
-                response_data = json.loads(response_data)
-            except json.JSONDecodeError:
-                raise ValueError("Failed to parse response as JSON")
-        
-        # Now access the fields
-        article_title = response_data.get("article_title", "")
-        article_outline = response_data.get("article_outline", "")
-        
-        if not article_title or not article_outline:
-            raise ValueError("Response missing required fields: article_title and article_outline")
-        
-        return jsonify({
-            'article_title': article_title,
-            'article_outline': article_outline,
-            'token_usage': token_usage,
-            'costs': costs,
-            'raw_response': raw_response if session.get('debug_mode') else None
-        })
-    except Exception as e:
-        print("Error parsing response:", str(e))
-        print("Raw response:", response)
-        return jsonify({'error': str(e)}), 500
+    return jsonify({
+        'article_title': outline.article_title,
+        'article_outline': outline.article_outline,
+        'token_usage': token_usage,
+        'costs': costs,
+        'raw_response': raw_response if session.get('debug_mode') else None
+    })
 
 @app.route('/articles/save_title_outline', methods=['POST'])
 def save_article_title_outline():
@@ -538,13 +686,16 @@ def save_article_title_outline():
     article_outline = request.form.get('article_outline', '')
 
     try:
-        saved_id = db.save_article_title_outline(
+        version = db.save_article_title_outline(
             article_title=article_title,
             article_outline=article_outline,
-            article_id=article_id
+            article_id=article_id,
+            expected_version=form_version()
         )
         
-        return jsonify({'success': True, 'article_id': saved_id})
+        return jsonify({'success': True, 'article_id': article_id, 'version': version})
+    except VersionConflict as e:
+        return version_conflict_response(e)
     except Exception as e:
         app.logger.error(f"Error saving article title and outline: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -561,12 +712,13 @@ def save_article_post_content():
     article_content = request.form.get('article_content', '')
     
     try:
-        saved_id = db.save_article_post_content(
-            article_content=article_content,
-            article_id=article_id
-        )
-        
-        return jsonify({'success': True, 'article_id': saved_id})
+        version = buffered_save('base_articles', article_id, {'article_content': article_content})
+        # Autosave goes through here, so editors see keyword coverage as they type
+        coverage = keyword_coverage.analyze(article_content, project_keyword_list(project_id))
+
+        return jsonify({'success': True, 'article_id': article_id, 'version': version, 'coverage': coverage})
+    except VersionConflict as e:
+        return version_conflict_response(e)
     except Exception as e:
         app.logger.error(f"Error saving article: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -575,9 +727,9 @@ def save_article_post_content():
 def delete_article():
     article_id = request.form.get('article_id') or session.get('article_id')
     if article_id:
-        db.delete_article_content(article_id)
+        removed = db.delete_article_content(article_id)
         session['article_id'] = None
-        return jsonify({'success': True})
+        return jsonify({'success': True, 'removed': removed})
     return jsonify({'error': 'No article ID provided'}), 400
 
 @app.route('/articles/generate_content', methods=['POST'])
@@ -646,7 +798,14 @@ ARTICLE SPECIFICATIONS:
 {context_msg}
 Return ONLY the article content text.
 """
-    response, token_usage, raw_response = query_llm_api(llm_model, full_article_prompt)
+    flight_key = ('generate_content', article_id, None, llm_model, prompt_hash(full_article_prompt))
+    try:
+        (response, token_usage, raw_response), coalesced = generation_flights.do(
+            flight_key, lambda: query_llm_api(llm_model, full_article_prompt, task="article_content")
+        )
+    except LLMError as e:
+        app.logger.error(f"Error generating article content: {str(e)}")
+        return jsonify({'error': str(e)}), e.http_status
 
     # Track token usage
     token_usage_history = session.get('token_usage_history', [])
@@ -665,6 +824,7 @@ Return ONLY the article content text.
         'article_content': response,
         'token_usage': token_usage,
         'costs': costs,
+        'coalesced': coalesced,
         'raw_response': raw_response if session.get('debug_mode') else None
     })
 
@@ -738,6 +898,15 @@ def generate_community_revision():
     
     # Get details for only the selected care areas
     care_area_details_text = get_care_area_details(comm_manager, int(community_id), selected_care_area_names)
+
+    # Use the crawled site content; if the community was never crawled, crawl it for next time
+    site_content_text = get_site_content_text(page_store, int(community_id), CRAWLER_PROMPT_CHARS)
+    if not site_content_text:
+        community_crawler.crawl_in_background([dict(community, id=int(community_id))])
+    site_content_section = f"""
+### **Current Website Content**
+Use these excerpts from the community's website to confirm details. Do not copy them verbatim.
+{site_content_text}""" if site_content_text else ""
     
     community_details_text = f"""
 ### **Community Name & Location:**
@@ -755,6 +924,7 @@ def generate_community_revision():
 
 ### **Care Areas & Pricing**
 {care_area_details_text}
+{site_content_section}
 
 ## **Special Requests & Additional Notes**
 - **Ensure all pricing, service, and amenity details are accurate** and match the provided details.
@@ -810,7 +980,15 @@ Current Article Title: {article_title}
 Current Article Content: {article_content}
 """
     
-    response, token_usage, raw_response = query_llm_api(session.get('selected_model'), revision_prompt)
+    llm_model = session.get('selected_model')
+    flight_key = ('community_revision', article_id, int(community_id), llm_model, prompt_hash(revision_prompt))
+    try:
+        (response, token_usage, raw_response), coalesced = generation_flights.do(
+            flight_key, lambda: query_llm_api(llm_model, revision_prompt, task="community_revision")
+        )
+    except LLMError as e:
+        app.logger.error(f"Error generating community revision: {str(e)}")
+        return jsonify({'error': str(e)}), e.http_status
     costs = 1
     
     print("Response:", response)
@@ -819,6 +997,7 @@ Current Article Content: {article_content}
         'article_content': response,
         'token_usage': token_usage,
         'costs': costs,
+        'coalesced': coalesced,
         'raw_response': raw_response if session.get('debug_mode') else None
     })
 
@@ -888,6 +1067,22 @@ def get_community_details(community_id):
     
     return jsonify(response_data)
     
+@app.route('/communities/<int:community_id>/crawl', methods=['POST'])
+def crawl_community(community_id):
+    """Refresh the stored website pages of a community in the background."""
+    try:
+        community = comm_manager.get_community(community_id)
+        started = community_crawler.crawl_in_background([dict(community, id=community_id)])
+        return jsonify({'success': True, 'started': started})
+    except Exception as e:
+        app.logger.error(f"Error starting community crawl: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/communities/<int:community_id>/pages')
+def get_community_pages(community_id):
+    """Crawled pages stored for a community, with their status and text."""
+    return jsonify(page_store.get_community_pages(community_id))
+
 @app.route('/community_articles/select', methods=['POST'])
 def select_community_article():
     community_article_id = request.form.get('community_article_id')
@@ -1017,17 +1212,57 @@ def save_community_article_content():
     article_title = request.form.get('article_title', '')
     
     try:
-        db.save_community_article_content(
-            community_article_id=community_article_id,
-            article_title=article_title,
-            article_content=article_content
-        )
-        
-        return jsonify({'success': True})
+        version = buffered_save('community_articles', community_article_id, {
+            'article_title': article_title,
+            'article_content': article_content,
+        })
+        coverage = keyword_coverage.analyze(article_content, project_keyword_list(session.get('project_id')))
+
+        return jsonify({'success': True, 'version': version, 'coverage': coverage})
+    except VersionConflict as e:
+        return version_conflict_response(e)
     except Exception as e:
         app.logger.error(f"Error saving community article: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/articles/keyword_coverage', methods=['POST'])
+def article_keyword_coverage():
+    """
+    Keyword coverage of the current base or community article.
+    Analyzes the posted content if given, otherwise the saved article.
+    """
+    project_id = session.get('project_id')
+    if not project_id:
+        return jsonify({'error': 'No project selected'}), 400
+
+    article_type = request.form.get('type', 'base')
+    content = request.form.get('content')
+    try:
+        if content is None:
+            if article_type == 'community':
+                article = db.get_community_article(session.get('community_article_id')) if session.get('community_article_id') else None
+            else:
+                article = db.get_article_content(session.get('article_id')) if session.get('article_id') else None
+            if not article:
+                return jsonify({'error': 'No article selected'}), 400
+            content = article['article_content'] or ''
+        return jsonify(keyword_coverage.analyze(content, project_keyword_list(project_id)))
+    except Exception as e:
+        app.logger.error(f"Error analyzing keyword coverage: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/projects/keyword_coverage')
+def project_keyword_coverage():
+    """Keyword coverage of every base and community article in the current project."""
+    project_id = session.get('project_id')
+    if not project_id:
+        return jsonify({'error': 'No project selected'}), 400
+    try:
+        return jsonify(keyword_coverage.analyze_project(db, project_id))
+    except Exception as e:
+        app.logger.error(f"Error building project keyword coverage: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/articles/refine', methods=['POST'])
 def refine_article():
     """Refine article content based on user instructions."""
@@ -1057,7 +1292,7 @@ Current content:
 
 Please return ONLY the refined article content, without any additional metadata, token information, or other text."""
         
-        refined_content, _, _ = query_llm_api(session.get('selected_model'), prompt)
+        refined_content, _, _ = query_llm_api(session.get('selected_model'), prompt, task="refine")
         
         # Clean up the response to ensure it only contains the article content
         refined_content = refined_content.strip()
@@ -1065,6 +1300,9 @@ Please return ONLY the refined article content, without any additional metadata,
         return jsonify({
             'refined_content': refined_content
         })
+    except LLMError as e:
+        app.logger.error(f"Error refining article: {str(e)}")
+        return jsonify({'error': str(e)}), e.http_status
     except Exception as e:
         app.logger.error(f"Error refining article: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -1082,23 +1320,58 @@ def fix_article_format():
         return jsonify({'error': 'No article content to fix'}), 400
     
     try:
-        # Get project details for context
-        project_id = session.get('project_id')
-        project_info = db.get_project(project_id)
-        
-        # Call LLM service to fix the format
-        fixed_content = query_llm_api(session.get('selected_model'), f"Fix the formatting of the following content: {current_content}\n\nFixed content:")
-        
-        # Get token usage if available
-        token_usage = query_llm_api(session.get('selected_model'), "How many tokens were used in the last query?")
-        
+        # Normalize locally; only fall back to the LLM for problems the formatter can't resolve
+        fixed_content = format_markdown(current_content)
+        issues = find_format_issues(fixed_content)
+        token_usage = None
+        used_llm = False
+
+        allow_llm = request.form.get('allow_llm', str(FORMAT_LLM_FALLBACK)).lower() in ('1', 'true', 'yes')
+        if issues and allow_llm:
+            prompt = f"""Fix only the following markdown problems in this article: {', '.join(issues)}.
+Do not change the wording. Return ONLY the corrected markdown.
+
+{fixed_content}"""
+            try:
+                llm_content, token_usage, _ = query_llm_api(session.get('selected_model'), prompt, task="format")
+                fixed_content = format_markdown(llm_content)
+                issues = find_format_issues(fixed_content)
+                used_llm = True
+            except LLMError as e:
+                # Keep the locally formatted content rather than failing the request
+                app.logger.error(f"LLM format fallback failed: {str(e)}")
+
         return jsonify({
-            'fixed_content': fixed_content
-            
+            'fixed_content': fixed_content,
+            'issues': issues,
+            'used_llm': used_llm,
+            'token_usage': token_usage
         })
     except Exception as e:
         app.logger.error(f"Error fixing article format: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+# Metrics
+@app.route('/metrics')
+def metrics():
+    """Operational metrics: SEMrush unit usage, rate limiter state, background jobs, crawl extraction cost, backups and database size."""
+    try:
+        return jsonify({
+            'semrush_usage': semrush_usage.summary(),
+            'rate_limits': {
+                'semrush': semrush_limiter.status(),
+                **{f'llm:{name}': get_rate_limiter(name).status() for name in LLM_BACKENDS},
+            },
+            'scheduler': scheduler.status(),
+            'in_flight_generations': generation_flights.in_flight(),
+            'page_extraction': community_crawler.extraction_stats(),
+            'autosave': autosave_buffer.status(),
+            'backups': backup_status(),
+            'database': database_stats(),
+        })
+    except Exception as e:
+        app.logger.error(f"Error collecting metrics: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 if __name__ == '__main__':
     app.run(debug=True, host="0.0.0.0", port=5000)
\ No newline at end of file
@@ -1,7 +1,11 @@
+import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Database
+DATABASE_PATH = os.getenv("GROVER_DB_PATH", "/data/grover.db")
+
 # Constants
 TARGET_AUDIENCES = ["Seniors", "Adult Children", "Caregivers", "Health Professionals", "Other"]
 
@@ -9,6 +13,77 @@ MODEL_OPTIONS = {
     "ChatGPT (o1)": "o1-mini"
 }
 
+# LLM providers. Any OpenAI-compatible server (including a local stand-in) can be added here.
+LLM_BACKENDS = {
+    "openai": {
+        "type": "openai_compatible",
+        "base_url": os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1"),
+        "api_key_env": "OPENAI_API_KEY",
+        "token_param": "max_completion_tokens",
+        "json_mode": True,  # honours response_format={"type": "json_object"}
+    },
+    "local": {
+        "type": "openai_compatible",
+        "base_url": os.getenv("LOCAL_LLM_BASE_URL", "http://localhost:8080/v1"),
+        "api_key_env": "LOCAL_LLM_API_KEY",
+        "token_param": "max_tokens",
+        "json_mode": os.getenv("LOCAL_LLM_JSON_MODE", "false").lower() == "true",
+    },
+}
+
+FAST_LLM_MODEL = os.getenv("FAST_LLM_MODEL", "gpt-4o-mini")
+
+# Per-task routing: backend, model, token limit and timeout (seconds).
+# Tasks marked "fast" always use their own model; the others use the model selected in the UI.
+# Tasks marked "json" ask the backend for a JSON object (when the backend supports it).
+LLM_TASK_ROUTES = {
+    "default": {"backend": "openai", "model": "o1-mini", "max_tokens": 20000, "timeout": 240, "fast": False},
+    "article_content": {"backend": "openai", "model": "o1-mini", "max_tokens": 20000, "timeout": 240, "fast": False},
+    "community_revision": {"backend": "openai", "model": "o1-mini", "max_tokens": 20000, "timeout": 240, "fast": False},
+    "refine": {"backend": "openai", "model": "o1-mini", "max_tokens": 16000, "timeout": 180, "fast": False},
+    "title_outline": {"backend": "openai", "model": FAST_LLM_MODEL, "max_tokens": 2000, "timeout": 60, "fast": True, "hedge": True, "json": True},
+    "meta": {"backend": "openai", "model": FAST_LLM_MODEL, "max_tokens": 500, "timeout": 30, "fast": True, "hedge": True, "json": True},
+    "format": {"backend": "openai", "model": FAST_LLM_MODEL, "max_tokens": 8000, "timeout": 90, "fast": True},
+}
+
+# Outbound limits per backend, shared by all worker processes through the local DB.
+# batch_reserve is the share of each limit that batch jobs leave free for interactive edits.
+LLM_RATE_LIMITS = {
+    "openai": {
+        "requests_per_minute": int(os.getenv("OPENAI_RPM_LIMIT", "500")),
+        "tokens_per_minute": int(os.getenv("OPENAI_TPM_LIMIT", "200000")),
+        "max_concurrency": int(os.getenv("OPENAI_MAX_CONCURRENCY", "8")),
+        "batch_reserve": 0.2,
+    },
+    "local": {
+        "requests_per_minute": 0,
+        "tokens_per_minute": 0,
+        "max_concurrency": int(os.getenv("LOCAL_LLM_MAX_CONCURRENCY", "2")),
+        "batch_reserve": 0.0,
+    },
+}
+LLM_MAX_RATE_LIMIT_WAIT = 120  # seconds a caller may queue before giving up
+
+# Retries for transient failures (429, 5xx, timeouts): exponential backoff with full jitter,
+# never sooner than the provider's Retry-After.
+LLM_RETRY = {
+    "max_attempts": int(os.getenv("LLM_RETRY_MAX_ATTEMPTS", "4")),
+    "base_delay": 1.0,
+    "max_delay": 30.0,
+}
+
+# Hedged requests: for interactive calls on routes with "hedge": True, send a second copy
+# once the first has been running longer than this latency percentile, and use whichever
+# finishes first.
+LLM_HEDGING = {
+    "enabled": os.getenv("LLM_HEDGING_ENABLED", "false").lower() in ("1", "true", "yes"),
+    "percentile": 95,
+    "min_samples": 20,
+}
+
+# Point every task at a single backend (e.g. "local") without editing the table above
+LLM_BACKEND_OVERRIDE = os.getenv("LLM_BACKEND_OVERRIDE", "")
+
 CARE_AREAS = [
     "Independent Living",
     "Assisted Living", 
@@ -36,4 +111,113 @@ TONE_OF_VOICE = ["Professional", "Friendly", "Conversational", "Empathetic", "Ot
 
 # Token costs
 INPUT_COST_PER_MILLION = 1.10
-OUTPUT_COST_PER_MILLION = 4.40 
\ No newline at end of file
+OUTPUT_COST_PER_MILLION = 4.40
+
+# SEMrush HTTP client
+SEMRUSH_TIMEOUT = (5, 30)  # (connect, read) seconds
+SEMRUSH_POOL_SIZE = int(os.getenv("SEMRUSH_POOL_SIZE", "8"))
+
+# SEMrush request limits (shared across worker processes) and bulk research concurrency
+SEMRUSH_RATE_LIMIT = {
+    "requests_per_minute": int(os.getenv("SEMRUSH_RPM_LIMIT", "600")),
+    "max_concurrency": int(os.getenv("SEMRUSH_MAX_CONCURRENCY", "6")),
+    "batch_reserve": 0.3,
+}
+SEMRUSH_BULK_CONCURRENCY = int(os.getenv("SEMRUSH_BULK_CONCURRENCY", "3"))
+SEMRUSH_BULK_MAX_SEEDS = 100
+
+# SEMrush API units charged per returned line, by report type
+SEMRUSH_UNIT_COSTS = {
+    "phrase_all": 10,
+    "phrase_these": 10,
+    "phrase_fullsearch": 20,
+    "phrase_related": 40,
+    "phrase_questions": 40,
+}
+SEMRUSH_DEFAULT_UNIT_COST = 40  # for report types not listed above
+
+# SEMrush unit budgets (0 = unlimited). As usage approaches a budget, research degrades:
+# past REDUCE_AT related lookups use the smaller display limit and forced refreshes are
+# served from cache; past CACHE_ONLY_AT only cached results are served.
+SEMRUSH_DAILY_UNIT_BUDGET = int(os.getenv("SEMRUSH_DAILY_UNIT_BUDGET", "0"))
+SEMRUSH_MONTHLY_UNIT_BUDGET = int(os.getenv("SEMRUSH_MONTHLY_UNIT_BUDGET", "0"))
+SEMRUSH_BUDGET_REDUCE_AT = 0.8
+SEMRUSH_BUDGET_CACHE_ONLY_AT = 0.95
+SEMRUSH_REDUCED_DISPLAY_LIMIT = 10
+
+# Background refresh of stored keyword metrics
+KEYWORD_REFRESH_INTERVAL = int(os.getenv("KEYWORD_REFRESH_INTERVAL", str(24 * 3600)))
+KEYWORD_REFRESH_STALE_DAYS = 30      # re-query metrics older than this
+KEYWORD_REFRESH_ACTIVE_DAYS = 30     # projects touched within this window are refreshed first
+KEYWORD_REFRESH_BATCH_SIZE = 100     # phrases per phrase_these call (SEMrush max is 100)
+KEYWORD_REFRESH_MAX_UNITS = int(os.getenv("KEYWORD_REFRESH_MAX_UNITS", "5000"))  # per run
+SEMRUSH_UNITS_PER_PHRASE_THESE_LINE = SEMRUSH_UNIT_COSTS["phrase_these"]
+
+# Cross-project keyword clustering (MinHash/LSH over normalised tokens). With 64 permutations
+# in 16 bands, pairs above ~0.5 similarity become candidates; THRESHOLD is the verified cut-off.
+KEYWORD_CLUSTER_NUM_PERM = 64
+KEYWORD_CLUSTER_BANDS = 16
+KEYWORD_CLUSTER_THRESHOLD = 0.6
+
+# Community website crawler
+CRAWLER_USER_AGENT = "GroverBot/1.0"
+CRAWLER_PAGE_FIELDS = ["about_page", "dining_page", "floor_plan_page", "gallery_page", "health_wellness_page"]
+CRAWLER_CONCURRENCY = int(os.getenv("CRAWLER_CONCURRENCY", "8"))  # hosts crawled in parallel
+CRAWLER_HOST_DELAY = 1.0              # minimum seconds between requests to the same host
+CRAWLER_TIMEOUT = (5, 15)             # (connect, read) seconds
+CRAWLER_MAX_BYTES = 2 * 1024 * 1024   # response bodies are truncated past this size
+CRAWLER_INTERVAL = int(os.getenv("CRAWLER_INTERVAL", str(7 * 24 * 3600)))
+CRAWLER_MAX_TEXT_CHARS = 100_000      # extracted text kept per page
+CRAWLER_EXTRACT_TIME_LIMIT = 2.0      # seconds of parsing per page before giving up on the rest
+CRAWLER_PROMPT_CHARS = 1500           # stored page text included per page in revision prompts
+
+# robots.txt is fetched at most once per host per TTL (shared across workers through the DB).
+# Unreachable or 5xx robots.txt means "disallow everything" until ROBOTS_ERROR_TTL passes.
+ROBOTS_CACHE_TTL = 24 * 3600
+ROBOTS_ERROR_TTL = 3600
+ROBOTS_MAX_BYTES = 512 * 1024
+ROBOTS_MAX_CRAWL_DELAY = 30.0         # ignore longer crawl-delays (cap, don't stall the crawler)
+
+# Article bodies at least this long are stored zlib-compressed (see utils/text_compression.py).
+# A shared dictionary is trained from existing articles once there are enough to learn from.
+ARTICLE_COMPRESS_MIN_CHARS = 512
+COMPRESSION_TRAIN_MIN_ARTICLES = 10
+COMPRESSION_TRAIN_SAMPLES = 500
+
+# Editor autosaves are buffered in memory and written in one transaction per interval (seconds)
+AUTOSAVE_FLUSH_INTERVAL = float(os.getenv("AUTOSAVE_FLUSH_INTERVAL", "2.0"))
+
+# Online backups (database/backup_database.py). The copy runs in steps of
+# BACKUP_PAGES_PER_STEP pages, pausing between steps so saves aren't held up.
+BACKUP_DIR = os.getenv("GROVER_BACKUP_DIR", os.path.join(os.path.dirname(DATABASE_PATH), "backups"))
+BACKUP_INTERVAL = int(os.getenv("BACKUP_INTERVAL", str(24 * 3600)))  # 0 disables scheduled backups
+BACKUP_KEEP = int(os.getenv("BACKUP_KEEP", "14"))
+BACKUP_PAGES_PER_STEP = 64            # 256KB at the default page size
+BACKUP_STEP_PAUSE = 0.005             # seconds between steps
+BACKUP_MAX_RESTARTS = 20              # concurrent writes restart the copy; then finish in one step
+
+# Deletes cascade through foreign keys; this job clears rows orphaned before they were enforced
+ORPHAN_SWEEP_INTERVAL = int(os.getenv("ORPHAN_SWEEP_INTERVAL", str(24 * 3600)))
+
+# SQLite file maintenance (services/db_maintenance.py). Vacuum and WAL checkpoints only run
+# once nothing has been written for MAINTENANCE_QUIET_SECONDS.
+DB_JOURNAL_MODE = os.getenv("GROVER_DB_JOURNAL_MODE", "wal")  # "delete" for filesystems without shared memory
+MAINTENANCE_QUIET_SECONDS = int(os.getenv("MAINTENANCE_QUIET_SECONDS", "120"))
+DB_OPTIMIZE_INTERVAL = int(os.getenv("DB_OPTIMIZE_INTERVAL", str(24 * 3600)))
+DB_VACUUM_INTERVAL = int(os.getenv("DB_VACUUM_INTERVAL", str(6 * 3600)))
+DB_VACUUM_MIN_FREE_PAGES = 256        # smaller free lists are kept for reuse
+DB_VACUUM_STEP_PAGES = 128            # pages released per incremental_vacuum call (one short write lock each)
+WAL_CHECKPOINT_INTERVAL = int(os.getenv("WAL_CHECKPOINT_INTERVAL", "600"))
+DB_STATS_TTL = 300                    # seconds the size report on /metrics is cached
+
+# Background scheduler (keyword refresh and other maintenance jobs)
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# SEMrush keyword research cache (seconds). Entries younger than the TTL are served as-is;
+# entries up to the stale TTL are served immediately and refreshed in the background.
+SEMRUSH_CACHE_TTL = int(os.getenv("SEMRUSH_CACHE_TTL", str(7 * 24 * 3600)))
+SEMRUSH_CACHE_STALE_TTL = int(os.getenv("SEMRUSH_CACHE_STALE_TTL", str(30 * 24 * 3600)))
+
+# Markdown formatting
+# When True, /articles/fix_format asks the LLM to fix issues the local formatter can't resolve
+FORMAT_LLM_FALLBACK = os.getenv("FORMAT_LLM_FALLBACK", "false").lower() in ("1", "true", "yes")
@@ -0,0 +1,260 @@
+import os
+import sys
+import gzip
+import time
+import shutil
+import hashlib
+import sqlite3
+import argparse
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import DATABASE_PATH, BACKUP_DIR, BACKUP_KEEP, BACKUP_PAGES_PER_STEP, BACKUP_STEP_PAUSE, BACKUP_MAX_RESTARTS
+
+SNAPSHOT_PREFIX = "grover-"
+SNAPSHOT_SUFFIX = ".db.gz"
+CHECKSUM_SUFFIX = ".sha256"
+CHUNK_BYTES = 1024 * 1024
+
+
+class BackupError(Exception):
+    """A snapshot could not be written, or failed verification."""
+
+
+class _Restarted(Exception):
+    pass
+
+
+def _copy_online(source_path, dest_path, pages=BACKUP_PAGES_PER_STEP, pause=BACKUP_STEP_PAUSE, max_restarts=BACKUP_MAX_RESTARTS):
+    """
+    Copy a live database with SQLite's backup API, `pages` pages per step.
+    The source is only read-locked during a step, and writers get `pause`
+    seconds between steps. A write from another connection makes SQLite
+    restart the copy; after `max_restarts` restarts the rest is copied in a
+    single step so a busy database still gets backed up.
+    """
+    source = sqlite3.connect(source_path, timeout=10)
+    dest = sqlite3.connect(dest_path)
+    stats = {"steps": 0, "restarts": 0, "single_step": False}
+    last_remaining = [None]
+
+    def progress(status, remaining, total):
+        stats["steps"] += 1
+        if last_remaining[0] is not None and remaining >= last_remaining[0]:
+            stats["restarts"] += 1
+            if stats["restarts"] > max_restarts:
+                raise _Restarted()
+        last_remaining[0] = remaining
+        stats["pages"] = total
+        if remaining:
+            time.sleep(pause)
+
+    try:
+        try:
+            source.backup(dest, pages=pages, progress=progress)
+        except _Restarted:
+            source.backup(dest, pages=-1)
+            stats["single_step"] = True
+        result = dest.execute("PRAGMA integrity_check").fetchone()[0]
+        if result != "ok":
+            raise BackupError(f"Backup copy failed integrity check: {result}")
+    finally:
+        dest.close()
+        source.close()
+    return stats
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_checksum(path):
+    checksum = _sha256(path)
+    # sha256sum format, so `sha256sum -c` works on the backup directory too
+    with open(path + CHECKSUM_SUFFIX, "w") as f:
+        f.write(f"{checksum}  {os.path.basename(path)}\n")
+    return checksum
+
+
+def list_backups(backup_dir=None):
+    """Snapshots in `backup_dir`, newest first."""
+    backup_dir = backup_dir or BACKUP_DIR
+    if not os.path.isdir(backup_dir):
+        return []
+    backups = []
+    for name in os.listdir(backup_dir):
+        if not (name.startswith(SNAPSHOT_PREFIX) and name.endswith(SNAPSHOT_SUFFIX)):
+            continue
+        path = os.path.join(backup_dir, name)
+        stat = os.stat(path)
+        backups.append({"name": name, "path": path, "bytes": stat.st_size, "created_at": stat.st_mtime})
+    # By time rather than name: "-2" and label suffixes don't sort chronologically
+    backups.sort(key=lambda b: (b["created_at"], b["name"]), reverse=True)
+    return backups
+
+
+def verify_backup(path):
+    """True if the snapshot matches its recorded checksum."""
+    try:
+        with open(path + CHECKSUM_SUFFIX) as f:
+            expected = f.read().split()[0]
+    except (OSError, IndexError):
+        return False
+    return _sha256(path) == expected
+
+
+def prune_backups(backup_dir=None, keep=BACKUP_KEEP):
+    """Delete all but the newest `keep` snapshots. Returns the names removed."""
+    removed = []
+    for backup in list_backups(backup_dir)[keep:]:
+        for path in (backup["path"], backup["path"] + CHECKSUM_SUFFIX):
+            if os.path.exists(path):
+                os.remove(path)
+        removed.append(backup["name"])
+    return removed
+
+
+def backup_database(db_path=None, backup_dir=None, keep=BACKUP_KEEP, label=None):
+    """
+    Write a gzip-compressed, checksummed snapshot of the live database and
+    prune old snapshots. Safe while the app is serving requests.
+    """
+    db_path = db_path or DATABASE_PATH
+    backup_dir = backup_dir or BACKUP_DIR
+    os.makedirs(backup_dir, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    base = f"{SNAPSHOT_PREFIX}{stamp}{'-' + label if label else ''}"
+    name = base + SNAPSHOT_SUFFIX
+    attempt = 1
+    while os.path.exists(os.path.join(backup_dir, name)):
+        # Two snapshots in the same second: never overwrite the first
+        attempt += 1
+        name = f"{base}-{attempt}{SNAPSHOT_SUFFIX}"
+    path = os.path.join(backup_dir, name)
+    copy_path = path + ".copy"
+
+    started = time.perf_counter()
+    try:
+        stats = _copy_online(db_path, copy_path)
+        with open(copy_path, "rb") as src, gzip.open(path + ".part", "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, CHUNK_BYTES)
+        os.replace(path + ".part", path)
+        checksum = _write_checksum(path)
+        raw_bytes = os.path.getsize(copy_path)
+    finally:
+        for leftover in (copy_path, path + ".part"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+    pruned = prune_backups(backup_dir, keep)
+    return {
+        "name": name,
+        "bytes": os.path.getsize(path),
+        "raw_bytes": raw_bytes,
+        "sha256": checksum,
+        "steps": stats["steps"],
+        "restarts": stats["restarts"],
+        "single_step": stats["single_step"],
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        "pruned": pruned,
+    }
+
+
+def restore_backup(path, db_path=None):
+    """
+    Replace the database's contents with a snapshot. The snapshot is verified
+    first, and the current database is snapshotted (label "pre-restore") so the
+    restore can be undone. Stop the app first: in-memory autosaves would
+    otherwise be written on top of the restored data.
+    """
+    db_path = db_path or DATABASE_PATH
+    if not verify_backup(path):
+        raise BackupError(f"Checksum mismatch or missing checksum for {path}")
+
+    restore_path = db_path + ".restore"
+    try:
+        with gzip.open(path, "rb") as src, open(restore_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, CHUNK_BYTES)
+        snapshot = sqlite3.connect(restore_path)
+        try:
+            result = snapshot.execute("PRAGMA integrity_check").fetchone()[0]
+            if result != "ok":
+                raise BackupError(f"Snapshot failed integrity check: {result}")
+            safety = backup_database(db_path, os.path.dirname(path), keep=BACKUP_KEEP + 1, label="pre-restore") if os.path.exists(db_path) else None
+            # Copying through the backup API keeps the file (and open connections) valid
+            live = sqlite3.connect(db_path, timeout=30)
+            try:
+                snapshot.backup(live)
+            finally:
+                live.close()
+        finally:
+            snapshot.close()
+    finally:
+        if os.path.exists(restore_path):
+            os.remove(restore_path)
+    return {"restored": os.path.basename(path), "pre_restore": safety["name"] if safety else None}
+
+
+def backup_status(backup_dir=None):
+    """Latest snapshot and snapshot count, for the metrics view."""
+    backups = list_backups(backup_dir)
+    latest = backups[0] if backups else None
+    return {
+        "count": len(backups),
+        "latest": latest["name"] if latest else None,
+        "latest_bytes": latest["bytes"] if latest else None,
+        "latest_age_seconds": round(time.time() - latest["created_at"]) if latest else None,
+        "total_bytes": sum(b["bytes"] for b in backups),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Online backups of the Grover database")
+    parser.add_argument("--db", default=DATABASE_PATH, help="database file (default: %(default)s)")
+    parser.add_argument("--dir", default=BACKUP_DIR, help="backup directory (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("backup", help="write a snapshot and prune old ones")
+    commands.add_parser("list", help="list snapshots, newest first")
+    verify = commands.add_parser("verify", help="check snapshot checksums")
+    verify.add_argument("snapshot", nargs="?", help="snapshot file (default: all)")
+    restore = commands.add_parser("restore", help="replace the database with a snapshot")
+    restore.add_argument("snapshot", help="snapshot file, or 'latest'")
+    args = parser.parse_args()
+
+    if args.command == "backup":
+        result = backup_database(args.db, args.dir)
+        print(f"Wrote {result['name']} ({result['bytes']} bytes, {result['raw_bytes']} uncompressed) in {result['elapsed_ms']} ms")
+        for name in result["pruned"]:
+            print(f"Pruned {name}")
+    elif args.command == "list":
+        for backup in list_backups(args.dir):
+            created = datetime.fromtimestamp(backup["created_at"]).strftime("%Y-%m-%d %H:%M:%S")
+            print(f"{backup['name']}  {backup['bytes']:>12}  {created}")
+    elif args.command == "verify":
+        paths = [args.snapshot] if args.snapshot else [b["path"] for b in list_backups(args.dir)]
+        failed = [path for path in paths if not verify_backup(path)]
+        for path in paths:
+            print(f"{'FAILED' if path in failed else 'ok':6}  {os.path.basename(path)}")
+        sys.exit(1 if failed else 0)
+    elif args.command == "restore":
+        path = args.snapshot
+        if path == "latest":
+            backups = list_backups(args.dir)
+            if not backups:
+                sys.exit("No snapshots found")
+            path = backups[0]["path"]
+        try:
+            result = restore_backup(path, args.db)
+        except BackupError as e:
+            sys.exit(f"Restore failed: {e}")
+        print(f"Restored {result['restored']}")
+        if result["pre_restore"]:
+            print(f"Previous database saved as {result['pre_restore']}")
+
+
+if __name__ == "__main__":
+    main()
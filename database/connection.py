@@ -0,0 +1,13 @@
+import sqlite3
+from config.settings import DATABASE_PATH
+
+
+def connect(db_path: str = None, **kwargs) -> sqlite3.Connection:
+    """
+    Open a connection to the Grover DB with foreign keys enforced. SQLite turns
+    them off per connection by default, which would skip ON DELETE CASCADE.
+    Extra keyword arguments go to sqlite3.connect.
+    """
+    conn = sqlite3.connect(db_path or DATABASE_PATH, **kwargs)
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
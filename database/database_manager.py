@@ -1,18 +1,91 @@
 import sqlite3
 import json
 from datetime import datetime
+from config.settings import DATABASE_PATH, ARTICLE_COMPRESS_MIN_CHARS
+from database.connection import connect
+from utils.text_compression import TextCodec
+
+
+def _blank_to_none(value):
+    return None if value is None or value == "" else value
+
+
+class VersionConflict(Exception):
+    """An article was saved by someone else since the editor loaded it."""
+    def __init__(self, table, row_id, current_version):
+        super().__init__(f"{table} row {row_id} was modified elsewhere (now at version {current_version})")
+        self.row_id = row_id
+        self.current_version = current_version
 
 
 class DatabaseManager:
     def __init__(self):
-        self.conn = sqlite3.connect("/data/grover.db", check_same_thread=False)
+        self.conn = connect(DATABASE_PATH, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
         self.cursor = self.conn.cursor()
+        # Write-behind buffer (see services/autosave_buffer.py) whose pending edits reads should see
+        self.pending_writes = None
+        # article_content is stored compressed; only methods that return it decode it
+        self.codec = TextCodec(ARTICLE_COMPRESS_MIN_CHARS)
         # self.create_tables()
 
     def get_connection(self):
         return self.conn
 
+    def _pack(self, article_content):
+        return self.codec.encode(self.conn, article_content)
+
+    def _article_row(self, table, row):
+        """Row as a dict with article_content decoded and pending autosaves applied."""
+        if row is None:
+            return None
+        if "article_content" in row.keys():
+            row = dict(row)
+            row["article_content"] = self.codec.decode(self.conn, row["article_content"])
+        if self.pending_writes is None:
+            return row
+        return self.pending_writes.overlay(table, row)
+
+    def _flush_pending(self, table, row_id):
+        """Write any buffered edit to this row first, so a direct write doesn't conflict with it."""
+        if self.pending_writes is not None and row_id:
+            self.pending_writes.flush([(table, int(row_id))])
+
+    def _current_version(self, cursor, table, row_id):
+        cursor.execute(f"SELECT version FROM {table} WHERE id = ?", (row_id,))
+        row = cursor.fetchone()
+        return row["version"] if row else None
+
+    def _versioned_update(self, table, row_id, assignments, params, expected_version):
+        """
+        Run `UPDATE table SET assignments` as a single conditional statement and bump
+        the row version. Returns the new version; raises VersionConflict if the row
+        moved past `expected_version`, ValueError if it doesn't exist.
+        """
+        self._flush_pending(table, row_id)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                UPDATE {table}
+                SET {assignments}, version = version + 1, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND (? IS NULL OR version = ?)
+                """,
+                (*params, row_id, expected_version, expected_version),
+            )
+            updated = cursor.rowcount
+            if updated == 1 and expected_version is not None:
+                conn.commit()
+                return expected_version + 1
+            # Unversioned write or no match: one lookup tells the new version or why it failed
+            current_version = self._current_version(cursor, table, row_id)
+            conn.commit()
+            if current_version is None:
+                raise ValueError(f"No row with ID {row_id} in {table}")
+            if updated == 0 and expected_version is not None:
+                raise VersionConflict(table, row_id, current_version)
+            return current_version
+
     # Projects
     def create_project(self, project_data):
         current_time = datetime.now().isoformat()
@@ -107,27 +180,292 @@ class DatabaseManager:
             conn.commit()
             return cursor.rowcount > 0
 
+    def duplicate_project(self, project_id, name=None, changes_note=None, include_community_articles=False):
+        """
+        Copy a project with its keywords and base articles (and optionally its
+        community articles) in one transaction of set-based INSERT ... SELECTs.
+        The copy records its source in original_project_id. Article bodies are
+        copied as stored, so compressed content is never decoded.
+        Returns counts of what was copied, or None if the project doesn't exist.
+        """
+        if self.pending_writes is not None:
+            # Copy what the editors see, including autosaves not yet written
+            self.pending_writes.flush()
+        with self.get_connection() as conn:
+            try:
+                conn.execute("BEGIN")
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    INSERT INTO projects (
+                        name, care_areas, journey_stage, category, format_type, business_category,
+                        consumer_need, tone_of_voice, target_audiences, topic, project_notes,
+                        is_base_project, is_duplicate, original_project_id, changes_note,
+                        created_at, updated_at
+                    )
+                    SELECT
+                        COALESCE(?, name || ' (copy)'), care_areas, journey_stage, category, format_type,
+                        business_category, consumer_need, tone_of_voice, target_audiences, topic, project_notes,
+                        is_base_project, TRUE, id, ?,
+                        CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+                    FROM projects WHERE id = ?
+                    """,
+                    (name or None, changes_note, project_id),
+                )
+                if cursor.rowcount == 0:
+                    conn.rollback()
+                    return None
+                new_project_id = cursor.lastrowid
+
+                cursor.execute(
+                    """
+                    INSERT INTO keywords (
+                        project_id, keyword, search_volume, search_intent, keyword_difficulty,
+                        is_primary, created_at, metrics_updated_at
+                    )
+                    SELECT ?, keyword, search_volume, search_intent, keyword_difficulty,
+                           is_primary, created_at, metrics_updated_at
+                    FROM keywords WHERE project_id = ?
+                    ORDER BY id
+                    """,
+                    (new_project_id, project_id),
+                )
+                keyword_count = cursor.rowcount
+
+                cursor.execute(
+                    """
+                    INSERT INTO base_articles (
+                        project_id, article_outline, article_length, article_sections,
+                        article_title, article_content, created_at, updated_at
+                    )
+                    SELECT ?, article_outline, article_length, article_sections,
+                           article_title, article_content, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+                    FROM base_articles WHERE project_id = ?
+                    ORDER BY id
+                    """,
+                    (new_project_id, project_id),
+                )
+                article_count = cursor.rowcount
+
+                community_count = 0
+                if include_community_articles and article_count:
+                    # One INSERT ... SELECT numbers its rows consecutively, so the copy of the
+                    # n-th source article (by id) is first_article_id + n - 1.
+                    first_article_id = cursor.lastrowid - article_count + 1
+                    cursor.execute(
+                        """
+                        INSERT INTO community_articles (
+                            project_id, base_article_id, community_id, article_title, article_content,
+                            article_schema, meta_title, meta_description, created_at, updated_at
+                        )
+                        SELECT
+                            ?,
+                            ? + (SELECT COUNT(*) FROM base_articles b
+                                 WHERE b.project_id = ? AND b.id < ca.base_article_id),
+                            ca.community_id, ca.article_title, ca.article_content,
+                            ca.article_schema, ca.meta_title, ca.meta_description,
+                            CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+                        FROM community_articles ca
+                        WHERE ca.project_id = ?
+                          AND ca.base_article_id IN (SELECT id FROM base_articles WHERE project_id = ?)
+                        ORDER BY ca.id
+                        """,
+                        (new_project_id, first_article_id, project_id, project_id, project_id),
+                    )
+                    community_count = cursor.rowcount
+
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"Database error in duplicate_project: {str(e)}")
+                raise e
+        return {
+            "project_id": new_project_id,
+            "keywords": keyword_count,
+            "base_articles": article_count,
+            "community_articles": community_count,
+        }
+
     def delete_project(self, project_id):
+        """
+        Delete a project. Foreign keys cascade the delete to its keywords and
+        articles; returns how many rows of each were removed.
+        """
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM projects WHERE id = ?", (project_id,))
-            return cursor.rowcount > 0
+            try:
+                conn.execute("BEGIN")
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT
+                        (SELECT COUNT(*) FROM keywords WHERE project_id = ?) AS keywords,
+                        (SELECT COUNT(*) FROM base_articles WHERE project_id = ?) AS base_articles,
+                        (SELECT COUNT(*) FROM community_articles
+                         WHERE project_id = ?
+                            OR base_article_id IN (SELECT id FROM base_articles WHERE project_id = ?)) AS community_articles
+                    """,
+                    (project_id, project_id, project_id, project_id),
+                )
+                counts = dict(cursor.fetchone())
+                cursor.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+                deleted = cursor.rowcount
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"Database error in delete_project: {str(e)}")
+                raise e
+        if not deleted:
+            return {"projects": 0, "keywords": 0, "base_articles": 0, "community_articles": 0}
+        return {"projects": deleted, **counts}
+
+    # Rows left behind by deletes made while foreign keys were off. Community articles go
+    # first and include those whose base article is itself orphaned, so cascades from the
+    # later base_articles sweep don't remove rows uncounted.
+    ORPHAN_SWEEPS = (
+        ("community_articles", """
+            DELETE FROM community_articles
+            WHERE project_id NOT IN (SELECT id FROM projects)
+               OR base_article_id NOT IN (
+                   SELECT b.id FROM base_articles b JOIN projects p ON p.id = b.project_id
+               )
+        """),
+        ("base_articles", "DELETE FROM base_articles WHERE project_id NOT IN (SELECT id FROM projects)"),
+        ("keywords", "DELETE FROM keywords WHERE project_id NOT IN (SELECT id FROM projects)"),
+        ("project_lineage", """
+            UPDATE projects SET original_project_id = NULL
+            WHERE original_project_id IS NOT NULL AND original_project_id NOT IN (SELECT id FROM projects)
+        """),
+    )
+
+    def sweep_orphans(self):
+        """
+        Remove keywords and articles whose project or base article no longer
+        exists, in one transaction. Returns rows removed (or lineage links
+        cleared) per table.
+        """
+        removed = {}
+        with self.get_connection() as conn:
+            try:
+                conn.execute("BEGIN")
+                cursor = conn.cursor()
+                for name, sql in self.ORPHAN_SWEEPS:
+                    cursor.execute(sql)
+                    removed[name] = cursor.rowcount
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"Database error in sweep_orphans: {str(e)}")
+                raise e
+        return removed
 
     # Keywords
+    KEYWORD_UPSERT_SQL = """
+        INSERT INTO keywords
+        (project_id, keyword, search_volume, search_intent, keyword_difficulty)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (project_id, keyword COLLATE NOCASE) DO UPDATE SET
+            search_volume = COALESCE(excluded.search_volume, keywords.search_volume),
+            search_intent = COALESCE(excluded.search_intent, keywords.search_intent),
+            keyword_difficulty = COALESCE(excluded.keyword_difficulty, keywords.keyword_difficulty)
+    """
+
     def add_keyword(
         self, project_id, keyword, search_volume, search_intent, keyword_difficulty
     ):
+        """Add a keyword, or refresh its metrics if the project already has it."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
+                self.KEYWORD_UPSERT_SQL,
+                (
+                    project_id,
+                    keyword,
+                    _blank_to_none(search_volume),
+                    _blank_to_none(search_intent),
+                    _blank_to_none(keyword_difficulty),
+                ),
+            )
+            conn.commit()
+
+    def add_keywords(self, project_id, keywords):
+        """
+        Upsert many keywords in a single transaction.
+        `keywords` is a list of dicts with keyword, search_volume, search_intent, keyword_difficulty.
+        Keywords the project already has (case-insensitive) get their metrics refreshed;
+        missing metrics never overwrite stored ones.
+        Returns {"inserted": n, "updated": n}.
+        """
+        rows = {}
+        for kw in keywords:
+            text = (kw.get("keyword") or "").strip()
+            if not text:
+                continue
+            # Last occurrence wins within one batch
+            rows[text.lower()] = (
+                project_id,
+                text,
+                _blank_to_none(kw.get("search_volume")),
+                _blank_to_none(kw.get("search_intent")),
+                _blank_to_none(kw.get("keyword_difficulty")),
+            )
+        if not rows:
+            return {"inserted": 0, "updated": 0}
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT LOWER(keyword) FROM keywords WHERE project_id = ?", (project_id,))
+            existing = {row[0] for row in cursor.fetchall()}
+            cursor.executemany(self.KEYWORD_UPSERT_SQL, list(rows.values()))
+            conn.commit()
+        updated = len(existing.intersection(rows))
+        return {"inserted": len(rows) - updated, "updated": updated}
+
+    def get_keywords_due_for_refresh(self, stale_before, active_since, limit):
+        """
+        Distinct keyword phrases whose metrics are missing or older than `stale_before`.
+        Phrases used by recently active projects come first, then the stalest.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT
+                    LOWER(k.keyword) AS phrase,
+                    MAX(CASE WHEN datetime(p.updated_at) >= ? OR datetime(k.created_at) >= ? THEN 1 ELSE 0 END) AS is_active,
+                    MIN(COALESCE(k.metrics_updated_at, '')) AS oldest_refresh
+                FROM keywords k
+                JOIN projects p ON p.id = k.project_id
+                WHERE k.metrics_updated_at IS NULL OR k.metrics_updated_at < ?
+                GROUP BY LOWER(k.keyword)
+                ORDER BY is_active DESC, oldest_refresh ASC
+                LIMIT ?
+                """,
+                (active_since, active_since, stale_before, limit),
+            )
+            return [row["phrase"] for row in cursor.fetchall()]
+
+    def update_keyword_metrics(self, metrics):
+        """
+        Bulk-update stored metrics for every project using each phrase, in one transaction.
+        `metrics` is a list of (phrase, search_volume, search_intent, keyword_difficulty);
+        None values keep the stored metric but still mark the phrase as refreshed.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
                 """
-                INSERT INTO keywords
-                (project_id, keyword, search_volume, search_intent, keyword_difficulty)
-                VALUES (?, ?, ?, ?, ?)
+                UPDATE keywords
+                SET
+                    search_volume = COALESCE(?, search_volume),
+                    search_intent = COALESCE(?, search_intent),
+                    keyword_difficulty = COALESCE(?, keyword_difficulty),
+                    metrics_updated_at = CURRENT_TIMESTAMP
+                WHERE keyword = ? COLLATE NOCASE
                 """,
-                (project_id, keyword, search_volume, search_intent, keyword_difficulty),
+                [(volume, intent, difficulty, phrase) for phrase, volume, intent, difficulty in metrics],
             )
             conn.commit()
+            return cursor.rowcount
 
     def get_project_keywords(self, project_id):
         with self.get_connection() as conn:
@@ -135,6 +473,41 @@ class DatabaseManager:
             cursor.execute("SELECT * FROM keywords WHERE project_id = ?", (project_id,))
             return cursor.fetchall()
 
+    def get_keyword_ids(self):
+        """Ids of every stored keyword that belongs to an existing project."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT k.id FROM keywords k JOIN projects p ON p.id = k.project_id")
+            return {row[0] for row in cursor.fetchall()}
+
+    def get_keywords_by_ids(self, keyword_ids):
+        """Keyword rows for the given ids, fetched in chunks to stay under SQLite's variable limit."""
+        keyword_ids = list(keyword_ids)
+        rows = []
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(keyword_ids), 500):
+                chunk = keyword_ids[start:start + 500]
+                cursor.execute(
+                    f"SELECT id, project_id, keyword, search_volume FROM keywords "
+                    f"WHERE id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                rows.extend(cursor.fetchall())
+        return rows
+
+    def get_keywords_fingerprint(self):
+        """Cheap summary that changes whenever keywords or projects are added or removed."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT COUNT(*), MAX(id), TOTAL(id), (SELECT COUNT(*) FROM projects), (SELECT MAX(id) FROM projects)
+                FROM keywords
+                """
+            )
+            return tuple(cursor.fetchone())
+
     def delete_keyword(self, keyword_id):
         with self.get_connection() as conn:
             cursor = conn.cursor()
@@ -171,7 +544,7 @@ class DatabaseManager:
                         article_length,
                         article_sections,
                         article_title,
-                        article_content
+                        self._pack(article_content)
                     ),
                 )
                 conn.commit()
@@ -189,45 +562,34 @@ class DatabaseManager:
         article_title=None,
         article_content=None,
         article_id=None,
+        expected_version=None,
     ):
-        """Save or update article content with improved error handling and transaction management."""
+        """
+        Save or update article content with improved error handling and transaction management.
+        Updates with `expected_version` only apply if the stored row still has that
+        version, and raise VersionConflict otherwise.
+        """
+        self._flush_pending("base_articles", article_id)
+        article_content = self._pack(article_content)
         with self.get_connection() as conn:
             try:
                 conn.execute("BEGIN")
                 cursor = conn.cursor()
 
                 if article_id:
-                    # First, get the current values to use as defaults for NULL values
-                    cursor.execute(
-                        "SELECT * FROM base_articles WHERE id = ?", 
-                        (article_id,)
-                    )
-                    current = cursor.fetchone()
-                    
-                    if not current:
-                        raise ValueError(
-                            f"No article found with ID {article_id} for project {project_id}"
-                        )
-                    
-                    # Use existing values for any NULL parameters
-                    article_outline = article_outline if article_outline is not None else current['article_outline']
-                    article_length = article_length if article_length is not None else current['article_length']
-                    article_sections = article_sections if article_sections is not None else current['article_sections']
-                    article_title = article_title if article_title is not None else current['article_title']
-                    article_content = article_content if article_content is not None else current['article_content']
-                    
-                    # Now update with all fields populated
+                    # One conditional statement: NULL parameters keep the stored value
                     cursor.execute(
                         """
                         UPDATE base_articles
                         SET
-                            article_outline = ?,
-                            article_length = ?,
-                            article_sections = ?,
-                            article_title = ?,
-                            article_content = ?,
+                            article_outline = COALESCE(?, article_outline),
+                            article_length = COALESCE(?, article_length),
+                            article_sections = COALESCE(?, article_sections),
+                            article_title = COALESCE(?, article_title),
+                            article_content = COALESCE(?, article_content),
+                            version = version + 1,
                             updated_at = CURRENT_TIMESTAMP
-                        WHERE id = ? AND project_id = ?
+                        WHERE id = ? AND project_id = ? AND (? IS NULL OR version = ?)
                         """,
                         (
                             article_outline,
@@ -237,9 +599,14 @@ class DatabaseManager:
                             article_content,
                             article_id,
                             project_id,
+                            expected_version,
+                            expected_version,
                         ),
                     )
                     if cursor.rowcount == 0:
+                        current_version = self._current_version(cursor, "base_articles", article_id)
+                        if current_version is not None and expected_version is not None:
+                            raise VersionConflict("base_articles", article_id, current_version)
                         raise ValueError(
                             f"Update failed for article ID {article_id} for project {project_id}"
                         )
@@ -273,45 +640,34 @@ class DatabaseManager:
                 print(f"Database error in save_article_content: {str(e)}")
                 raise e
 
-    def save_article_post_content(self, article_id, article_content):
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                UPDATE base_articles
-                SET article_content = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-                """,
-                (article_content, article_id),
-            )
-            conn.commit()
+    def save_article_post_content(self, article_id, article_content, expected_version=None):
+        """Save edited article content. Returns the new version (see _versioned_update)."""
+        return self._versioned_update(
+            "base_articles", article_id, "article_content = ?", (self._pack(article_content),), expected_version
+        )
 
-    def save_article_title_outline(self, article_id, article_title, article_outline):
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                UPDATE base_articles
-                SET article_title = ?, article_outline = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-                """,
-                (article_title, article_outline, article_id),
-            )
-            conn.commit()
+    def save_article_title_outline(self, article_id, article_title, article_outline, expected_version=None):
+        return self._versioned_update(
+            "base_articles", article_id, "article_title = ?, article_outline = ?",
+            (article_title, article_outline), expected_version,
+        )
 
-    def get_all_articles_for_project(self, project_id):
+    def get_all_articles_for_project(self, project_id, include_content=True):
+        """Articles of a project. Listings pass include_content=False to skip reading and decompressing bodies."""
+        content_column = "article_content, " if include_content else ""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                """
-                SELECT id, article_title, article_content, article_outline, article_length, article_sections
+                f"""
+                SELECT id, article_title, {content_column}article_outline, article_length, article_sections,
+                       created_at, updated_at
                 FROM base_articles
                 WHERE project_id = ?
                 ORDER BY created_at DESC
                 """,
                 (project_id,),
             )
-            return cursor.fetchall()
+            return [self._article_row("base_articles", row) for row in cursor.fetchall()]
 
     def get_article_content(self, article_id):
         with self.get_connection() as conn:
@@ -319,15 +675,31 @@ class DatabaseManager:
             cursor.execute(
                 "SELECT * FROM base_articles WHERE id = ?", (article_id,)
             )
-            return cursor.fetchone()
+            return self._article_row("base_articles", cursor.fetchone())
 
     def delete_article_content(self, article_id):
+        """
+        Delete a base article; its community articles go with it (foreign key
+        cascade). Returns how many rows of each were removed.
+        """
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "DELETE FROM base_articles WHERE id = ?", (article_id,)
-            )
-            conn.commit()
+            try:
+                conn.execute("BEGIN")
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT COUNT(*) FROM community_articles WHERE base_article_id = ?", (article_id,)
+                )
+                community_count = cursor.fetchone()[0]
+                cursor.execute(
+                    "DELETE FROM base_articles WHERE id = ?", (article_id,)
+                )
+                deleted = cursor.rowcount
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"Database error in delete_article_content: {str(e)}")
+                raise e
+        return {"base_articles": deleted, "community_articles": community_count if deleted else 0}
 
     # Community Articles
 
@@ -374,7 +746,7 @@ class DatabaseManager:
                         base_article_id,
                         community_id,
                         article_title,
-                        article_content,
+                        self._pack(article_content),
                         (
                             json.dumps(article_schema)
                             if isinstance(article_schema, dict)
@@ -398,27 +770,36 @@ class DatabaseManager:
                 print(f"Database error in create_community_article: {str(e)}")
                 raise e
 
-    def save_community_post_content(self, community_article_id, article_content):
+    def save_community_post_content(self, community_article_id, article_content, expected_version=None):
+        return self._versioned_update(
+            "community_articles", community_article_id, "article_content = ?", (self._pack(article_content),), expected_version
+        )
+
+    def get_community_articles_for_project(self, project_id):
+        """Content of every community article in a project, for project-wide reports."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 """
-                UPDATE community_articles
-                SET article_content = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
+                SELECT id, base_article_id, community_id, article_title, article_content
+                FROM community_articles
+                WHERE project_id = ?
+                ORDER BY base_article_id, created_at
                 """,
-                (article_content, community_article_id),
+                (project_id,),
             )
-            conn.commit()
+            return [self._article_row("community_articles", row) for row in cursor.fetchall()]
 
     def get_community_articles_for_base_article(self, base_article_id):
         """Get all community articles for a base article."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            # Query without joining with communities table
+            # Query without joining with communities table; listings don't need the article body
             cursor.execute(
                 """
-                SELECT * FROM community_articles
+                SELECT id, project_id, base_article_id, community_id, article_title, meta_title, meta_description,
+                       version, created_at, updated_at
+                FROM community_articles
                 WHERE base_article_id = ?
                 ORDER BY created_at DESC
                 """,
@@ -459,7 +840,7 @@ class DatabaseManager:
                 """,
                 (community_article_id,)
             )
-            article = cursor.fetchone()
+            article = self._article_row("community_articles", cursor.fetchone())
             
             if article:
                 # Convert to dict for easier manipulation
@@ -487,48 +868,24 @@ class DatabaseManager:
             cursor = conn.cursor()
             cursor.execute(
                 """
-                SELECT * FROM community_articles
+                SELECT id FROM community_articles
                 WHERE base_article_id = ? AND community_id = ?
                 """,
                 (base_article_id, community_id)
             )
             return cursor.fetchone()
 
-    def save_community_article_content(self, community_article_id, article_title=None, article_content=None):
-        """Save or update a community article's content."""
-        with self.get_connection() as conn:
-            try:
-                cursor = conn.cursor()
-                
-                # Get current values to use as defaults for NULL values
-                cursor.execute(
-                    "SELECT * FROM community_articles WHERE id = ?", 
-                    (community_article_id,)
-                )
-                current = cursor.fetchone()
-                
-                if not current:
-                    raise ValueError(f"No community article found with ID {community_article_id}")
-                
-                # Use existing values for any NULL parameters
-                article_title = article_title if article_title is not None else current['article_title']
-                article_content = article_content if article_content is not None else current['article_content']
-                
-                cursor.execute(
-                    """
-                    UPDATE community_articles
-                    SET article_title = ?, article_content = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                    """,
-                    (article_title, article_content, community_article_id)
-                )
-                conn.commit()
-                return True
-                
-            except Exception as e:
-                conn.rollback()
-                print(f"Database error in save_community_article_content: {str(e)}")
-                raise e
+    def save_community_article_content(self, community_article_id, article_title=None, article_content=None,
+                                       expected_version=None):
+        """
+        Save or update a community article's content. NULL parameters keep the
+        stored value. Returns the new version (see _versioned_update).
+        """
+        return self._versioned_update(
+            "community_articles", community_article_id,
+            "article_title = COALESCE(?, article_title), article_content = COALESCE(?, article_content)",
+            (article_title, self._pack(article_content)), expected_version,
+        )
 
     def delete_community_article(self, community_article_id):
         """Delete a community article."""
@@ -1,14 +1,140 @@
+import os
+import sys
 import sqlite3
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import DATABASE_PATH, DB_JOURNAL_MODE, ARTICLE_COMPRESS_MIN_CHARS, COMPRESSION_TRAIN_MIN_ARTICLES, COMPRESSION_TRAIN_SAMPLES
+from database.connection import connect
+from utils.text_compression import TextCodec, train_dictionary, header_for
+
+COMPRESSED_COLUMNS = (("base_articles", "article_content"), ("community_articles", "article_content"))
+
+def column_exists(cur, table, column):
+    cur.execute(f"PRAGMA table_info({table})")
+    return any(row[1] == column for row in cur.fetchall())
+
+def compress_text_columns(cur):
+    """
+    Train the shared compression dictionary once enough articles exist, then
+    store every large article body compressed with the newest dictionary.
+    Only rows still stored as text or with an older dictionary are touched.
+    """
+    conn = cur.connection
+    codec = TextCodec(ARTICLE_COMPRESS_MIN_CHARS)
+    cur.execute("SELECT COUNT(*) FROM compression_dictionaries")
+    if cur.fetchone()[0] == 0:
+        samples = []
+        for table, column in COMPRESSED_COLUMNS:
+            cur.execute(
+                f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL ORDER BY id DESC LIMIT ?",
+                (COMPRESSION_TRAIN_SAMPLES,),
+            )
+            samples.extend(codec.decode(conn, row[0]) for row in cur.fetchall())
+        dictionary = train_dictionary(samples) if len(samples) >= COMPRESSION_TRAIN_MIN_ARTICLES else b""
+        if dictionary:
+            cur.execute("INSERT INTO compression_dictionaries (dictionary) VALUES (?)", (dictionary,))
+            print(f"Trained a {len(dictionary)}-byte compression dictionary from {len(samples)} articles")
+
+    codec.reload(conn)
+    current_header = header_for(codec.active_id(conn))
+    for table, column in COMPRESSED_COLUMNS:
+        cur.execute(
+            f"""
+            SELECT id, {column} FROM {table}
+            WHERE (typeof({column}) = 'text' AND length({column}) >= ?)
+               OR (typeof({column}) = 'blob' AND substr({column}, 1, ?) != ?)
+            """,
+            (ARTICLE_COMPRESS_MIN_CHARS, len(current_header), current_header),
+        )
+        rows = cur.fetchall()
+        for row_id, value in rows:
+            conn.execute(
+                f"UPDATE {table} SET {column} = ? WHERE id = ?",
+                (codec.encode(conn, codec.decode(conn, value)), row_id),
+            )
+        if rows:
+            print(f"Compressed {len(rows)} rows of {table}.{column}")
+
+def configure_storage(conn):
+    """
+    Persistent file settings: incremental auto-vacuum, so deleted pages can be
+    released in small steps, and the configured journal mode (WAL by default,
+    so readers never block the writer). Turning auto_vacuum on for an existing
+    file takes a one-off VACUUM, which also releases pages that are already free.
+    """
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        print("Enabled incremental auto-vacuum")
+    journal_mode = conn.execute(f"PRAGMA journal_mode = {DB_JOURNAL_MODE}").fetchone()[0]
+    if journal_mode != DB_JOURNAL_MODE.lower():
+        print(f"Could not switch journal mode to {DB_JOURNAL_MODE}; using {journal_mode}")
+
+def migrate_database(cur):
+    """Bring an existing database up to the current schema. Safe to run repeatedly."""
+    if not column_exists(cur, "keywords", "metrics_updated_at"):
+        cur.execute("ALTER TABLE keywords ADD COLUMN metrics_updated_at TIMESTAMP")
+
+    # Row versions for optimistic concurrency on article saves
+    for table in ("base_articles", "community_articles"):
+        if not column_exists(cur, table, "version"):
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+
+    # Conditional-refresh bookkeeping for crawled pages
+    for column, column_type in (("etag", "TEXT"), ("last_modified", "TEXT"), ("body_hash", "TEXT"),
+                                ("content_hash", "TEXT"), ("changed_at", "REAL")):
+        if not column_exists(cur, "scraped_pages", column):
+            cur.execute(f"ALTER TABLE scraped_pages ADD COLUMN {column} {column_type}")
+
+    # One row per keyword per project: merge existing duplicates into the oldest row, then enforce it
+    cur.executescript(
+        """
+        UPDATE keywords
+        SET
+            search_volume = COALESCE(search_volume, (
+                SELECT d.search_volume FROM keywords d
+                WHERE d.project_id = keywords.project_id AND d.keyword = keywords.keyword COLLATE NOCASE
+                  AND d.search_volume IS NOT NULL
+                ORDER BY d.id DESC LIMIT 1
+            )),
+            search_intent = COALESCE(search_intent, (
+                SELECT d.search_intent FROM keywords d
+                WHERE d.project_id = keywords.project_id AND d.keyword = keywords.keyword COLLATE NOCASE
+                  AND d.search_intent IS NOT NULL
+                ORDER BY d.id DESC LIMIT 1
+            )),
+            keyword_difficulty = COALESCE(keyword_difficulty, (
+                SELECT d.keyword_difficulty FROM keywords d
+                WHERE d.project_id = keywords.project_id AND d.keyword = keywords.keyword COLLATE NOCASE
+                  AND d.keyword_difficulty IS NOT NULL
+                ORDER BY d.id DESC LIMIT 1
+            ))
+        WHERE id IN (
+            SELECT MIN(id) FROM keywords
+            GROUP BY project_id, keyword COLLATE NOCASE
+            HAVING COUNT(*) > 1
+        );
+
+        DELETE FROM keywords
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM keywords GROUP BY project_id, keyword COLLATE NOCASE
+        );
+
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_keywords_project_keyword
+            ON keywords (project_id, keyword COLLATE NOCASE);
+
+        CREATE INDEX IF NOT EXISTS idx_keywords_keyword
+            ON keywords (keyword COLLATE NOCASE);
+        """
+    )
+
 def setup_database():
-    conn = sqlite3.connect('/data/grover.db')
+    conn = connect(DATABASE_PATH)
     cur = conn.cursor()
 
     try:
         cur.executescript(
             """
-            PRAGMA foreign_keys = ON;
-
             CREATE TABLE IF NOT EXISTS projects (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 name TEXT NOT NULL,
@@ -42,6 +168,7 @@ def setup_database():
                 keyword_difficulty INTEGER,
                 is_primary BOOLEAN DEFAULT FALSE,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                metrics_updated_at TIMESTAMP,
                 FOREIGN KEY (project_id) 
                     REFERENCES projects(id)
                     ON DELETE CASCADE
@@ -55,6 +182,7 @@ def setup_database():
                 article_sections INTEGER,
                 article_title TEXT,
                 article_content TEXT,
+                version INTEGER NOT NULL DEFAULT 1,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
@@ -70,14 +198,96 @@ def setup_database():
                 article_schema TEXT,
                 meta_title TEXT,
                 meta_description TEXT,
+                version INTEGER NOT NULL DEFAULT 1,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE,
                 FOREIGN KEY (base_article_id) REFERENCES base_articles(id) ON DELETE CASCADE
             );
+
+            -- Cascading deletes look up child rows by these columns
+            CREATE INDEX IF NOT EXISTS idx_base_articles_project ON base_articles (project_id);
+            CREATE INDEX IF NOT EXISTS idx_community_articles_project ON community_articles (project_id);
+            CREATE INDEX IF NOT EXISTS idx_community_articles_base_article ON community_articles (base_article_id);
+            CREATE INDEX IF NOT EXISTS idx_projects_original ON projects (original_project_id);
+
+            CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                name TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS rate_limit_leases (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                pid INTEGER NOT NULL,
+                expires_at REAL NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS semrush_cache (
+                cache_key TEXT PRIMARY KEY,
+                phrase TEXT NOT NULL,
+                database TEXT NOT NULL,
+                lookup_type TEXT NOT NULL,
+                filters TEXT,
+                response JSON NOT NULL,
+                fetched_at REAL NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS scheduler_runs (
+                name TEXT PRIMARY KEY,
+                last_run REAL NOT NULL,
+                last_status TEXT
+            );
+
+            CREATE TABLE IF NOT EXISTS semrush_usage (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                called_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                day TEXT NOT NULL,
+                api_type TEXT NOT NULL,
+                phrase TEXT,
+                project_id INTEGER,
+                rows INTEGER NOT NULL DEFAULT 0,
+                units INTEGER NOT NULL DEFAULT 0
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_semrush_usage_day ON semrush_usage (day);
+
+            CREATE TABLE IF NOT EXISTS scraped_pages (
+                url TEXT PRIMARY KEY,
+                community_id INTEGER,
+                page_type TEXT,
+                status TEXT NOT NULL,
+                text TEXT,
+                error TEXT,
+                fetched_at REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT,
+                content_hash TEXT,
+                changed_at REAL
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_scraped_pages_community ON scraped_pages (community_id);
+
+            CREATE TABLE IF NOT EXISTS compression_dictionaries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                dictionary BLOB NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+
+            CREATE TABLE IF NOT EXISTS robots_cache (
+                origin TEXT PRIMARY KEY,
+                status INTEGER,
+                body TEXT,
+                fetched_at REAL NOT NULL
+            );
             """
         )
+        migrate_database(cur)
+        compress_text_columns(cur)
         conn.commit()
+        configure_storage(conn)
         print("Database setup completed successfully")
 
     except sqlite3.Error as e:
@@ -1,15 +1,15 @@
 #!/usr/bin/env bash
 set -e
 
-GROVER_DB_PATH="/data/grover.db"
+export GROVER_DB_PATH="${GROVER_DB_PATH:-/data/grover.db}"
 
-# Ensure Grover DB exists
+# Create the Grover DB, or bring an existing one up to the current schema.
+# setup_database.py is idempotent, so it is safe to run on every start.
 if [ ! -f "$GROVER_DB_PATH" ]; then
     echo "Initializing Grover database..."
-    python database/setup_database.py
 else
-    echo "Grover database already exists, skipping init..."
+    echo "Grover database already exists, applying schema updates..."
 fi
+python database/setup_database.py
 
 exec "$@"
-
@@ -0,0 +1,201 @@
+import time
+import sqlite3
+import threading
+from config.settings import DATABASE_PATH, AUTOSAVE_FLUSH_INTERVAL, ARTICLE_COMPRESS_MIN_CHARS
+from database.connection import connect
+from database.database_manager import VersionConflict
+from utils.text_compression import TextCodec
+
+# Stored compressed, like DatabaseManager stores them
+COMPRESSED_COLUMNS = {"article_content"}
+# Columns editors may write through the buffer, per table
+BUFFERED_COLUMNS = {
+    "base_articles": ("article_title", "article_content", "article_outline"),
+    "community_articles": ("article_title", "article_content"),
+}
+
+
+class AutosaveBuffer:
+    """
+    Write-behind buffer for editor autosaves. Keeps the latest pending fields per
+    article and writes them all in one transaction every `interval` seconds, so
+    the commit rate stays bounded however many editors are typing. Explicit saves
+    flush their article straight away; close() flushes everything at shutdown.
+
+    Row versions work as if every put were written immediately: each put returns
+    the version the row will have, a stale `expected_version` raises
+    VersionConflict, and a flush that finds the row changed elsewhere drops the
+    pending edit and makes the editor's next put raise VersionConflict.
+    """
+    def __init__(self, db_path: str = None, interval: float = AUTOSAVE_FLUSH_INTERVAL):
+        self.db_path = db_path or DATABASE_PATH
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._conn = None
+        self.codec = TextCodec(ARTICLE_COMPRESS_MIN_CHARS)
+        self._pending = {}    # (table, row_id) -> {"fields", "base_version", "version"}
+        self._conflicts = {}  # (table, row_id) -> (version in the DB, version the editor was given) after a failed flush
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {"puts": 0, "flushes": 0, "rows_written": 0, "conflicts": 0, "last_flush_ms": None}
+
+    def _get_conn(self):
+        if self._conn is None:
+            self._conn = connect(self.db_path, timeout=10, check_same_thread=False)
+        return self._conn
+
+    def put(self, table: str, row_id: int, fields: dict, expected_version: int = None):
+        """
+        Buffer an edit. Returns the row's version once the edit lands (None for
+        unversioned edits of a row with nothing pending).
+        """
+        unknown = set(fields) - set(BUFFERED_COLUMNS[table])
+        if unknown:
+            raise ValueError(f"Cannot buffer {', '.join(sorted(unknown))} for {table}")
+        key = (table, int(row_id))
+        with self._lock:
+            if key in self._conflicts:
+                # Reported once: only an editor that reloaded the current version may carry on.
+                # The dropped edit's version can equal the DB's by coincidence, so it is refused too.
+                current_version, stale_version = self._conflicts.pop(key)
+                if expected_version != current_version or expected_version == stale_version:
+                    raise VersionConflict(table, row_id, current_version)
+            entry = self._pending.get(key)
+            if entry is None:
+                entry = {"fields": {}, "base_version": expected_version, "version": expected_version}
+                self._pending[key] = entry
+            elif expected_version is not None and entry["version"] is not None and expected_version != entry["version"]:
+                raise VersionConflict(table, row_id, entry["version"])
+            entry["fields"].update(fields)
+            if entry["version"] is not None:
+                entry["version"] += 1
+            self._stats["puts"] += 1
+            return entry["version"]
+
+    def pending_fields(self, table: str, row_id) -> dict:
+        """Fields (and version) waiting to be written for a row, or {}."""
+        if row_id is None:
+            return {}
+        with self._lock:
+            entry = self._pending.get((table, int(row_id)))
+            if entry is None:
+                return {}
+            pending = dict(entry["fields"])
+            if entry["version"] is not None:
+                pending["version"] = entry["version"]
+            return pending
+
+    def overlay(self, table: str, row):
+        """A DB row (sqlite3.Row or dict) with any pending edits applied."""
+        if row is None:
+            return row
+        pending = self.pending_fields(table, row["id"])
+        if not pending:
+            return row
+        merged = dict(row)
+        merged.update(pending)
+        return merged
+
+    def _stored(self, column: str, value):
+        return self.codec.encode(self._get_conn(), value) if column in COMPRESSED_COLUMNS else value
+
+    def flush(self, keys=None) -> dict:
+        """
+        Write pending edits (all, or only `keys`) in one transaction.
+        Returns {key: current_version} for edits dropped because the row changed elsewhere.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if keys is None:
+                    batch, self._pending = self._pending, {}
+                else:
+                    batch = {key: self._pending.pop(key) for key in keys if key in self._pending}
+            if not batch:
+                return {}
+
+            started = time.perf_counter()
+            conflicts = {}
+            conn = self._get_conn()
+            try:
+                for (table, row_id), entry in batch.items():
+                    columns = list(entry["fields"])
+                    assignments = ", ".join(f"{column} = ?" for column in columns)
+                    if entry["base_version"] is None:
+                        version_sql, version_params = "version = version + 1", ()
+                    else:
+                        version_sql, version_params = "version = ?", (entry["version"],)
+                    cursor = conn.execute(
+                        f"""
+                        UPDATE {table}
+                        SET {assignments}, {version_sql}, updated_at = CURRENT_TIMESTAMP
+                        WHERE id = ? AND (? IS NULL OR version = ?)
+                        """,
+                        (*[self._stored(c, entry["fields"][c]) for c in columns], *version_params,
+                         row_id, entry["base_version"], entry["base_version"]),
+                    )
+                    if cursor.rowcount == 0:
+                        row = conn.execute(f"SELECT version FROM {table} WHERE id = ?", (row_id,)).fetchone()
+                        if row is not None:
+                            conflicts[(table, row_id)] = (row[0], entry["version"])
+                conn.commit()
+            except sqlite3.Error as e:
+                conn.rollback()
+                # Put the edits back (newer puts win) so the next flush retries them
+                with self._lock:
+                    for key, entry in batch.items():
+                        newer = self._pending.get(key)
+                        if newer is not None:
+                            entry["fields"].update(newer["fields"])
+                            entry["version"] = newer["version"]
+                        self._pending[key] = entry
+                print(f"Autosave flush failed, will retry: {str(e)}")
+                raise
+
+            with self._lock:
+                self._conflicts.update(conflicts)
+                self._stats["flushes"] += 1
+                self._stats["rows_written"] += len(batch) - len(conflicts)
+                self._stats["conflicts"] += len(conflicts)
+                self._stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            for (table, row_id), (version, _) in conflicts.items():
+                print(f"Autosave dropped an edit to {table} {row_id}: changed elsewhere (now version {version})")
+            return {key: version for key, (version, _) in conflicts.items()}
+
+    def save_now(self, table: str, row_id: int, fields: dict, expected_version: int = None):
+        """Explicit save: buffer the edit and write this row immediately. Returns its new version."""
+        version = self.put(table, row_id, fields, expected_version)
+        key = (table, int(row_id))
+        conflicts = self.flush([key])
+        if key in conflicts:
+            with self._lock:
+                self._conflicts.pop(key, None)
+            raise VersionConflict(table, row_id, conflicts[key])
+        if version is None:
+            row = self._get_conn().execute(f"SELECT version FROM {table} WHERE id = ?", (int(row_id),)).fetchone()
+            version = row[0] if row else None
+        return version
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Autosave flush error: {str(e)}")
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="autosave-flush", daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """Stop the flush thread and write whatever is still pending."""
+        self._stop.set()
+        self.flush()
+
+    def status(self) -> dict:
+        with self._lock:
+            return dict(self._stats, pending=len(self._pending), interval=self.interval)
+
+
+autosave_buffer = AutosaveBuffer()
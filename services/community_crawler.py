@@ -0,0 +1,165 @@
+import time
+import hashlib
+import threading
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import CRAWLER_PAGE_FIELDS, CRAWLER_CONCURRENCY, CRAWLER_HOST_DELAY, ROBOTS_MAX_CRAWL_DELAY
+from services.scraping_service import robots_allows, robots_crawl_delay, fetch_page, extract_page
+from services.page_store import page_store
+
+
+def community_pages(community: dict) -> list:
+    """The (page_type, url) pairs worth crawling for a community record."""
+    pages = []
+    seen = set()
+    for field in CRAWLER_PAGE_FIELDS:
+        url = (community.get(field) or "").strip()
+        if url.startswith(("http://", "https://")) and url not in seen:
+            seen.add(url)
+            pages.append((field, url))
+    return pages
+
+
+class CommunityCrawler:
+    """
+    Fetches community website pages concurrently and stores their extracted text.
+    Refreshes are conditional: a 304 or an identical body skips parsing, and only
+    pages whose text changed count as "ok" (the rest count as "unchanged").
+    Pages are grouped by host: hosts are crawled in parallel, but each host sees
+    one request at a time with at least `host_delay` seconds (or the host's
+    robots.txt Crawl-delay, if longer) between requests, even across overlapping
+    crawls. Pages disallowed by robots.txt are recorded but never fetched.
+    """
+    def __init__(self, store=page_store, max_workers: int = CRAWLER_CONCURRENCY, host_delay: float = CRAWLER_HOST_DELAY):
+        self.store = store
+        self.host_delay = host_delay
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crawler")
+        self._lock = threading.Lock()
+        self._host_locks = {}
+        self._next_request_at = {}
+        self._in_flight = set()
+        self._extract_stats = {"pages": 0, "total_ms": 0.0, "max_ms": 0.0, "peak_kb": 0}
+
+    def _host_lock(self, host: str) -> threading.Lock:
+        with self._lock:
+            return self._host_locks.setdefault(host, threading.Lock())
+
+    def _wait_for_host(self, host: str) -> None:
+        delay = self._next_request_at.get(host, 0) - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _record_extraction(self, url: str, extracted: dict) -> None:
+        with self._lock:
+            stats = self._extract_stats
+            stats["pages"] += 1
+            stats["total_ms"] += extracted["elapsed_ms"]
+            stats["max_ms"] = max(stats["max_ms"], extracted["elapsed_ms"])
+            stats["peak_kb"] = max(stats["peak_kb"], extracted["peak_bytes"] // 1024)
+        if extracted["truncated"]:
+            print(f"Extraction of {url} hit its limits after {extracted['elapsed_ms']}ms; text is partial")
+
+    def _crawl_page(self, community_id: int, page_type: str, url: str) -> str:
+        try:
+            previous = self.store.get_validators(url)
+            if not previous.get("has_text"):
+                # Nothing stored to fall back on: always fetch the full page
+                previous = {}
+            status_code, html, _, validators = fetch_page(
+                url, etag=previous.get("etag"), last_modified=previous.get("last_modified")
+            )
+            if status_code == 304:
+                self.store.mark_unchanged(url, **validators)
+                return "unchanged"
+            if status_code != 200:
+                self.store.save(url, community_id, page_type, "error", error=f"HTTP {status_code}")
+                return "error"
+            if html is None:
+                self.store.save(url, community_id, page_type, "skipped", error="Not an HTML page")
+                return "skipped"
+            body_hash = hashlib.sha256(html.encode("utf-8")).hexdigest()
+            if body_hash == previous.get("body_hash"):
+                # Same bytes as last time: skip parsing entirely
+                self.store.mark_unchanged(url, **validators)
+                return "unchanged"
+            extracted = extract_page(html)
+            self._record_extraction(url, extracted)
+            changed = self.store.save(
+                url, community_id, page_type, "ok", text=extracted["text"], body_hash=body_hash, **validators
+            )
+            return "ok" if changed else "unchanged"
+        except Exception as e:
+            self.store.save(url, community_id, page_type, "error", error=str(e))
+            return "error"
+
+    def _crawl_host(self, host: str, pages: list) -> dict:
+        counts = {"ok": 0, "unchanged": 0, "error": 0, "skipped": 0, "disallowed": 0}
+        with self._host_lock(host):
+            delay = self.host_delay
+            crawl_delay = robots_crawl_delay(pages[0][2])
+            if crawl_delay:
+                delay = max(delay, min(crawl_delay, ROBOTS_MAX_CRAWL_DELAY))
+            for community_id, page_type, url in pages:
+                if not robots_allows(url):
+                    self.store.save(url, community_id, page_type, "disallowed", error="Disallowed by robots.txt")
+                    counts["disallowed"] += 1
+                    continue
+                self._wait_for_host(host)
+                try:
+                    counts[self._crawl_page(community_id, page_type, url)] += 1
+                finally:
+                    self._next_request_at[host] = time.time() + delay
+        return counts
+
+    def crawl(self, communities: list) -> dict:
+        """Crawl the pages of the given community records. Blocks until done; returns counts."""
+        by_host = {}
+        for community in communities:
+            for page_type, url in community_pages(community):
+                host = urlparse(url).netloc.lower()
+                by_host.setdefault(host, []).append((community["id"], page_type, url))
+
+        started = time.time()
+        summary = {"communities": len(communities), "hosts": len(by_host), "ok": 0, "unchanged": 0, "error": 0, "skipped": 0, "disallowed": 0}
+        futures = [self._executor.submit(self._crawl_host, host, pages) for host, pages in by_host.items()]
+        for future in futures:
+            for key, value in future.result().items():
+                summary[key] += value
+        summary["elapsed"] = round(time.time() - started, 1)
+        print(f"Community crawl finished: {summary}")
+        return summary
+
+    def extraction_stats(self) -> dict:
+        """Text extraction cost since startup: pages parsed, total/max time and peak buffer size."""
+        with self._lock:
+            stats = dict(self._extract_stats)
+        stats["total_ms"] = round(stats["total_ms"], 1)
+        return stats
+
+    def crawl_in_background(self, communities: list) -> bool:
+        """Start a crawl in a daemon thread unless these communities are already being crawled."""
+        ids = {c["id"] for c in communities}
+        with self._lock:
+            if not ids or ids <= self._in_flight:
+                return False
+            self._in_flight |= ids
+
+        def _run():
+            try:
+                self.crawl(communities)
+            except Exception as e:
+                print(f"Community crawl failed: {str(e)}")
+            finally:
+                with self._lock:
+                    self._in_flight -= ids
+
+        threading.Thread(target=_run, daemon=True).start()
+        return True
+
+
+community_crawler = CommunityCrawler()
+
+
+def crawl_all_communities(comm_manager) -> dict:
+    """Scheduled job: refresh the stored pages of every community."""
+    return community_crawler.crawl(comm_manager.get_communities())
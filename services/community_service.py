@@ -113,4 +113,17 @@ def get_care_area_details(comm_manager, community_id, selected_care_areas):
             print(f"Skipped care area '{care_area_name}' due to lack of data")
 
     # Join all care area details with a newline
-    return "\n".join(detailed_care_areas)
\ No newline at end of file
+    return "\n".join(detailed_care_areas)
+
+def get_site_content_text(page_store, community_id, max_chars_per_page):
+    """Format the stored text of a community's crawled web pages for prompts."""
+    sections = []
+    for page in page_store.get_community_pages(community_id):
+        text = (page.get("text") or "").strip()
+        if not text:
+            continue
+        if len(text) > max_chars_per_page:
+            text = text[:max_chars_per_page].rsplit(" ", 1)[0] + "..."
+        title = page["page_type"].replace("_", " ").title()
+        sections.append(f"#### {title} ({page['url']})\n{text}\n")
+    return "\n".join(sections)
@@ -0,0 +1,167 @@
+import os
+import time
+import sqlite3
+import threading
+from config.settings import (
+    DATABASE_PATH, MAINTENANCE_QUIET_SECONDS, DB_VACUUM_MIN_FREE_PAGES, DB_VACUUM_STEP_PAGES, DB_STATS_TTL,
+)
+from database.connection import connect
+from database.database_manager import DatabaseManager
+
+_stats_lock = threading.Lock()
+_stats_cache = {"at": 0.0, "value": None}
+
+
+def _connect():
+    # Autocommit: VACUUM, checkpoints and incremental_vacuum can't run inside a transaction
+    return connect(DATABASE_PATH, timeout=10, isolation_level=None)
+
+
+def _last_write() -> float:
+    """Latest modification time of the DB file and its WAL; every commit touches one of them."""
+    last_write = 0.0
+    for path in (DATABASE_PATH, DATABASE_PATH + "-wal"):
+        try:
+            last_write = max(last_write, os.path.getmtime(path))
+        except OSError:
+            pass
+    return last_write
+
+
+def database_is_quiet(quiet_seconds: float = MAINTENANCE_QUIET_SECONDS) -> bool:
+    """True if nothing has been written for `quiet_seconds`, judged across all workers."""
+    return time.time() - _last_write() >= quiet_seconds
+
+
+def sweep_orphans() -> dict:
+    """
+    Delete keywords and articles left behind by project and article deletes
+    made before foreign keys were enforced. Returns rows removed per table.
+    """
+    db = DatabaseManager()
+    try:
+        removed = db.sweep_orphans()
+    finally:
+        db.conn.close()
+    if any(removed.values()):
+        print(f"Orphan sweep removed {removed}")
+    return removed
+
+
+def optimize_database() -> dict:
+    """
+    Keep query planner statistics current: a full ANALYZE the first time (no
+    statistics yet), PRAGMA optimize afterwards, which re-analyzes only the
+    tables whose contents have changed enough to matter.
+    """
+    conn = _connect()
+    try:
+        started = time.perf_counter()
+        has_stats = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+        ).fetchone()
+        if has_stats:
+            conn.execute("PRAGMA optimize")
+        else:
+            conn.execute("ANALYZE")
+        return {"mode": "optimize" if has_stats else "analyze",
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+    finally:
+        conn.close()
+
+
+def incremental_vacuum(min_free_pages: int = DB_VACUUM_MIN_FREE_PAGES, step_pages: int = DB_VACUUM_STEP_PAGES) -> dict:
+    """
+    Return free pages to the filesystem, `step_pages` at a time so no single
+    write lock is held for long. Small free lists are left alone for reuse.
+    Needs auto_vacuum = INCREMENTAL (set by setup_database).
+    """
+    conn = _connect()
+    try:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            return {"freed_pages": 0, "skipped": "auto_vacuum is not incremental"}
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if free_pages < min_free_pages:
+            return {"freed_pages": 0, "free_pages": free_pages}
+        freed = 0
+        while freed < free_pages:
+            if freed and _last_write() > own_write:
+                # Someone else wrote since our last step: leave the rest for the next run
+                break
+            # The pragma frees one page per result row it steps through; executescript runs it
+            # to completion (execute() would stop after the first page)
+            conn.executescript(f"PRAGMA incremental_vacuum({step_pages})")
+            own_write = _last_write()
+            remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if remaining >= free_pages - freed:
+                break
+            freed = free_pages - remaining
+        return {"freed_pages": freed, "free_pages": free_pages - freed}
+    finally:
+        conn.close()
+
+
+def checkpoint_wal() -> dict:
+    """
+    Copy the WAL back into the database file and truncate it. Run in quiet
+    periods: readers in the middle of a transaction make the checkpoint
+    partial, and it is retried next time.
+    """
+    conn = _connect()
+    try:
+        if conn.execute("PRAGMA journal_mode").fetchone()[0] != "wal":
+            return {"skipped": "not in WAL mode"}
+        busy, wal_pages, checkpointed = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        return {"busy": bool(busy), "wal_pages": wal_pages, "checkpointed_pages": checkpointed}
+    finally:
+        conn.close()
+
+
+def _object_sizes(conn) -> dict:
+    """Bytes used by each table and index (dbstat), or None if SQLite was built without it."""
+    try:
+        rows = conn.execute(
+            """
+            SELECT s.name, COALESCE(m.type, 'table'), SUM(s.pgsize)
+            FROM dbstat s LEFT JOIN sqlite_master m ON m.name = s.name
+            GROUP BY s.name
+            ORDER BY SUM(s.pgsize) DESC
+            """
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return None
+    sizes = {"tables": {}, "indexes": {}}
+    for name, kind, size in rows:
+        sizes["indexes" if kind == "index" else "tables"][name] = size
+    return sizes
+
+
+def database_stats(max_age: float = DB_STATS_TTL) -> dict:
+    """
+    File size, free pages and per-table/index sizes for the metrics view.
+    Measuring object sizes reads every page, so results are cached for `max_age` seconds.
+    """
+    with _stats_lock:
+        if _stats_cache["value"] is not None and time.time() - _stats_cache["at"] < max_age:
+            return _stats_cache["value"]
+        conn = _connect()
+        try:
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            stats = {
+                "file_bytes": os.path.getsize(DATABASE_PATH),
+                "wal_bytes": os.path.getsize(DATABASE_PATH + "-wal") if os.path.exists(DATABASE_PATH + "-wal") else 0,
+                "journal_mode": conn.execute("PRAGMA journal_mode").fetchone()[0],
+                "auto_vacuum": {0: "none", 1: "full", 2: "incremental"}.get(conn.execute("PRAGMA auto_vacuum").fetchone()[0]),
+                "page_size": page_size,
+                "page_count": page_count,
+                "free_pages": free_pages,
+                "free_bytes": free_pages * page_size,
+                "sizes": _object_sizes(conn),
+                "measured_at": time.time(),
+            }
+        finally:
+            conn.close()
+        _stats_cache.update(at=time.time(), value=stats)
+        return stats
@@ -0,0 +1,182 @@
+import re
+import threading
+from config.settings import KEYWORD_CLUSTER_NUM_PERM, KEYWORD_CLUSTER_BANDS, KEYWORD_CLUSTER_THRESHOLD
+from database.database_manager import DatabaseManager
+from utils.minhash import MinHasher, LSHIndex, jaccard
+
+STOPWORDS = {"a", "an", "and", "the", "for", "of", "in", "on", "to", "with", "at", "by", "or", "is", "are"}
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+def _stem(token: str) -> str:
+    """Very light plural folding: communities -> community, homes -> home."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def normalize_tokens(phrase: str) -> list:
+    """Lower-case, strip punctuation and stopwords, fold plurals and sort the tokens."""
+    tokens = _NON_WORD_RE.sub(" ", phrase.lower()).split()
+    folded = {_stem(t) for t in tokens if t not in STOPWORDS}
+    return sorted(folded or {_stem(t) for t in tokens})
+
+
+class KeywordClusterIndex:
+    """
+    In-memory MinHash/LSH index over the keywords of every project.
+    Keywords that normalise to the same tokens share one entry. The index follows
+    the keywords table incrementally: each lookup compares a cheap fingerprint and
+    only fetches added rows / drops removed ones when it has changed.
+    """
+    def __init__(self, num_perm: int = KEYWORD_CLUSTER_NUM_PERM, bands: int = KEYWORD_CLUSTER_BANDS,
+                 threshold: float = KEYWORD_CLUSTER_THRESHOLD):
+        self.threshold = threshold
+        self._hasher = MinHasher(num_perm)
+        self._lsh = LSHIndex(num_perm, bands)
+        self._lock = threading.Lock()
+        self._fingerprint = None
+        self._keys = {}        # keyword id -> phrase key
+        self._entries = {}     # phrase key -> (token set, signature)
+        self._members = {}     # phrase key -> {keyword id: keyword dict}
+        self._groups = None    # cached connected components, reset on change
+
+    def _add(self, row) -> None:
+        tokens = normalize_tokens(row["keyword"])
+        key = " ".join(tokens)
+        if key not in self._entries:
+            token_set = set(tokens)
+            signature = self._hasher.signature(token_set)
+            self._entries[key] = (token_set, signature)
+            self._lsh.add(key, signature)
+            self._members[key] = {}
+        self._members[key][row["id"]] = {
+            "id": row["id"],
+            "project_id": row["project_id"],
+            "keyword": row["keyword"],
+            "search_volume": row["search_volume"],
+        }
+        self._keys[row["id"]] = key
+
+    def _remove(self, keyword_id: int) -> None:
+        key = self._keys.pop(keyword_id)
+        members = self._members[key]
+        members.pop(keyword_id, None)
+        if not members:
+            self._lsh.remove(key, self._entries[key][1])
+            del self._members[key]
+            del self._entries[key]
+
+    def _sync(self, db: DatabaseManager) -> None:
+        fingerprint = db.get_keywords_fingerprint()
+        if fingerprint == self._fingerprint:
+            return
+        current = db.get_keyword_ids()
+        for keyword_id in self._keys.keys() - current:
+            self._remove(keyword_id)
+        for row in db.get_keywords_by_ids(current - self._keys.keys()):
+            self._add(row)
+        self._fingerprint = fingerprint
+        self._groups = None
+
+    def similar(self, db: DatabaseManager, phrase: str, exclude_project_id: int = None) -> list:
+        """Stored keywords near-identical to `phrase`, most similar first."""
+        tokens = normalize_tokens(phrase)
+        key = " ".join(tokens)
+        token_set = set(tokens)
+        with self._lock:
+            self._sync(db)
+            signature = self._entries[key][1] if key in self._entries else self._hasher.signature(token_set)
+            results = []
+            for candidate in self._lsh.candidates(signature):
+                score = jaccard(token_set, self._entries[candidate][0])
+                if score < self.threshold:
+                    continue
+                results.extend(
+                    dict(member, similarity=round(score, 2))
+                    for member in self._members[candidate].values()
+                    if member["project_id"] != exclude_project_id
+                )
+        results.sort(key=lambda m: (-m["similarity"], m["keyword"].lower()))
+        return results
+
+    def _components(self) -> list:
+        """Connected components of verified LSH matches, as lists of phrase keys."""
+        parent = {key: key for key in self._entries}
+
+        def find(key):
+            while parent[key] != key:
+                parent[key] = parent[parent[key]]
+                key = parent[key]
+            return key
+
+        for bucket in self._lsh.buckets():
+            if len(bucket) < 2:
+                continue
+            keys = list(bucket)
+            for i, a in enumerate(keys):
+                tokens_a = self._entries[a][0]
+                for b in keys[i + 1:]:
+                    root_a, root_b = find(a), find(b)
+                    # Only verify pairs that would merge two clusters
+                    if root_a != root_b and jaccard(tokens_a, self._entries[b][0]) >= self.threshold:
+                        parent[root_b] = root_a
+
+        groups = {}
+        for key in self._entries:
+            groups.setdefault(find(key), []).append(key)
+        return list(groups.values())
+
+    def clusters(self, db: DatabaseManager, min_projects: int = 2) -> list:
+        """Near-duplicate keyword clusters that span at least `min_projects` projects."""
+        with self._lock:
+            self._sync(db)
+            if self._groups is None:
+                self._groups = self._components()
+            groups = [
+                [member for key in keys for member in self._members[key].values()]
+                for keys in self._groups
+            ]
+
+        clusters = []
+        for members in groups:
+            project_ids = sorted({m["project_id"] for m in members})
+            if len(project_ids) < min_projects:
+                continue
+            members.sort(key=lambda m: -(m["search_volume"] or 0))
+            clusters.append({
+                "label": members[0]["keyword"],
+                "project_ids": project_ids,
+                "keywords": members,
+            })
+        clusters.sort(key=lambda c: (-len(c["project_ids"]), c["label"].lower()))
+        return clusters
+
+    def overlap_report(self, db: DatabaseManager) -> dict:
+        """Keyword clusters shared between projects, plus the project pairs that overlap most."""
+        clusters = self.clusters(db)
+        project_names = {p["id"]: p["name"] for p in db.get_all_projects()}
+        pairs = {}
+        for cluster in clusters:
+            cluster["projects"] = [
+                {"id": pid, "name": project_names.get(pid)} for pid in cluster.pop("project_ids")
+            ]
+            ids = [p["id"] for p in cluster["projects"]]
+            for i, a in enumerate(ids):
+                for b in ids[i + 1:]:
+                    pairs.setdefault((a, b), []).append(cluster["label"])
+        project_pairs = [
+            {
+                "projects": [{"id": a, "name": project_names.get(a)}, {"id": b, "name": project_names.get(b)}],
+                "shared_clusters": len(labels),
+                "examples": labels[:5],
+            }
+            for (a, b), labels in pairs.items()
+        ]
+        project_pairs.sort(key=lambda p: -p["shared_clusters"])
+        return {"clusters": clusters, "project_pairs": project_pairs}
+
+
+keyword_cluster_index = KeywordClusterIndex()
@@ -0,0 +1,199 @@
+import re
+import time
+import threading
+from collections import OrderedDict
+from utils.aho_corasick import AhoCorasick
+
+# A run of whitespace and hyphens reads as a single space, so "senior-living", a keyword
+# broken across lines and "senior   living" all match "senior living".
+_SEPARATOR_RUN_RE = re.compile(r"[\s\-‐‑–]+")
+_WORD_RE = re.compile(r"\w+")
+MAX_POSITIONS = 20
+
+
+def _normalize_text(text: str):
+    """
+    Lower-case `text` and collapse each separator run to one space. Returns the
+    normalised text and, for each of its characters, its offset in `text`.
+    """
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # A few characters lower-case to two; keep offsets aligned with the original
+        lowered = "".join(c.lower()[0] for c in text)
+    parts = []
+    offsets = []
+    last = 0
+    for run in _SEPARATOR_RUN_RE.finditer(lowered):
+        parts.append(lowered[last:run.start()])
+        offsets.extend(range(last, run.start()))
+        parts.append(" ")
+        offsets.append(run.start())
+        last = run.end()
+    parts.append(lowered[last:])
+    offsets.extend(range(last, len(lowered)))
+    return "".join(parts), offsets
+
+
+def normalize_keyword(keyword: str) -> str:
+    return _normalize_text(keyword)[0].strip()
+
+
+def _unique_keywords(keywords) -> OrderedDict:
+    """Normalised keyword -> keyword as entered, first occurrence wins."""
+    unique = OrderedDict()
+    for keyword in keywords:
+        normalized = normalize_keyword(keyword or "")
+        if normalized and normalized not in unique:
+            unique[normalized] = keyword.strip()
+    return unique
+
+
+def _split_blocks(content: str):
+    """Yield (offset, block) for each paragraph (blocks separated by a blank line)."""
+    offset = 0
+    for block in content.split("\n\n"):
+        yield offset, block
+        offset += len(block) + 2
+
+
+class KeywordCoverageAnalyzer:
+    """
+    Scans article content for all project keywords at once with an Aho-Corasick automaton.
+    Automata are cached per keyword set, and matches are cached per paragraph, so an
+    autosave only rescans the paragraphs that changed since the last analysis.
+    """
+    def __init__(self, max_automata: int = 32, max_blocks: int = 4096):
+        self.max_automata = max_automata
+        self.max_blocks = max_blocks
+        self._automata = OrderedDict()
+        self._blocks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _automaton(self, patterns: tuple) -> AhoCorasick:
+        with self._lock:
+            automaton = self._automata.get(patterns)
+            if automaton is not None:
+                self._automata.move_to_end(patterns)
+                return automaton
+        automaton = AhoCorasick(patterns)
+        with self._lock:
+            self._automata[patterns] = automaton
+            while len(self._automata) > self.max_automata:
+                self._automata.popitem(last=False)
+        return automaton
+
+    def _scan_block(self, patterns: tuple, automaton: AhoCorasick, block: str):
+        """Return (word_count, [(start, pattern_index), ...]) for one paragraph."""
+        cache_key = (patterns, block)
+        with self._lock:
+            cached = self._blocks.get(cache_key)
+            if cached is not None:
+                self._blocks.move_to_end(cache_key)
+                return cached
+
+        text, offsets = _normalize_text(block)
+        matches = []
+        for start, end, index in automaton.iter_matches(text):
+            # Whole words only: "care" must not match inside "careful"
+            if start > 0 and text[start - 1].isalnum():
+                continue
+            if end < len(text) and text[end].isalnum():
+                continue
+            matches.append((offsets[start], index))
+        result = (len(_WORD_RE.findall(block)), matches)
+
+        with self._lock:
+            self._blocks[cache_key] = result
+            while len(self._blocks) > self.max_blocks:
+                self._blocks.popitem(last=False)
+        return result
+
+    def analyze(self, content: str, keywords: list) -> dict:
+        """
+        Report, for each keyword, how often and where it appears in `content`
+        and its density (share of the article's words), plus the missing keywords.
+        """
+        started = time.perf_counter()
+        display = _unique_keywords(keywords)
+        patterns = tuple(display)
+
+        positions = [[] for _ in patterns]
+        word_count = 0
+        if patterns and content:
+            automaton = self._automaton(patterns)
+            for offset, block in _split_blocks(content):
+                block_words, matches = self._scan_block(patterns, automaton, block)
+                word_count += block_words
+                for start, index in matches:
+                    positions[index].append(offset + start)
+        elif content:
+            word_count = len(_WORD_RE.findall(content))
+
+        results = []
+        for index, pattern in enumerate(patterns):
+            count = len(positions[index])
+            keyword_words = len(pattern.split())
+            results.append({
+                "keyword": display[pattern],
+                "count": count,
+                "positions": positions[index][:MAX_POSITIONS],
+                "density": round(100.0 * count * keyword_words / word_count, 2) if word_count else 0.0,
+            })
+
+        missing = [r["keyword"] for r in results if r["count"] == 0]
+        total = len(results)
+        return {
+            "word_count": word_count,
+            "keywords": results,
+            "missing": missing,
+            "covered": total - len(missing),
+            "total": total,
+            "coverage": round(100.0 * (total - len(missing)) / total, 1) if total else None,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def analyze_project(self, db, project_id: int) -> dict:
+        """
+        Batch mode: coverage of the project's keywords across all of its base and
+        community articles, built on one automaton and one scan per article.
+        """
+        started = time.perf_counter()
+        keywords = [k["keyword"] for k in db.get_project_keywords(project_id)]
+        articles = []
+        for article in db.get_all_articles_for_project(project_id):
+            articles.append(("base", article["id"], None, article["article_title"], article["article_content"]))
+        for article in db.get_community_articles_for_project(project_id):
+            articles.append((
+                "community", article["id"], article["base_article_id"],
+                article["article_title"], article["article_content"],
+            ))
+
+        report = []
+        used = set()
+        for kind, article_id, base_article_id, title, content in articles:
+            result = self.analyze(content or "", keywords)
+            used.update(k["keyword"] for k in result["keywords"] if k["count"])
+            report.append({
+                "type": kind,
+                "id": article_id,
+                "base_article_id": base_article_id,
+                "title": title,
+                "word_count": result["word_count"],
+                "covered": result["covered"],
+                "total": result["total"],
+                "coverage": result["coverage"],
+                "missing": result["missing"],
+                "keywords": result["keywords"],
+            })
+
+        unique_keywords = list(_unique_keywords(keywords).values())
+        return {
+            "project_id": project_id,
+            "keywords": len(unique_keywords),
+            "articles": report,
+            "unused_keywords": [k for k in unique_keywords if k not in used],
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+
+keyword_coverage = KeywordCoverageAnalyzer()
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta, timezone
+from config.settings import (
+    KEYWORD_REFRESH_STALE_DAYS, KEYWORD_REFRESH_ACTIVE_DAYS, KEYWORD_REFRESH_BATCH_SIZE,
+    KEYWORD_REFRESH_MAX_UNITS, SEMRUSH_UNITS_PER_PHRASE_THESE_LINE, SEMRUSH_BUDGET_REDUCE_AT,
+)
+from database.database_manager import DatabaseManager
+from services.semrush_service import query_phrase_these, INTENT_NAMES
+from services.semrush_usage import semrush_usage
+
+
+def _timestamp(days_ago: int) -> str:
+    # UTC, to compare with the CURRENT_TIMESTAMP values SQLite stores
+    return (datetime.now(timezone.utc) - timedelta(days=days_ago)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def refresh_keyword_metrics(max_units: int = KEYWORD_REFRESH_MAX_UNITS, database: str = "us") -> dict:
+    """
+    Re-query SEMrush metrics for stored keywords whose data is stale.
+    Works in phrase_these batches, stops before exceeding `max_units`,
+    and writes each batch back in a single transaction.
+    Never spends past the point where interactive research starts to degrade.
+    """
+    remaining = semrush_usage.remaining_units(SEMRUSH_BUDGET_REDUCE_AT)
+    if remaining is not None:
+        max_units = min(max_units, remaining)
+    if max_units < SEMRUSH_UNITS_PER_PHRASE_THESE_LINE:
+        return {"phrases": 0, "rows_updated": 0, "units": 0, "errors": 0, "skipped": "unit budget"}
+
+    db = DatabaseManager()
+    max_phrases = max_units // SEMRUSH_UNITS_PER_PHRASE_THESE_LINE
+    phrases = db.get_keywords_due_for_refresh(
+        stale_before=_timestamp(KEYWORD_REFRESH_STALE_DAYS),
+        active_since=_timestamp(KEYWORD_REFRESH_ACTIVE_DAYS),
+        limit=max_phrases,
+    )
+
+    summary = {"phrases": 0, "rows_updated": 0, "units": 0, "errors": 0}
+    for start in range(0, len(phrases), KEYWORD_REFRESH_BATCH_SIZE):
+        batch = phrases[start:start + KEYWORD_REFRESH_BATCH_SIZE]
+        try:
+            results = query_phrase_these(batch, database=database, priority="batch")
+        except Exception as e:
+            print(f"Keyword refresh batch failed: {str(e)}")
+            summary["errors"] += 1
+            break
+
+        metrics = []
+        for phrase in batch:
+            row = results.get(phrase)
+            if row is None:
+                # Not found: keep old metrics, but don't retry until it is stale again
+                metrics.append((phrase, None, None, None))
+                continue
+            intents = ", ".join(INTENT_NAMES.get(i, str(i)) for i in row.get("In", [])) or None
+            metrics.append((phrase, row.get("Nq"), intents, row.get("Kd")))
+
+        summary["rows_updated"] += db.update_keyword_metrics(metrics)
+        summary["phrases"] += len(batch)
+        summary["units"] += len(results) * SEMRUSH_UNITS_PER_PHRASE_THESE_LINE
+
+    db.conn.close()
+    return summary
@@ -0,0 +1,143 @@
+import uuid
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from config.settings import SEMRUSH_BULK_CONCURRENCY, SEMRUSH_BULK_MAX_SEEDS
+from services.semrush_service import get_keyword_suggestions
+from services.semrush_cache import normalize_phrase
+
+
+def keyword_score(item: dict) -> float:
+    """Rank higher volume and lower difficulty first."""
+    volume = item.get("Nq") or 0
+    difficulty = item.get("Kd") or 0
+    return volume * (100 - min(difficulty, 100)) / 100
+
+
+def merge_research_results(results_by_seed: dict) -> list:
+    """
+    Merge per-seed SEMrush results, deduplicating phrases across seeds.
+    Each merged row records which seeds produced it. Sorted best-first.
+    """
+    merged = {}
+    for seed, result in results_by_seed.items():
+        rows = list(result.get("seed_phrase_results") or []) + list(result.get("lookup_results") or [])
+        for row in rows:
+            phrase = row.get("Ph")
+            if not phrase:
+                continue
+            key = normalize_phrase(phrase)
+            if key not in merged:
+                merged[key] = dict(row, seeds=[seed])
+            elif seed not in merged[key]["seeds"]:
+                merged[key]["seeds"].append(seed)
+    ranked = list(merged.values())
+    for row in ranked:
+        row["score"] = round(keyword_score(row), 1)
+    ranked.sort(key=lambda r: (-r["score"], r.get("Kd") or 0, r["Ph"]))
+    return ranked
+
+
+class BulkResearchJobs:
+    """
+    Runs multi-seed keyword research in the background with bounded concurrency.
+    Jobs are kept in memory for the lifetime of the worker process.
+    """
+    def __init__(self, max_workers: int = SEMRUSH_BULK_CONCURRENCY, max_jobs: int = 50):
+        self.max_workers = max_workers
+        self.max_jobs = max_jobs
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def start(self, seeds: list, database: str = "us", lookup_type: str = "phrase_related", project_id: int = None) -> str:
+        # Dedupe seeds while keeping their order
+        unique_seeds = []
+        seen = set()
+        for seed in seeds:
+            key = normalize_phrase(seed)
+            if key and key not in seen:
+                seen.add(key)
+                unique_seeds.append(seed.strip())
+        if not unique_seeds:
+            raise ValueError("No seed keywords provided")
+        if len(unique_seeds) > SEMRUSH_BULK_MAX_SEEDS:
+            raise ValueError(f"Too many seed keywords (max {SEMRUSH_BULK_MAX_SEEDS})")
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "status": "running",
+            "seeds": unique_seeds,
+            "completed": 0,
+            "errors": {},
+            "results": [],
+            "started_at": datetime.now().isoformat(),
+            "finished_at": None,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            self._trim()
+
+        threading.Thread(
+            target=self._run, args=(job, database, lookup_type, project_id), daemon=True
+        ).start()
+        return job_id
+
+    def _run(self, job: dict, database: str, lookup_type: str, project_id: int = None) -> None:
+        results_by_seed = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bulk-research") as executor:
+                futures = {
+                    executor.submit(
+                        get_keyword_suggestions, seed, database, lookup_type,
+                        priority="batch", project_id=project_id,
+                    ): seed
+                    for seed in job["seeds"]
+                }
+                for future in as_completed(futures):
+                    seed = futures[future]
+                    try:
+                        result = future.result()
+                        error = result.get("error") if result.get("error") != "No data returned" else None
+                    except Exception as e:
+                        result, error = None, str(e)
+                    if not error:
+                        results_by_seed[seed] = result
+                    # Job state is read by get() from request threads; change it under the lock
+                    with self._lock:
+                        if error:
+                            job["errors"][seed] = error
+                        job["completed"] += 1
+            merged = merge_research_results(results_by_seed)
+            with self._lock:
+                job["results"] = merged
+                job["status"] = "completed"
+        except Exception as e:
+            with self._lock:
+                job["status"] = "failed"
+                job["errors"]["_job"] = str(e)
+        finally:
+            with self._lock:
+                job["finished_at"] = datetime.now().isoformat()
+
+    def get(self, job_id: str) -> dict:
+        """Snapshot of a job, safe to serialize while the job keeps running."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = dict(job)
+            snapshot["seeds"] = list(job["seeds"])
+            snapshot["errors"] = dict(job["errors"])
+            snapshot["results"] = list(job["results"])
+            return snapshot
+
+    def _trim(self) -> None:
+        """Drop the oldest finished jobs beyond max_jobs."""
+        finished = [j for j in self._jobs.values() if j["status"] != "running"]
+        finished.sort(key=lambda j: j["started_at"])
+        while len(self._jobs) > self.max_jobs and finished:
+            self._jobs.pop(finished.pop(0)["id"], None)
+
+
+bulk_research_jobs = BulkResearchJobs()
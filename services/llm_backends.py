@@ -0,0 +1,155 @@
+import os
+import json
+import requests
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from config.settings import LLM_BACKENDS
+
+
+class LLMError(Exception):
+    """Base class for LLM failures. Callers must never treat these as content."""
+    retryable = False
+    http_status = 502
+
+    def __init__(self, message: str, raw_response: str = "", retry_after: float = None):
+        super().__init__(message)
+        self.raw_response = raw_response
+        self.retry_after = retry_after
+
+
+class LLMTransientError(LLMError):
+    """A failure that is worth retrying (5xx, dropped connection)."""
+    retryable = True
+
+
+class LLMRateLimitError(LLMTransientError):
+    """The provider returned 429."""
+    http_status = 503
+
+
+class LLMQueueTimeout(LLMError):
+    """Our own rate limiter had no capacity within the wait limit. Not retried:
+    the limiter already waited, so the caller should fail fast."""
+    http_status = 503
+
+
+class LLMTimeoutError(LLMTransientError):
+    """The request did not complete within the route's timeout."""
+    http_status = 504
+
+
+class LLMRequestError(LLMError):
+    """The provider rejected the request (4xx other than 429). Not retried."""
+
+
+class LLMResponseError(LLMError):
+    """The provider answered, but without usable content."""
+
+
+def parse_retry_after(value) -> float:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        delta = parsedate_to_datetime(value) - datetime.now(timezone.utc)
+        return max(0.0, delta.total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMBackend:
+    """
+    Base interface for LLM providers.
+    Subclasses implement complete() and return (content, token_usage, raw_response),
+    raising an LLMError subclass on failure.
+    """
+    def __init__(self, name: str, config: dict):
+        self.name = name
+        self.config = config
+
+    def complete(self, model: str, messages: list, max_tokens: int, timeout: float, json_mode: bool = False) -> tuple[str, dict, str]:
+        """`json_mode` asks for a JSON object response; backends without support ignore it."""
+        raise NotImplementedError
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    """
+    Chat Completions client for OpenAI and any server exposing the same API
+    (vLLM, llama.cpp server, Ollama, LiteLLM, a local stand-in for testing, ...).
+    """
+    def __init__(self, name: str, config: dict):
+        super().__init__(name, config)
+        self.base_url = config.get("base_url", "https://api.openai.com/v1").rstrip("/")
+        self.api_key = os.getenv(config.get("api_key_env", "OPENAI_API_KEY"), "")
+        # Reasoning models only accept max_completion_tokens; most local servers expect max_tokens
+        self.token_param = config.get("token_param", "max_completion_tokens")
+        self.session = requests.Session()
+
+    def complete(self, model: str, messages: list, max_tokens: int, timeout: float, json_mode: bool = False) -> tuple[str, dict, str]:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        payload = {"model": model, "messages": messages, self.token_param: max_tokens}
+        if json_mode and self.config.get("json_mode"):
+            payload["response_format"] = {"type": "json_object"}
+        try:
+            response = self.session.post(f"{self.base_url}/chat/completions", headers=headers, json=payload, timeout=timeout)
+        except requests.exceptions.Timeout as e:
+            raise LLMTimeoutError(f"{self.name} request timed out after {timeout}s", str(e))
+        except requests.exceptions.RequestException as e:
+            raise LLMTransientError(f"{self.name} request failed: {str(e)}", str(e))
+
+        if response.status_code == 429:
+            raise LLMRateLimitError(
+                f"{self.name} rate limit exceeded", response.text,
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            )
+        if response.status_code >= 500:
+            raise LLMTransientError(
+                f"{self.name} server error (HTTP {response.status_code})", response.text,
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            )
+        if response.status_code >= 400:
+            raise LLMRequestError(f"{self.name} rejected the request (HTTP {response.status_code}): {response.text}", response.text)
+
+        try:
+            response_data = response.json()
+        except ValueError:
+            raise LLMResponseError(f"{self.name} returned invalid JSON", response.text)
+        raw_response = json.dumps(response_data, indent=2)
+        if "choices" in response_data and len(response_data["choices"]) > 0:
+            content = response_data["choices"][0]["message"]["content"]
+            if not content:
+                raise LLMResponseError(f"{self.name} returned an empty response", raw_response)
+            token_usage = response_data.get("usage", {})
+            return content, token_usage, raw_response
+        raise LLMResponseError(f"Could not extract content from {self.name} response.", raw_response)
+
+
+BACKEND_TYPES = {
+    "openai_compatible": OpenAICompatibleBackend,
+}
+
+_backends = {}
+
+
+def register_backend_type(type_name: str, backend_cls) -> None:
+    """Register an additional backend implementation usable from LLM_BACKENDS."""
+    BACKEND_TYPES[type_name] = backend_cls
+
+
+def get_backend(name: str) -> LLMBackend:
+    """Return the (cached) backend instance configured under `name` in LLM_BACKENDS."""
+    if name not in _backends:
+        if name not in LLM_BACKENDS:
+            raise ValueError(f"Unknown LLM backend: {name}")
+        config = LLM_BACKENDS[name]
+        backend_cls = BACKEND_TYPES.get(config.get("type", "openai_compatible"))
+        if backend_cls is None:
+            raise ValueError(f"Unknown LLM backend type: {config.get('type')}")
+        _backends[name] = backend_cls(name, config)
+    return _backends[name]
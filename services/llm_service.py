@@ -1,64 +1,204 @@
-import os
 import json
-import requests
-from utils.json_cleaner import clean_json_response
+import time
+import random
+import threading
+from collections import deque
+from typing import NamedTuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from config.settings import (
+    MODEL_OPTIONS, LLM_TASK_ROUTES, LLM_BACKEND_OVERRIDE, LLM_RATE_LIMITS, LLM_MAX_RATE_LIMIT_WAIT,
+    LLM_RETRY, LLM_HEDGING,
+)
+from services.llm_backends import get_backend, LLMError, LLMQueueTimeout, LLMRequestError, LLMResponseError
+from services.rate_limiter import SharedRateLimiter, RateLimitTimeout
+from utils.json_extract import parse_structured, StructuredOutputError
 from utils.token_calculator import calculate_token_costs
 
-def query_chatgpt_api(message: str, conversation_history: list = None) -> tuple[str, dict, str]:
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+# Recent successful latencies per (backend, model), used for the hedging threshold
+_latencies = {}
+_latencies_lock = threading.Lock()
+_hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-hedge")
+
+
+# Structured results of JSON tasks; the annotated fields are the schema (see parse_structured)
+class TitleOutline(NamedTuple):
+    article_title: str
+    article_outline: str
+
+
+class MetaContent(NamedTuple):
+    meta_title: str
+    meta_description: str
+
+
+def get_rate_limiter(backend_name: str) -> SharedRateLimiter:
+    """Return the process-wide limiter guarding a backend."""
+    with _rate_limiters_lock:
+        if backend_name not in _rate_limiters:
+            limits = LLM_RATE_LIMITS.get(backend_name, {})
+            _rate_limiters[backend_name] = SharedRateLimiter(
+                name=f"llm:{backend_name}",
+                requests_per_minute=limits.get("requests_per_minute", 0),
+                tokens_per_minute=limits.get("tokens_per_minute", 0),
+                max_concurrency=limits.get("max_concurrency", 4),
+                batch_reserve=limits.get("batch_reserve", 0.2),
+            )
+        return _rate_limiters[backend_name]
+
+def estimate_request_tokens(messages: list, max_tokens: int) -> int:
+    """Rough token estimate (~4 chars/token) used to charge the tokens/min bucket up front."""
+    prompt_chars = sum(len(m.get("content") or "") for m in messages)
+    return prompt_chars // 4 + max_tokens
+
+def resolve_task_route(llm_model, task: str = "default") -> dict:
+    """
+    Resolve the backend, model, token limit and timeout for a task.
+    Fast tasks keep their routed model; others use the model selected in the UI.
+    Returns None if the selected model is not supported.
+    """
+    route = dict(LLM_TASK_ROUTES.get(task, LLM_TASK_ROUTES["default"]))
+    if not route.get("fast") and llm_model:
+        if llm_model not in MODEL_OPTIONS:
+            return None
+        route["model"] = MODEL_OPTIONS[llm_model]
+    if LLM_BACKEND_OVERRIDE:
+        route["backend"] = LLM_BACKEND_OVERRIDE
+    return route
+
+def query_chatgpt_api(message: str, conversation_history: list = None, task: str = "default", priority: str = "interactive") -> tuple[str, dict, str]:
     """
     Calls OpenAI's Chat Completion API (ChatGPT) with conversation history support.
-    Requires st.secrets['OPENAI_API_KEY'] to be set.
+    Requires OPENAI_API_KEY to be set.
     Returns a tuple of (response_content, token_usage, raw_response)
     """
-    url = "https://api.openai.com/v1/chat/completions"
+    route = resolve_task_route(None, task)
+    route["backend"] = "openai"
+    return _query_backend(route, message, conversation_history, priority)
+
+def record_latency(backend_name: str, model: str, seconds: float) -> None:
+    with _latencies_lock:
+        _latencies.setdefault((backend_name, model), deque(maxlen=200)).append(seconds)
+
+def latency_percentile(backend_name: str, model: str, percentile: float) -> float:
+    """Return the given latency percentile, or None until enough samples exist."""
+    with _latencies_lock:
+        samples = sorted(_latencies.get((backend_name, model), ()))
+    if len(samples) < LLM_HEDGING["min_samples"]:
+        return None
+    index = min(len(samples) - 1, int(len(samples) * percentile / 100))
+    return samples[index]
+
+def backoff_delay(attempt: int, retry_after: float = None) -> float:
+    """Exponential backoff with full jitter, never shorter than Retry-After."""
+    ceiling = min(LLM_RETRY["max_delay"], LLM_RETRY["base_delay"] * (2 ** attempt))
+    delay = random.uniform(0, ceiling)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+def _send_once(route: dict, messages: list, priority: str) -> tuple[str, dict, str]:
+    """One provider call, inside the backend's rate limits."""
+    backend = get_backend(route["backend"])
+    limiter = get_rate_limiter(route["backend"])
+    estimated_tokens = estimate_request_tokens(messages, route["max_tokens"])
     try:
-        api_key = os.getenv("OPENAI_API_KEY")
-        print(api_key)
-    except Exception:
-        return "Error: No OPENAI_API_KEY found in st.secrets.", {}, ""
-    headers = {"Content-Type": "application/json", "Authorization": f"Bearer {api_key}"}
+        with limiter.limit(estimated_tokens, priority=priority, max_wait=LLM_MAX_RATE_LIMIT_WAIT,
+                           lease_ttl=route["timeout"] + 30) as usage:
+            started = time.monotonic()
+            content, token_usage, raw_response = backend.complete(
+                route["model"], messages, route["max_tokens"], route["timeout"], json_mode=route.get("json", False)
+            )
+            record_latency(route["backend"], route["model"], time.monotonic() - started)
+            if isinstance(token_usage, dict) and "total_tokens" in token_usage:
+                usage["actual_tokens"] = token_usage["total_tokens"]
+            return content, token_usage, raw_response
+    except RateLimitTimeout as e:
+        raise LLMQueueTimeout(str(e))
+
+def _send_hedged(route: dict, messages: list, priority: str) -> tuple[str, dict, str]:
+    """
+    Send a request and, if it runs past the latency percentile, a second copy.
+    Returns whichever succeeds first; raises only if every copy failed.
+    """
+    threshold = None
+    if LLM_HEDGING["enabled"] and route.get("hedge") and priority == "interactive":
+        threshold = latency_percentile(route["backend"], route["model"], LLM_HEDGING["percentile"])
+    if threshold is None:
+        return _send_once(route, messages, priority)
+
+    pending = {_hedge_executor.submit(_send_once, route, messages, priority)}
+    done, pending = wait(pending, timeout=threshold)
+    if not done:
+        print(f"Hedging LLM request after {threshold:.1f}s ({route['backend']}/{route['model']})")
+        pending.add(_hedge_executor.submit(_send_once, route, messages, priority))
+
+    last_error = None
+    while True:
+        for future in done:
+            try:
+                return future.result()
+            except LLMError as e:
+                last_error = e
+        if not pending:
+            raise last_error
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+def _query_backend(route: dict, message: str, conversation_history: list = None, priority: str = "interactive") -> tuple[str, dict, str]:
+    """
+    Send a chat request using a resolved task route, retrying transient failures.
+    Raises an LLMError subclass if the request ultimately fails.
+    """
     messages = []
     if conversation_history:
         messages.extend(conversation_history)
     messages.append({"role": "user", "content": message})
-    payload = {"model": "o1-mini", "messages": messages, "max_completion_tokens": 20000}
-    # print entire prompt/message
-    print(json.dumps(payload, indent=2))
-    try:
-        response = requests.post(url, headers=headers, json=payload, timeout=240)
-        response.raise_for_status()
-        response_data = response.json()
-        raw_response = json.dumps(response_data, indent=2)
-        if "choices" in response_data and len(response_data["choices"]) > 0:
-            content = response_data["choices"][0]["message"]["content"]
-            # token_usage = response_data.get("usage", {})
-            token_usage = 1
-            if conversation_history is not None:
-                conversation_history.append({"role": "assistant", "content": content})
-            # return content, token_usage, raw_response
-            return content, token_usage, raw_response
-        return "Could not extract content from ChatGPT response.", {}, raw_response
-    except requests.exceptions.RequestException as e:
-        error_message = f"API request failed: {str(e)}"
-        if hasattr(e, "response") and e.response is not None:
-            error_message += f"\nResponse: {e.response.text}"
-            raw_error = e.response.text
-        else:
-            raw_error = str(e)
-        return error_message, {}, raw_error
-    except Exception as e:
-        return f"Unexpected error: {str(e)}", {}, str(e)
-
-def query_llm_api(llm_model, message: str, conversation_history: list = None) -> tuple[str, dict, str]:
+    print(f"LLM request: backend={route['backend']} model={route['model']} max_tokens={route['max_tokens']}")
+
+    attempt = 0
+    while True:
+        try:
+            content, token_usage, raw_response = _send_hedged(route, messages, priority)
+            break
+        except LLMError as e:
+            attempt += 1
+            if not e.retryable or attempt >= LLM_RETRY["max_attempts"]:
+                raise
+            delay = backoff_delay(attempt, e.retry_after)
+            print(f"LLM request failed ({e}); retry {attempt} in {delay:.1f}s")
+            time.sleep(delay)
+
+    if conversation_history is not None:
+        conversation_history.append({"role": "assistant", "content": content})
+    return content, token_usage, raw_response
+
+def query_llm_api(llm_model, message: str, conversation_history: list = None, task: str = "default", priority: str = "interactive") -> tuple[str, dict, str]:
     """
-    Dispatches the API call to the selected LLM based on the sidebar model selection.
+    Dispatches the API call to the backend and model routed for `task`.
+    `llm_model` is the display name selected in the UI (see MODEL_OPTIONS).
+    `priority` is "interactive" for editor actions or "batch" for background jobs.
     Returns: (processed_response, token_usage, raw_response)
+    Raises: LLMError (or a subclass) if no usable response was obtained.
+    """
+    route = resolve_task_route(llm_model, task)
+    if route is None:
+        raise LLMRequestError(f"Selected model not supported: {llm_model}")
+    return _query_backend(route, message, conversation_history, priority)
+
+def query_llm_json(llm_model, message: str, result_type, task: str = "default", priority: str = "interactive") -> tuple:
+    """
+    query_llm_api for tasks that answer with a JSON object: parses the response
+    once and validates it against `result_type` (a NamedTuple).
+    Returns: (result, token_usage, raw_response)
+    Raises: LLMResponseError if the response doesn't match the schema.
     """
-    model = llm_model
-    if model == "ChatGPT (o1)":
-        return query_chatgpt_api(message, conversation_history)
-    else:
-        return "Selected model not supported.", {}, ""
+    content, token_usage, raw_response = query_llm_api(llm_model, message, task=task, priority=priority)
+    try:
+        return parse_structured(content, result_type), token_usage, raw_response
+    except StructuredOutputError as e:
+        raise LLMResponseError(f"Invalid {task} response: {str(e)}", raw_response or content)
 
 def generate_meta_content(article_content):
     """Generate meta title and description for an article."""
@@ -79,8 +219,9 @@ Return the response in JSON format:
     "meta_description": "your generated description"
 }}
 """
-    response_text, token_usage, raw_response = query_llm_api(prompt)
-    try: 
-        return response_text, token_usage, raw_response
-    except Exception:
+    try:
+        meta, _, _ = query_llm_json(None, prompt, MetaContent, task="meta")
+        return meta.meta_title, meta.meta_description
+    except LLMError as e:
+        print(f"Meta content generation failed: {str(e)}")
         return "", ""
@@ -0,0 +1,132 @@
+import time
+import hashlib
+import sqlite3
+import threading
+from config.settings import DATABASE_PATH
+from database.connection import connect
+
+
+class ScrapedPageStore:
+    """
+    Extracted text of crawled community web pages, keyed by URL, so prompts can
+    use site content without scraping during the request. Each page keeps its
+    HTTP validators (ETag/Last-Modified) and body/text hashes so refreshes can be
+    conditional; listeners are only notified when a page's text actually changes.
+    """
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or DATABASE_PATH
+        self._lock = threading.Lock()
+        self._conn = None
+        self._listeners = []
+
+    def _get_conn(self):
+        if self._conn is None:
+            self._conn = connect(self.db_path, timeout=10, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS scraped_pages (
+                    url TEXT PRIMARY KEY,
+                    community_id INTEGER,
+                    page_type TEXT,
+                    status TEXT NOT NULL,
+                    text TEXT,
+                    error TEXT,
+                    fetched_at REAL NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    body_hash TEXT,
+                    content_hash TEXT,
+                    changed_at REAL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_scraped_pages_community ON scraped_pages (community_id)"
+            )
+        return self._conn
+
+    def subscribe(self, listener) -> None:
+        """Call `listener(page)` with the page dict whenever a page's stored text changes."""
+        self._listeners.append(listener)
+
+    def get_validators(self, url: str) -> dict:
+        """What a refresh needs to make a conditional request, or {} for an unseen page."""
+        with self._lock:
+            row = self._get_conn().execute(
+                """
+                SELECT etag, last_modified, body_hash, text IS NOT NULL AS has_text
+                FROM scraped_pages WHERE url = ?
+                """,
+                (url,),
+            ).fetchone()
+        return dict(row) if row else {}
+
+    def save(self, url: str, community_id: int, page_type: str, status: str, text: str = None, error: str = None,
+             etag: str = None, last_modified: str = None, body_hash: str = None) -> bool:
+        """
+        Store the outcome of a crawl. A failed refresh keeps the last good text.
+        Returns True when the stored text changed.
+        """
+        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest() if text is not None else None
+        now = time.time()
+        with self._lock:
+            conn = self._get_conn()
+            row = conn.execute("SELECT content_hash FROM scraped_pages WHERE url = ?", (url,)).fetchone()
+            changed = content_hash is not None and (row is None or row["content_hash"] != content_hash)
+            conn.execute(
+                """
+                INSERT INTO scraped_pages (url, community_id, page_type, status, text, error, fetched_at,
+                                           etag, last_modified, body_hash, content_hash, changed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (url) DO UPDATE SET
+                    community_id = excluded.community_id,
+                    page_type = excluded.page_type,
+                    status = excluded.status,
+                    text = COALESCE(excluded.text, scraped_pages.text),
+                    error = excluded.error,
+                    fetched_at = excluded.fetched_at,
+                    etag = COALESCE(excluded.etag, scraped_pages.etag),
+                    last_modified = COALESCE(excluded.last_modified, scraped_pages.last_modified),
+                    body_hash = COALESCE(excluded.body_hash, scraped_pages.body_hash),
+                    content_hash = COALESCE(excluded.content_hash, scraped_pages.content_hash),
+                    changed_at = COALESCE(excluded.changed_at, scraped_pages.changed_at)
+                """,
+                (url, community_id, page_type, status, text, error, now,
+                 etag, last_modified, body_hash, content_hash, now if changed else None),
+            )
+            conn.commit()
+
+        if changed:
+            page = {"url": url, "community_id": community_id, "page_type": page_type, "text": text, "changed_at": now}
+            for listener in self._listeners:
+                try:
+                    listener(page)
+                except Exception as e:
+                    print(f"Page change listener failed for {url}: {str(e)}")
+        return changed
+
+    def mark_unchanged(self, url: str, etag: str = None, last_modified: str = None) -> None:
+        """Record a refresh that found the page as stored (304 or identical body)."""
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute(
+                """
+                UPDATE scraped_pages
+                SET status = 'ok', error = NULL, fetched_at = ?,
+                    etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                WHERE url = ?
+                """,
+                (time.time(), etag, last_modified, url),
+            )
+            conn.commit()
+
+    def get_community_pages(self, community_id: int) -> list:
+        with self._lock:
+            rows = self._get_conn().execute(
+                "SELECT * FROM scraped_pages WHERE community_id = ? ORDER BY page_type", (community_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+page_store = ScrapedPageStore()
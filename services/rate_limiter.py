@@ -0,0 +1,232 @@
+import os
+import time
+import threading
+import heapq
+import itertools
+from contextlib import contextmanager
+from config.settings import DATABASE_PATH
+from database.connection import connect
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+PRIORITIES = {
+    "interactive": PRIORITY_INTERACTIVE,
+    "batch": PRIORITY_BATCH,
+}
+
+
+class RateLimitTimeout(Exception):
+    """Raised when capacity could not be acquired within the allowed wait."""
+
+
+class PrioritySemaphore:
+    """
+    Process-local counting semaphore that wakes waiters in priority order
+    (interactive before batch, FIFO within a lane).
+    """
+    def __init__(self, value: int, batch_reserve: int = 0):
+        self._value = value
+        self._batch_reserve = batch_reserve
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._counter = itertools.count()
+
+    def acquire(self, priority: int = PRIORITY_INTERACTIVE, timeout: float = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            entry = (priority, next(self._counter))
+            heapq.heappush(self._waiters, entry)
+            floor = self._batch_reserve if priority >= PRIORITY_BATCH else 0
+            try:
+                while self._value <= floor or self._waiters[0] != entry:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                self._value -= 1
+                return True
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def release(self) -> None:
+        with self._cond:
+            self._value += 1
+            self._cond.notify_all()
+
+
+class SharedRateLimiter:
+    """
+    Token-bucket limiter for requests/min and tokens/min plus a concurrency cap,
+    shared by every worker process through the local SQLite database.
+
+    Batch callers may not dip into the last `batch_reserve` fraction of any
+    bucket or concurrency slot, which keeps headroom for interactive edits.
+    """
+    def __init__(self, name: str, requests_per_minute: int, tokens_per_minute: int,
+                 max_concurrency: int, batch_reserve: float = 0.2, db_path: str = None):
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self.batch_reserve = batch_reserve
+        self.db_path = db_path or DATABASE_PATH
+        self._local = PrioritySemaphore(max_concurrency, int(max_concurrency * batch_reserve))
+        self._lock = threading.Lock()
+        self._conn = None
+
+    # Database helpers
+    def _get_conn(self):
+        if self._conn is None:
+            self._conn = connect(self.db_path, timeout=10, check_same_thread=False, isolation_level=None)
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                    name TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS rate_limit_leases (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    pid INTEGER NOT NULL,
+                    expires_at REAL NOT NULL
+                );
+                """
+            )
+        return self._conn
+
+    def _take(self, cursor, bucket: str, capacity: float, amount: float, reserve: float, now: float) -> float:
+        """Try to take `amount` from a bucket. Returns 0 on success or the seconds to wait."""
+        if capacity <= 0:
+            return 0.0
+        rate = capacity / 60.0
+        row = cursor.execute(
+            "SELECT tokens, updated_at FROM rate_limit_buckets WHERE name = ?", (bucket,)
+        ).fetchone()
+        tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+        # Never ask for more than the bucket can hold, or we'd wait forever
+        amount = min(amount, capacity * (1 - reserve))
+        if tokens - amount >= capacity * reserve:
+            cursor.execute(
+                "INSERT OR REPLACE INTO rate_limit_buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                (bucket, tokens - amount, now),
+            )
+            return 0.0
+        cursor.execute(
+            "INSERT OR REPLACE INTO rate_limit_buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+            (bucket, tokens, now),
+        )
+        return (amount + capacity * reserve - tokens) / rate
+
+    def _try_acquire(self, estimated_tokens: int, priority: int, lease_ttl: float):
+        """One atomic attempt across processes. Returns (lease_id, wait_seconds)."""
+        reserve = self.batch_reserve if priority >= PRIORITY_BATCH else 0.0
+        now = time.time()
+        with self._lock:
+            conn = self._get_conn()
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                cursor.execute("DELETE FROM rate_limit_leases WHERE expires_at < ?", (now,))
+                active = cursor.execute(
+                    "SELECT COUNT(*) FROM rate_limit_leases WHERE name = ?", (self.name,)
+                ).fetchone()[0]
+                slot_limit = self.max_concurrency - int(self.max_concurrency * reserve)
+                if active >= max(1, slot_limit):
+                    conn.execute("COMMIT")
+                    return None, 0.25
+
+                wait = max(
+                    self._take(cursor, f"{self.name}:requests", self.requests_per_minute, 1, reserve, now),
+                    self._take(cursor, f"{self.name}:tokens", self.tokens_per_minute, estimated_tokens, reserve, now),
+                )
+                if wait > 0:
+                    # Put back anything taken from the other bucket
+                    conn.execute("ROLLBACK")
+                    return None, wait
+
+                cursor.execute(
+                    "INSERT INTO rate_limit_leases (name, pid, expires_at) VALUES (?, ?, ?)",
+                    (self.name, os.getpid(), now + lease_ttl),
+                )
+                lease_id = cursor.lastrowid
+                conn.execute("COMMIT")
+                return lease_id, 0.0
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _release(self, lease_id: int, estimated_tokens: int, actual_tokens: int = None) -> None:
+        with self._lock:
+            conn = self._get_conn()
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                cursor.execute("DELETE FROM rate_limit_leases WHERE id = ?", (lease_id,))
+                if actual_tokens is not None and self.tokens_per_minute > 0:
+                    # Refund (or charge) the difference between the estimate and real usage
+                    cursor.execute(
+                        """
+                        UPDATE rate_limit_buckets
+                        SET tokens = MIN(?, tokens + ?)
+                        WHERE name = ?
+                        """,
+                        (self.tokens_per_minute, estimated_tokens - actual_tokens, f"{self.name}:tokens"),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    @contextmanager
+    def limit(self, estimated_tokens: int, priority: str = "interactive", max_wait: float = 120, lease_ttl: float = 300):
+        """
+        Block until a request of `estimated_tokens` may be sent, then hold a
+        concurrency slot for the duration of the `with` block.
+        Yields a dict; set its "actual_tokens" key to correct the token bucket.
+        """
+        level = PRIORITIES.get(priority, PRIORITY_INTERACTIVE)
+        deadline = time.monotonic() + max_wait
+        if not self._local.acquire(level, timeout=max_wait):
+            raise RateLimitTimeout(f"Timed out waiting for an LLM slot ({self.name})")
+        try:
+            while True:
+                lease_id, wait = self._try_acquire(estimated_tokens, level, lease_ttl)
+                if lease_id is not None:
+                    break
+                if time.monotonic() + wait > deadline:
+                    raise RateLimitTimeout(f"Rate limit wait for {self.name} exceeds {max_wait}s")
+                time.sleep(min(wait, 1.0))
+
+            usage = {"actual_tokens": None}
+            try:
+                yield usage
+            finally:
+                self._release(lease_id, estimated_tokens, usage.get("actual_tokens"))
+        finally:
+            self._local.release()
+
+    def status(self) -> dict:
+        """Current bucket levels and active leases, for the metrics/debug views."""
+        with self._lock:
+            conn = self._get_conn()
+            buckets = {
+                name: round(tokens, 1)
+                for name, tokens in conn.execute(
+                    "SELECT name, tokens FROM rate_limit_buckets WHERE name LIKE ?", (f"{self.name}:%",)
+                )
+            }
+            active = conn.execute(
+                "SELECT COUNT(*) FROM rate_limit_leases WHERE name = ? AND expires_at >= ?",
+                (self.name, time.time()),
+            ).fetchone()[0]
+        return {
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "max_concurrency": self.max_concurrency,
+            "active_requests": active,
+            "buckets": buckets,
+        }
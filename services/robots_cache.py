@@ -0,0 +1,95 @@
+import time
+import threading
+from urllib.parse import urlparse
+from config.settings import DATABASE_PATH, ROBOTS_CACHE_TTL, ROBOTS_ERROR_TTL
+from database.connection import connect
+from utils.robots import RobotsRules
+from utils.single_flight import SingleFlight
+
+
+def robots_origin(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme.lower()}://{parsed.netloc.lower()}"
+
+
+class RobotsCache:
+    """
+    Parsed robots.txt per origin, kept in memory and in the local DB so each host's
+    robots.txt is fetched at most once per TTL across all workers.
+    `fetch(robots_url)` must return (status_code, body), or raise on network errors.
+    """
+    def __init__(self, fetch, db_path: str = None, ttl: int = ROBOTS_CACHE_TTL, error_ttl: int = ROBOTS_ERROR_TTL):
+        self.fetch = fetch
+        self.db_path = db_path or DATABASE_PATH
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self._lock = threading.Lock()
+        self._conn = None
+        self._memory = {}  # origin -> (rules, expires_at)
+        self._flights = SingleFlight()
+
+    def _get_conn(self):
+        if self._conn is None:
+            self._conn = connect(self.db_path, timeout=10, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS robots_cache (
+                    origin TEXT PRIMARY KEY,
+                    status INTEGER,
+                    body TEXT,
+                    fetched_at REAL NOT NULL
+                )
+                """
+            )
+        return self._conn
+
+    def _rules_from(self, status, body):
+        """RFC 9309: 2xx is parsed, 4xx means no restrictions, anything else disallows all."""
+        if status is not None and 200 <= status < 300:
+            return RobotsRules.parse(body or ""), self.ttl
+        if status is not None and 400 <= status < 500:
+            return RobotsRules(), self.ttl
+        return RobotsRules.disallow_all(), self.error_ttl
+
+    def _load(self, origin: str) -> tuple:
+        with self._lock:
+            row = self._get_conn().execute(
+                "SELECT status, body, fetched_at FROM robots_cache WHERE origin = ?", (origin,)
+            ).fetchone()
+        if row is not None:
+            rules, ttl = self._rules_from(row[0], row[1])
+            if time.time() - row[2] < ttl:
+                return rules, row[2] + ttl
+
+        try:
+            status, body = self.fetch(f"{origin}/robots.txt")
+        except Exception as e:
+            print(f"robots.txt fetch failed for {origin}: {str(e)}")
+            status, body = None, None
+        fetched_at = time.time()
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO robots_cache (origin, status, body, fetched_at) VALUES (?, ?, ?, ?)",
+                (origin, status, body, fetched_at),
+            )
+            conn.commit()
+        rules, ttl = self._rules_from(status, body)
+        return rules, fetched_at + ttl
+
+    def rules(self, url: str) -> RobotsRules:
+        origin = robots_origin(url)
+        cached = self._memory.get(origin)
+        if cached is not None and cached[1] > time.time():
+            return cached[0]
+        # Concurrent lookups for one host share a single fetch
+        rules, expires_at = self._flights.do(origin, lambda: self._load(origin))[0]
+        self._memory[origin] = (rules, expires_at)
+        return rules
+
+    def allowed(self, url: str, user_agent: str) -> bool:
+        return self.rules(url).can_fetch(user_agent, url)
+
+    def crawl_delay(self, url: str, user_agent: str):
+        """Crawl-delay (seconds) the host asks of this user agent, or None."""
+        return self.rules(url).crawl_delay(user_agent)
@@ -0,0 +1,116 @@
+import time
+import sqlite3
+import threading
+from config.settings import DATABASE_PATH
+from database.connection import connect
+
+
+class BackgroundScheduler:
+    """
+    Runs periodic jobs in a daemon thread.
+    Each run is claimed through the scheduler_runs table, so when several worker
+    processes run a scheduler only one of them executes a job per interval.
+    """
+    def __init__(self, db_path: str = None, tick: float = 30):
+        self.db_path = db_path or DATABASE_PATH
+        self.tick = tick
+        self._jobs = {}
+        self._thread = None
+        self._stop = threading.Event()
+
+    def add_job(self, name: str, interval: float, fn, run_if=None) -> None:
+        """
+        Register fn() to run every `interval` seconds.
+        `run_if`, if given, is checked before each run (e.g. to wait for a quiet period).
+        """
+        self._jobs[name] = {"interval": interval, "fn": fn, "run_if": run_if}
+
+    def _claim(self, conn, name: str, interval: float) -> bool:
+        """Atomically claim a job run if its interval has elapsed."""
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT last_run FROM scheduler_runs WHERE name = ?", (name,)).fetchone()
+            if row is not None and now - row[0] < interval:
+                conn.execute("COMMIT")
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO scheduler_runs (name, last_run, last_status) VALUES (?, ?, 'running')",
+                (name, now),
+            )
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _record(self, conn, name: str, status: str) -> None:
+        conn.execute("UPDATE scheduler_runs SET last_status = ? WHERE name = ?", (status[:500], name))
+
+    def run_pending(self, conn) -> None:
+        for name, job in list(self._jobs.items()):
+            if self._stop.is_set():
+                return
+            try:
+                if job["run_if"] is not None and not job["run_if"]():
+                    continue
+                if not self._claim(conn, name, job["interval"]):
+                    continue
+                print(f"Scheduler: running {name}")
+                result = job["fn"]()
+                self._record(conn, name, f"ok: {result}" if result is not None else "ok")
+            except Exception as e:
+                print(f"Scheduler: {name} failed: {str(e)}")
+                try:
+                    self._record(conn, name, f"error: {str(e)}")
+                except sqlite3.Error:
+                    pass
+
+    def _loop(self) -> None:
+        conn = connect(self.db_path, timeout=10, isolation_level=None)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scheduler_runs (
+                name TEXT PRIMARY KEY,
+                last_run REAL NOT NULL,
+                last_status TEXT
+            )
+            """
+        )
+        try:
+            while not self._stop.wait(self.tick):
+                self.run_pending(conn)
+        finally:
+            conn.close()
+
+    def start(self) -> None:
+        if self._thread is not None or not self._jobs:
+            return
+        self._thread = threading.Thread(target=self._loop, name="grover-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def status(self) -> list:
+        """Last run time and outcome of every job, for the metrics views."""
+        conn = connect(self.db_path, timeout=10)
+        try:
+            rows = conn.execute("SELECT name, last_run, last_status FROM scheduler_runs").fetchall()
+        except sqlite3.OperationalError:
+            rows = []
+        finally:
+            conn.close()
+        runs = {name: (last_run, last_status) for name, last_run, last_status in rows}
+        return [
+            {
+                "name": name,
+                "interval": job["interval"],
+                "last_run": runs.get(name, (None, None))[0],
+                "last_status": runs.get(name, (None, None))[1],
+            }
+            for name, job in self._jobs.items()
+        ]
+
+
+scheduler = BackgroundScheduler()
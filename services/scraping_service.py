@@ -1,6 +1,117 @@
+import codecs
 import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from config.settings import (
+    CRAWLER_USER_AGENT, CRAWLER_CONCURRENCY, CRAWLER_TIMEOUT, CRAWLER_MAX_BYTES, ROBOTS_MAX_BYTES,
+    CRAWLER_MAX_TEXT_CHARS, CRAWLER_EXTRACT_TIME_LIMIT,
+)
+from services.robots_cache import RobotsCache
+from utils.html_extract import HtmlTextExtractor, extract_main_text
+
+# Pooled, keep-alive session shared by the scraper and the community crawler
+scrape_session = requests.Session()
+scrape_session.headers.update({"User-Agent": CRAWLER_USER_AGENT})
+_adapter = HTTPAdapter(pool_connections=CRAWLER_CONCURRENCY, pool_maxsize=CRAWLER_CONCURRENCY)
+scrape_session.mount("http://", _adapter)
+scrape_session.mount("https://", _adapter)
+
+
+def _fetch_robots(robots_url):
+    """GET robots.txt (redirects followed, body capped) -> (status_code, text)."""
+    with scrape_session.get(robots_url, stream=True, timeout=CRAWLER_TIMEOUT) as response:
+        if response.status_code != 200:
+            return response.status_code, None
+        body = b""
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            body += chunk
+            if len(body) >= ROBOTS_MAX_BYTES:
+                break
+        return response.status_code, body[:ROBOTS_MAX_BYTES].decode("utf-8", errors="replace")
+
+
+robots_cache = RobotsCache(fetch=_fetch_robots)
+
+
+def robots_allows(url):
+    """Check the site's robots.txt (cached per host) before scraping."""
+    return robots_cache.allowed(url, CRAWLER_USER_AGENT)
+
+
+def robots_crawl_delay(url):
+    """Crawl-delay the site's robots.txt asks of us, in seconds, or None."""
+    return robots_cache.crawl_delay(url, CRAWLER_USER_AGENT)
+
+
+def _is_html(response):
+    content_type = response.headers.get("Content-Type", "text/html")
+    return "html" in content_type or "text" in content_type
+
+
+def _iter_body(response, max_bytes):
+    """Yield (chunk, truncated) from a streamed response, stopping at `max_bytes`."""
+    size = 0
+    for chunk in response.iter_content(chunk_size=64 * 1024):
+        if size + len(chunk) >= max_bytes:
+            yield chunk[:max_bytes - size], True
+            return
+        size += len(chunk)
+        yield chunk, False
+
+
+def fetch_page(url, max_bytes=CRAWLER_MAX_BYTES, etag=None, last_modified=None):
+    """
+    GET a page over the pooled session, reading at most `max_bytes` of the body.
+    Pass the stored `etag`/`last_modified` to make the request conditional.
+    Returns (status_code, html, truncated, validators); non-HTML and 304 responses
+    return html=None. `validators` holds the response's etag and last_modified.
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    with scrape_session.get(url, headers=headers, stream=True, timeout=CRAWLER_TIMEOUT) as response:
+        validators = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        if response.status_code != 200 or not _is_html(response):
+            return response.status_code, None, False, validators
+        chunks = []
+        truncated = False
+        for chunk, truncated in _iter_body(response, max_bytes):
+            chunks.append(chunk)
+        body = b"".join(chunks)
+        return response.status_code, body.decode(response.encoding or "utf-8", errors="replace"), truncated, validators
+
+
+def extract_page(html):
+    """Main-content text of a downloaded page, with extraction stats (see HtmlTextExtractor)."""
+    return extract_main_text(html, CRAWLER_MAX_TEXT_CHARS, CRAWLER_EXTRACT_TIME_LIMIT)
+
+
+def stream_page_text(url, max_bytes=CRAWLER_MAX_BYTES):
+    """
+    GET a page and extract its text while it downloads, so neither the raw body
+    nor a DOM is ever held in memory. Returns (status_code, result) where result
+    is the extractor's dict (None for non-200 or non-HTML responses).
+    """
+    with scrape_session.get(url, stream=True, timeout=CRAWLER_TIMEOUT) as response:
+        if response.status_code != 200 or not _is_html(response):
+            return response.status_code, None
+        extractor = HtmlTextExtractor(CRAWLER_MAX_TEXT_CHARS, CRAWLER_EXTRACT_TIME_LIMIT)
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+        truncated = False
+        for chunk, truncated in _iter_body(response, max_bytes):
+            if not extractor.feed(decoder.decode(chunk, final=truncated)):
+                break
+        else:
+            extractor.feed(decoder.decode(b"", final=True))
+        result = extractor.close()
+        result["truncated"] = result["truncated"] or truncated
+        return response.status_code, result
+
 
 def scrape_website(url):
     """Scrape textual content from a single webpage."""
@@ -8,17 +119,13 @@ def scrape_website(url):
         parsed = urlparse(url)
         if not parsed.netloc:
             return "Invalid URL"
-        robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
-        r_robots = requests.get(robots_url, timeout=5)
-        if r_robots.status_code == 200 and "Disallow: /" in r_robots.text:
+        if not robots_allows(url):
             return "Website disallows scraping (robots.txt)."
-        r_page = requests.get(url, timeout=10)
-        if r_page.status_code != 200:
-            return f"Failed to retrieve page (HTTP {r_page.status_code})."
-        soup = BeautifulSoup(r_page.text, "html.parser")
-        for tag in soup(["script", "style"]):
-            tag.decompose()
-        text = " ".join(soup.stripped_strings)
-        return text
+        status_code, result = stream_page_text(url)
+        if status_code != 200:
+            return f"Failed to retrieve page (HTTP {status_code})."
+        if result is None:
+            return "Page is not HTML."
+        return result["text"]
     except Exception as e:
-        return f"Error scraping site: {e}" 
\ No newline at end of file
+        return f"Error scraping site: {e}"
@@ -0,0 +1,110 @@
+import json
+import time
+import hashlib
+import threading
+from config.settings import DATABASE_PATH, SEMRUSH_CACHE_TTL, SEMRUSH_CACHE_STALE_TTL
+from database.connection import connect
+
+
+def normalize_phrase(phrase: str) -> str:
+    return " ".join(phrase.lower().split())
+
+
+def make_cache_key(phrase: str, database: str, lookup_type: str, filters: str = "") -> str:
+    raw = "|".join([normalize_phrase(phrase), database, lookup_type, filters or ""])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class SemrushCache:
+    """
+    Persistent cache of SEMrush research results in the local DB, shared by all projects.
+    """
+    def __init__(self, db_path: str = None, ttl: int = SEMRUSH_CACHE_TTL, stale_ttl: int = SEMRUSH_CACHE_STALE_TTL):
+        self.db_path = db_path or DATABASE_PATH
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._lock = threading.Lock()
+        self._conn = None
+        self._refreshing = set()
+
+    def _get_conn(self):
+        if self._conn is None:
+            self._conn = connect(self.db_path, timeout=10, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS semrush_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    phrase TEXT NOT NULL,
+                    database TEXT NOT NULL,
+                    lookup_type TEXT NOT NULL,
+                    filters TEXT,
+                    response JSON NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+                """
+            )
+        return self._conn
+
+    def get(self, phrase: str, database: str, lookup_type: str, filters: str = ""):
+        """
+        Look up a cached result.
+        Returns (data, state) where state is "fresh", "stale" or "miss".
+        """
+        key = make_cache_key(phrase, database, lookup_type, filters)
+        with self._lock:
+            row = self._get_conn().execute(
+                "SELECT response, fetched_at FROM semrush_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None, "miss"
+        age = time.time() - row[1]
+        if age <= self.ttl:
+            return json.loads(row[0]), "fresh"
+        if age <= self.stale_ttl:
+            return json.loads(row[0]), "stale"
+        return None, "miss"
+
+    def set(self, phrase: str, database: str, lookup_type: str, data: dict, filters: str = "") -> None:
+        key = make_cache_key(phrase, database, lookup_type, filters)
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO semrush_cache
+                (cache_key, phrase, database, lookup_type, filters, response, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, normalize_phrase(phrase), database, lookup_type, filters, json.dumps(data), time.time()),
+            )
+            conn.commit()
+
+    def refresh_in_background(self, phrase: str, database: str, lookup_type: str, fetch, filters: str = "") -> None:
+        """Re-run `fetch()` in a daemon thread and store its result, once per key at a time."""
+        key = make_cache_key(phrase, database, lookup_type, filters)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def _refresh():
+            try:
+                data = fetch()
+                if not data.get("error"):
+                    self.set(phrase, database, lookup_type, data, filters)
+            except Exception as e:
+                print(f"SEMrush cache refresh failed for '{phrase}': {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=_refresh, daemon=True).start()
+
+    def purge_expired(self) -> int:
+        """Delete entries older than the stale TTL. Returns the number removed."""
+        with self._lock:
+            conn = self._get_conn()
+            cursor = conn.execute(
+                "DELETE FROM semrush_cache WHERE fetched_at < ?", (time.time() - self.stale_ttl,)
+            )
+            conn.commit()
+            return cursor.rowcount
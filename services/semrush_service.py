@@ -1,5 +1,33 @@
+import io
 import os
+import csv
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from config.settings import SEMRUSH_TIMEOUT, SEMRUSH_POOL_SIZE, SEMRUSH_RATE_LIMIT, SEMRUSH_REDUCED_DISPLAY_LIMIT
+from services.semrush_cache import SemrushCache
+from services.semrush_usage import semrush_usage, units_for
+from services.rate_limiter import SharedRateLimiter
+
+RESEARCH_EXPORT_COLUMNS = "Ph,Nq,Kd,In"
+RESEARCH_DISPLAY_LIMIT = 30
+RESEARCH_DISPLAY_SORT = "kd_desc"
+RESEARCH_DISPLAY_FILTER = "%2B|Nq|Gt|99|%2B|Nq|Lt|1501|%2B|Kd|Lt|41|%2B|Kd|Gt|9"
+
+semrush_cache = SemrushCache()
+
+# Pooled, keep-alive session shared by all SEMrush calls
+semrush_session = requests.Session()
+semrush_session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=SEMRUSH_POOL_SIZE))
+_semrush_executor = ThreadPoolExecutor(max_workers=SEMRUSH_POOL_SIZE, thread_name_prefix="semrush")
+
+semrush_limiter = SharedRateLimiter(
+    name="semrush",
+    requests_per_minute=SEMRUSH_RATE_LIMIT["requests_per_minute"],
+    tokens_per_minute=0,
+    max_concurrency=SEMRUSH_RATE_LIMIT["max_concurrency"],
+    batch_reserve=SEMRUSH_RATE_LIMIT["batch_reserve"],
+)
 
 def build_semrush_url(api_type, phrase, api_key, database="us", export_columns="", display_limit=None, debug_mode=False):
     """Build the Semrush API URL with the required parameters."""
@@ -19,99 +47,212 @@ def build_semrush_url(api_type, phrase, api_key, database="us", export_columns="
     full_url = f"{base_url}/?{query_str}"
     return full_url
 
+# SEMrush column names (as returned in the CSV header) -> short export codes
+HEADER_CODES = {
+    "Keyword": "Ph",
+    "Search Volume": "Nq",
+    "Keyword Difficulty Index": "Kd",
+    "Keyword Difficulty": "Kd",
+    "Intent": "In",
+}
+
+INTENT_NAMES = {0: "Commercial", 1: "Informational", 2: "Navigational", 3: "Transactional"}
+
+def _to_int(value):
+    value = (value or "").strip()
+    if not value:
+        return 0
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return int(round(float(value)))
+        except ValueError:
+            return 0
+
+def parse_intents(value):
+    """Parse an intent cell such as "0,1" into a list of intent codes."""
+    codes = []
+    for part in (value or "").split(","):
+        part = part.strip()
+        if part.isdigit():
+            codes.append(int(part))
+    return codes
+
+def iter_semrush_rows(lines, debug_mode=False):
+    """
+    Stream typed rows from the semicolon-delimited SEMrush export.
+    `lines` is any iterable of text lines (e.g. response.iter_lines()).
+    Yields dicts with Ph (str), Nq (int), Kd (int) and In (list of intent codes).
+    """
+    reader = csv.reader(lines, delimiter=";", quotechar='"')
+    headers = None
+    for row in reader:
+        if not row:
+            continue
+        if headers is None:
+            if row[0].startswith("ERROR"):
+                # "ERROR 50 :: NOTHING FOUND" means no rows; anything else is a real failure
+                if row[0].startswith("ERROR 50 "):
+                    return
+                raise ValueError(f"SEMrush error: {';'.join(row)}")
+            headers = [HEADER_CODES.get(h.strip(), h.strip()) for h in row]
+            continue
+        if len(row) != len(headers):
+            if debug_mode:
+                print(f"Skipping malformed SEMrush row: {row}")
+            continue
+        item = {}
+        for key, value in zip(headers, row):
+            if key in ("Nq", "Kd"):
+                item[key] = _to_int(value)
+            elif key == "In":
+                item[key] = parse_intents(value)
+            else:
+                item[key] = value.strip()
+        yield item
+
 def parse_semrush_response(response_text, debug_mode=False):
     """Parse the semicolon-delimited response from SEMrush API."""
-    lines = response_text.strip().split("\n")
-    
-    if len(lines) <= 1:
-        return []
-    
-    headers = [h.strip() for h in lines[0].split(";")]
-    result = []
-    for i in range(1, len(lines)):
-        values = lines[i].split(";")
-        if len(values) == len(headers):
-            item = {}
-            for j in range(len(headers)):
-                # Map the header to the shortened format used in the API
-                header_key = headers[j]
-                if header_key == "Keyword":
-                    item["Ph"] = values[j]
-                elif header_key == "Search Volume":
-                    item["Nq"] = values[j]
-                elif header_key == "Keyword Difficulty Index":
-                    item["Kd"] = values[j]
-                elif header_key == "Intent":
-                    item["In"] = values[j].strip()
-                else:
-                    # Keep any other headers as they are
-                    item[header_key] = values[j]
-            result.append(item)
-    
-    return result
+    return list(iter_semrush_rows(io.StringIO(response_text.strip()), debug_mode=debug_mode))
+
+def _fetch_rows(url, debug_mode=False, priority="interactive", api_type="", phrase=None, project_id=None):
+    """
+    GET a SEMrush export over the pooled session and parse it while streaming.
+    The units used are recorded against `project_id`.
+    """
+    with semrush_limiter.limit(0, priority=priority, max_wait=60):
+        with semrush_session.get(url, stream=True, timeout=SEMRUSH_TIMEOUT) as response:
+            if response.status_code != 200:
+                raise ValueError(f"Request error (HTTP {response.status_code}): {response.text}")
+            response.encoding = response.encoding or "utf-8"
+            rows = list(iter_semrush_rows(response.iter_lines(decode_unicode=True), debug_mode=debug_mode))
+    semrush_usage.record(api_type, len(rows), project_id=project_id, phrase=phrase)
+    return rows
+
+def estimate_research_units(lookup_type, display_limit=RESEARCH_DISPLAY_LIMIT):
+    """Worst-case units for one research click: a full related lookup plus the seed overview."""
+    return units_for(lookup_type, display_limit) + units_for("phrase_all", 1)
 
-def query_semrush_api(keyword, database="us", lookup_type="phrase_related", debug_mode=False):
-    """Query SEMrush API using the new related keyword research route."""
+def query_semrush_api(keyword, database="us", lookup_type="phrase_related", debug_mode=False, priority="interactive",
+                      display_limit=RESEARCH_DISPLAY_LIMIT, project_id=None):
+    """
+    Query SEMrush for related keywords and the seed phrase overview.
+    Both calls run concurrently, so latency is that of the slower one.
+    """
     api_key = os.getenv("SEMRUSH_API_KEY", "")
     if not api_key:
         return {"error": "No SEMRUSH_API_KEY found in .env"}
+    phrase = requests.utils.quote(keyword)
+    lookup_url = (
+        f"https://api.semrush.com/?type={lookup_type}"
+        f"&key={api_key}"
+        f"&phrase={phrase}"
+        f"&export_columns={RESEARCH_EXPORT_COLUMNS}"
+        f"&database={database}"
+        f"&display_limit={display_limit}"
+        f"&display_sort={RESEARCH_DISPLAY_SORT}"
+        f"&display_filter={RESEARCH_DISPLAY_FILTER}"
+    )
+    seed_phrase_url = (
+        f"https://api.semrush.com/?type=phrase_all"
+        f"&key={api_key}"
+        f"&phrase={phrase}"
+        f"&export_columns={RESEARCH_EXPORT_COLUMNS}"
+        f"&database={database}"
+    )
     try:
-        # Build the new URL using the correct export columns
-        new_url = (
-            f"https://api.semrush.com/?type={lookup_type}"
-            f"&key={api_key}"
-            f"&phrase={keyword}"
-            f"&export_columns=Ph,Nq,Kd,In"
-            f"&database={database}"
-            f"&display_limit=30"
-            f"&display_sort=kd_desc"
-            f"&display_filter=%2B|Nq|Gt|99|%2B|Nq|Lt|1501|%2B|Kd|Lt|41|%2B|Kd|Gt|9"
+        lookup_future = _semrush_executor.submit(
+            _fetch_rows, lookup_url, debug_mode, priority, lookup_type, keyword, project_id
         )
-        response = requests.get(new_url)
-        if response.status_code != 200:
-            raise ValueError(f"Request error (HTTP {response.status_code}): {response.text}")
-
-        data = parse_semrush_response(response.text, debug_mode=debug_mode)
-
-        if not data:
-            return {"overview": None, "lookup_results": [], "error": "No data returned"}
-
-        results_list = []
-        for item in data:
-            item = {k: v.strip() for k, v in item.items()}
-            results_list.append({
-                "Ph": item.get("Ph", ""),
-                "Nq": item.get("Nq", "0"),
-                "Kd": item.get("Kd", "0"),
-                "In": item.get("In", ""),
-            })
-
-        seed_phrase_url = (
-            f"https://api.semrush.com/?type=phrase_all"
-            f"&key={api_key}"
-            f"&phrase={keyword}"
-            f"&export_columns=Ph,Nq,Kd,In"
-            f"&database={database}"
+        seed_future = _semrush_executor.submit(
+            _fetch_rows, seed_phrase_url, debug_mode, priority, "phrase_all", keyword, project_id
         )
+        results_list = lookup_future.result()
+        seed_phrase_data = seed_future.result()
 
-        seed_phrase_response = requests.get(seed_phrase_url)
-        if seed_phrase_response.status_code != 200:
-            raise ValueError(f"Request error (HTTP {seed_phrase_response.status_code}): {seed_phrase_response.text}")
-
-        seed_phrase_data = parse_semrush_response(seed_phrase_response.text, debug_mode=debug_mode)
+        if not results_list:
+            return {"overview": None, "lookup_results": [], "seed_phrase_results": seed_phrase_data, "error": "No data returned"}
 
         return {"lookup_results": results_list, "seed_phrase_results": seed_phrase_data, "error": None}
     except Exception as e:
         return {"overview": None, "lookup_results": [], "seed_phrase_results": [], "error": str(e)}
-    
-def get_keyword_suggestions(keyword, database="us", lookup_type="phrase_related", debug_mode=False):
-    """Get keyword suggestions from SEMrush."""
-    result = query_semrush_api(keyword, database, lookup_type, debug_mode)
-    if result.get("error"):
-        return result
-    
-    return {
-        "lookup_results": result.get("lookup_results", []),
-        "seed_phrase_results": result.get("seed_phrase_results", []),
-        "error": result.get("error"),
-    }
+
+def query_phrase_these(phrases, database="us", priority="batch", debug_mode=False):
+    """
+    Fetch current metrics for up to 100 phrases in a single phrase_these call.
+    Returns a dict of lower-cased phrase -> typed row.
+    """
+    api_key = os.getenv("SEMRUSH_API_KEY", "")
+    if not api_key:
+        raise ValueError("No SEMRUSH_API_KEY found in .env")
+    if len(phrases) > 100:
+        raise ValueError("phrase_these accepts at most 100 phrases per call")
+    url = (
+        f"https://api.semrush.com/?type=phrase_these"
+        f"&key={api_key}"
+        f"&phrase={requests.utils.quote(';'.join(phrases))}"
+        f"&export_columns={RESEARCH_EXPORT_COLUMNS}"
+        f"&database={database}"
+    )
+    rows = _fetch_rows(url, debug_mode, priority, "phrase_these")
+    return {row["Ph"].lower(): row for row in rows if row.get("Ph")}
+
+def research_filters_signature(display_limit=RESEARCH_DISPLAY_LIMIT):
+    """Identify the query settings a cached result was produced with."""
+    return f"{RESEARCH_EXPORT_COLUMNS}|{display_limit}|{RESEARCH_DISPLAY_SORT}|{RESEARCH_DISPLAY_FILTER}"
+
+def get_keyword_suggestions(keyword, database="us", lookup_type="phrase_related", debug_mode=False, use_cache=True,
+                            priority="interactive", project_id=None):
+    """
+    Get keyword suggestions from SEMrush.
+    Results are cached across projects; stale entries are served immediately
+    and refreshed in the background.
+    As the unit budget runs low, lookups shrink to SEMRUSH_REDUCED_DISPLAY_LIMIT,
+    then only cached results are served.
+    """
+    budget = semrush_usage.budget_level(estimate_research_units(lookup_type))
+    if budget == "cache_only":
+        # A smaller lookup may still fit
+        reduced_units = estimate_research_units(lookup_type, SEMRUSH_REDUCED_DISPLAY_LIMIT)
+        if semrush_usage.budget_level(reduced_units) != "cache_only":
+            budget = "reduced"
+    if budget == "reduced" and priority == "batch":
+        # Keep what is left of the budget for interactive research
+        budget = "cache_only"
+    display_limit = RESEARCH_DISPLAY_LIMIT if budget == "ok" else SEMRUSH_REDUCED_DISPLAY_LIMIT
+
+    def fetch(limit=display_limit):
+        result = query_semrush_api(keyword, database, lookup_type, debug_mode, priority, limit, project_id)
+        if result.get("error"):
+            return result
+        return {
+            "lookup_results": result.get("lookup_results", []),
+            "seed_phrase_results": result.get("seed_phrase_results", []),
+            "error": result.get("error"),
+        }
+
+    if use_cache or budget != "ok":
+        # A full-size result is preferred even when only reduced lookups are allowed
+        for limit in dict.fromkeys([RESEARCH_DISPLAY_LIMIT, display_limit]):
+            filters = research_filters_signature(limit)
+            cached, state = semrush_cache.get(keyword, database, lookup_type, filters)
+            if state == "stale" and budget == "ok":
+                semrush_cache.refresh_in_background(keyword, database, lookup_type, fetch, filters)
+            if cached is not None:
+                cached["cache"] = state
+                cached["budget"] = budget
+                return cached
+
+    if budget == "cache_only":
+        return {
+            "lookup_results": [], "seed_phrase_results": [], "budget": budget,
+            "error": "SEMrush unit budget is nearly used up; only cached research is available",
+        }
+
+    result = fetch()
+    if not result.get("error"):
+        semrush_cache.set(keyword, database, lookup_type, result, research_filters_signature(display_limit))
+        result["cache"] = "miss"
+    result["budget"] = budget
+    return result
@@ -0,0 +1,146 @@
+import threading
+from datetime import datetime, timedelta
+from config.settings import (
+    DATABASE_PATH, SEMRUSH_UNIT_COSTS, SEMRUSH_DEFAULT_UNIT_COST,
+    SEMRUSH_DAILY_UNIT_BUDGET, SEMRUSH_MONTHLY_UNIT_BUDGET,
+    SEMRUSH_BUDGET_REDUCE_AT, SEMRUSH_BUDGET_CACHE_ONLY_AT,
+)
+from database.connection import connect
+
+BUDGET_LEVELS = ("ok", "reduced", "cache_only")
+
+
+def units_for(api_type: str, rows: int) -> int:
+    """SEMrush units charged for a report returning `rows` lines."""
+    return SEMRUSH_UNIT_COSTS.get(api_type, SEMRUSH_DEFAULT_UNIT_COST) * rows
+
+
+class SemrushUsageMeter:
+    """
+    Records the SEMrush API units used by every call (per day and per project)
+    and checks them against the configured daily/monthly budgets.
+    """
+    def __init__(self, db_path: str = None, daily_budget: int = SEMRUSH_DAILY_UNIT_BUDGET,
+                 monthly_budget: int = SEMRUSH_MONTHLY_UNIT_BUDGET):
+        self.db_path = db_path or DATABASE_PATH
+        self.daily_budget = daily_budget
+        self.monthly_budget = monthly_budget
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _get_conn(self):
+        if self._conn is None:
+            self._conn = connect(self.db_path, timeout=10, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS semrush_usage (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    called_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    day TEXT NOT NULL,
+                    api_type TEXT NOT NULL,
+                    phrase TEXT,
+                    project_id INTEGER,
+                    rows INTEGER NOT NULL DEFAULT 0,
+                    units INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_semrush_usage_day ON semrush_usage (day)")
+        return self._conn
+
+    def record(self, api_type: str, rows: int, project_id: int = None, phrase: str = None) -> int:
+        """Record one API call. Returns the units it used."""
+        units = units_for(api_type, rows)
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute(
+                """
+                INSERT INTO semrush_usage (day, api_type, phrase, project_id, rows, units)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (datetime.now().strftime("%Y-%m-%d"), api_type, phrase, project_id, rows, units),
+            )
+            conn.commit()
+        return units
+
+    def totals(self) -> dict:
+        """Units used today and this calendar month."""
+        today = datetime.now().strftime("%Y-%m-%d")
+        with self._lock:
+            day_units, month_units = self._get_conn().execute(
+                """
+                SELECT COALESCE(SUM(CASE WHEN day = ? THEN units END), 0), COALESCE(SUM(units), 0)
+                FROM semrush_usage WHERE day >= ?
+                """,
+                (today, today[:8] + "01"),
+            ).fetchone()
+        return {"day": day_units, "month": month_units}
+
+    def _budgets(self, totals: dict):
+        return [
+            (used, budget)
+            for used, budget in ((totals["day"], self.daily_budget), (totals["month"], self.monthly_budget))
+            if budget > 0
+        ]
+
+    def budget_level(self, estimated_units: int = 0) -> str:
+        """
+        How research should degrade if a call of `estimated_units` were made now:
+        "ok", "reduced" (smaller lookups, no forced refreshes) or "cache_only".
+        """
+        budgets = self._budgets(self.totals())
+        if not budgets:
+            return "ok"
+        fraction = max((used + estimated_units) / budget for used, budget in budgets)
+        if fraction >= SEMRUSH_BUDGET_CACHE_ONLY_AT:
+            return "cache_only"
+        if fraction >= SEMRUSH_BUDGET_REDUCE_AT:
+            return "reduced"
+        return "ok"
+
+    def remaining_units(self, fraction: float = 1.0):
+        """Units left before `fraction` of the tightest budget is used, or None if unlimited."""
+        budgets = self._budgets(self.totals())
+        if not budgets:
+            return None
+        return max(0, int(min(budget * fraction - used for used, budget in budgets)))
+
+    def summary(self, days: int = 30) -> dict:
+        """Usage and budget state for the metrics view."""
+        today = datetime.now()
+        month_start = today.strftime("%Y-%m-01")
+        since = (today - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+        totals = self.totals()
+        with self._lock:
+            conn = self._get_conn()
+            daily = conn.execute(
+                "SELECT day, SUM(units), COUNT(*) FROM semrush_usage WHERE day >= ? GROUP BY day ORDER BY day",
+                (since,),
+            ).fetchall()
+            by_type = conn.execute(
+                """
+                SELECT api_type, SUM(units), COUNT(*) FROM semrush_usage
+                WHERE day >= ? GROUP BY api_type ORDER BY SUM(units) DESC
+                """,
+                (month_start,),
+            ).fetchall()
+            by_project = conn.execute(
+                """
+                SELECT project_id, SUM(units), COUNT(*) FROM semrush_usage
+                WHERE day >= ? GROUP BY project_id ORDER BY SUM(units) DESC
+                """,
+                (month_start,),
+            ).fetchall()
+        return {
+            "today_units": totals["day"],
+            "month_units": totals["month"],
+            "daily_budget": self.daily_budget or None,
+            "monthly_budget": self.monthly_budget or None,
+            "budget_level": self.budget_level(),
+            "daily": [{"day": d, "units": u, "calls": c} for d, u, c in daily],
+            "month_by_type": [{"api_type": t, "units": u, "calls": c} for t, u, c in by_type],
+            "month_by_project": [{"project_id": p, "units": u, "calls": c} for p, u, c in by_project],
+        }
+
+
+semrush_usage = SemrushUsageMeter()
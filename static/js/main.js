@@ -100,6 +100,48 @@ $(document).ready(function () {
         window.location.href = '/articles/select?article_id=' + articleId;
     });
 
+    // Show which project keywords made it into an article
+    window.renderKeywordCoverage = function (target, coverage) {
+        if (!coverage || !coverage.total) {
+            $(target).empty();
+            return;
+        }
+        const level = coverage.missing.length === 0 ? 'success' : 'warning';
+        let html = `<div class="alert alert-${level} mb-0">
+            <strong>Keyword coverage:</strong> ${coverage.covered}/${coverage.total} keywords used (${coverage.word_count} words)`;
+        if (coverage.missing.length > 0) {
+            html += `<br><strong>Missing:</strong> ${coverage.missing.join(', ')}`;
+        }
+        html += '<div class="mt-1">';
+        coverage.keywords.filter(k => k.count > 0).forEach(k => {
+            html += `<span class="badge bg-secondary me-1">${k.keyword}: ${k.count} (${k.density}%)</span>`;
+        });
+        html += '</div></div>';
+        $(target).html(html);
+    };
+
+    window.loadKeywordCoverage = function (type, target) {
+        $.ajax({
+            url: '/articles/keyword_coverage',
+            method: 'POST',
+            data: { type: type },
+            success: function (coverage) {
+                window.renderKeywordCoverage(target, coverage);
+            }
+        });
+    };
+
+    // A save was rejected (HTTP 409) because the article changed elsewhere since this editor loaded it.
+    // Autosave stops for this editor until the latest version is loaded.
+    window.showVersionConflict = function (editor, container, reload) {
+        $(editor).data('conflict', true);
+        $(container).find('.version-conflict-alert').remove();
+        $('<div class="alert alert-warning version-conflict-alert" role="alert">')
+            .append('<strong>Not saved:</strong> this article was changed in another tab or by another user. Copy any edits you want to keep, then ')
+            .append($('<button type="button" class="btn btn-sm btn-warning">Load latest version</button>').on('click', reload))
+            .prependTo(container);
+    };
+
     // Load final article for viewing
     window.loadFinalArticle = function() {
         $.ajax({
@@ -122,7 +164,9 @@ $(document).ready(function () {
                 </div>`;
 
                 $('#final-article-container').html(html);
-                
+                $('#final-article-content').data('version', article.version);
+                window.loadKeywordCoverage('base', '#final-article-coverage');
+
                 // Initialize any necessary event handlers or plugins
                 window.initializeArticleHandlers();
             },
@@ -136,7 +180,7 @@ $(document).ready(function () {
     // Initialize article-related event handlers
     window.initializeArticleHandlers = function() {
         // Save final article
-        $(document).off('click', '#save-final-article-btn').on('click', '#save-final-article-btn', function () {
+        $(document).off('click', '#save-final-article-btn').on('click', '#save-final-article-btn', function (event, isAutosave) {
             const btn = $(this);
             const articleContent = $('#final-article-content').val().trim();
 
@@ -147,6 +191,9 @@ $(document).ready(function () {
                 method: 'POST',
                 data: {
                     article_content: articleContent,
+                    version: $('#final-article-content').data('version'),
+                    // Autosaves are buffered server-side; clicking Save writes immediately
+                    autosave: isAutosave ? 1 : 0,
                 },
                 success: function (response) {
                     btn.prop('disabled', false).text('Save Changes');
@@ -155,6 +202,7 @@ $(document).ready(function () {
                         alert('Error: ' + response.error);
                         return;
                     }
+                    window.renderKeywordCoverage('#final-article-coverage', response.coverage);
 
                     // Show success message
                     $('<div class="alert alert-success alert-dismissible fade show" role="alert">')
@@ -172,6 +220,10 @@ $(document).ready(function () {
                 },
                 error: function (xhr) {
                     btn.prop('disabled', false).text('Save Changes');
+                    if (xhr.status === 409) {
+                        window.showVersionConflict('#final-article-content', '#final-article-container', loadFinalArticle);
+                        return;
+                    }
                     alert('Failed to save article: ' + xhr.responseText);
                 }
             });
@@ -686,7 +738,7 @@ $(document).ready(function () {
         });
 
         // Save community article changes
-        $(document).on('click', '#save-community-article-btn', function () {
+        $(document).on('click', '#save-community-article-btn', function (event, isAutosave) {
             const btn = $(this);
             const articleTitle = $('#community-article-title').val().trim();
             const articleContent = $('#community-article-content').val().trim();
@@ -698,7 +750,9 @@ $(document).ready(function () {
                 method: 'POST',
                 data: {
                     article_title: articleTitle,
-                    article_content: articleContent
+                    article_content: articleContent,
+                    version: $('#community-article-content').data('version'),
+                    autosave: isAutosave ? 1 : 0
                 },
                 success: function (response) {
                     btn.prop('disabled', false).text('Save Changes');
@@ -707,6 +761,8 @@ $(document).ready(function () {
                         alert('Error: ' + response.error);
                         return;
                     }
+                    $('#community-article-content').data('version', response.version);
+                    window.renderKeywordCoverage('#community-article-coverage', response.coverage);
 
                     // Show success message
                     $('<div class="alert alert-success alert-dismissible fade show" role="alert">')
@@ -721,6 +777,12 @@ $(document).ready(function () {
                 },
                 error: function (xhr) {
                     btn.prop('disabled', false).text('Save Changes');
+                    if (xhr.status === 409) {
+                        window.showVersionConflict('#community-article-content', btn.closest('.card-body'), function () {
+                            window.location.reload();
+                        });
+                        return;
+                    }
                     alert('Failed to save community article: ' + xhr.responseText);
                 }
             });
@@ -738,7 +800,10 @@ $(document).ready(function () {
         $(document).on('input', '#community-article-title, #community-article-content', function () {
             clearTimeout(communityAutoSaveTimeout);
             communityAutoSaveTimeout = setTimeout(function () {
-                $('#save-community-article-btn').click();
+                if ($('#community-article-content').data('conflict')) {
+                    return;
+                }
+                $('#save-community-article-btn').trigger('click', [true]);
             }, 3000); // Auto-save after 3 seconds of inactivity
         });
     });
@@ -748,7 +813,10 @@ $(document).ready(function () {
     $(document).on('input', '#final-article-title, #final-article-content, #final-meta-title, #final-meta-desc', function () {
         clearTimeout(autoSaveTimeout);
         autoSaveTimeout = setTimeout(function () {
-            $('#save-final-article-btn').click();
+            if ($('#final-article-content').data('conflict')) {
+                return;
+            }
+            $('#save-final-article-btn').trigger('click', [true]);
         }, 3000); // Auto-save after 3 seconds of inactivity
     });
 
@@ -0,0 +1,56 @@
+from collections import deque
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton: finds every occurrence of many patterns in a single
+    pass over the text, in time linear in the text length plus the number of matches.
+    """
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for index, pattern in enumerate(self.patterns):
+            self._insert(pattern, index)
+        self._build_failure_links()
+
+    def _insert(self, pattern: str, index: int) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = next_state
+        if pattern:
+            self._out[state].append(index)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                if state:
+                    fail = self._fail[state]
+                    while fail and char not in self._goto[fail]:
+                        fail = self._fail[fail]
+                    self._fail[next_state] = self._goto[fail].get(char, 0)
+                # Inherit the matches of the longest proper suffix
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def iter_matches(self, text: str):
+        """Yield (start, end, pattern_index) for every occurrence, overlapping ones included."""
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self.patterns
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in out[state]:
+                end = position + 1
+                yield end - len(patterns[index]), end, index
@@ -0,0 +1,213 @@
+import re
+import time
+from html.parser import HTMLParser
+
+try:
+    from lxml import etree
+except ImportError:  # lxml is in requirements.txt; the stdlib parser is the fallback
+    etree = None
+
+# Never contain readable text
+RAW_TAGS = {"head", "title", "script", "style", "noscript", "template", "svg", "iframe"}
+# Page chrome, skipped unless a <main>/<article> turns up inside
+CHROME_TAGS = {"nav", "footer", "aside", "header"}
+SKIP_TAGS = RAW_TAGS | CHROME_TAGS
+# Never boilerplate, whatever their class says
+ROOT_TAGS = {"html", "body"}
+# A whole id/class token that marks an element as boilerplate ("shared-content" or "modal-open" don't)
+BOILERPLATE_PATTERN = re.compile(
+    r"cookies?(?:-(?:banner|notice|consent))?|consent|gdpr|banner|popup|modal|newsletter|subscribe"
+    r"|breadcrumbs?|share|share-buttons|social|social-(?:share|links)|skip-link|sidebar",
+    re.IGNORECASE,
+)
+HEADING_TAGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+BLOCK_TAGS = {"p", "div", "section", "article", "main", "li", "ul", "ol", "tr", "table", "br", "blockquote", "dd", "dt", "pre"}
+VOID_TAGS = {"br", "hr", "img", "input", "meta", "link", "source", "wbr", "area", "base", "col", "embed", "param", "track"}
+MAIN_TAGS = {"main", "article"}
+# Prefer <main>/<article> text when it holds at least this share of the page text
+MAIN_CONTENT_MIN_SHARE = 0.25
+
+FEED_CHUNK_CHARS = 64 * 1024
+
+
+class _TextCollector:
+    """
+    Parser target: turns start/end/data events into readable text, skipping
+    boilerplate subtrees and keeping headings as markdown-style lines.
+    Output is capped at `max_chars`, so memory stays bounded whatever the page size.
+    """
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.parts = []
+        self.main_parts = []
+        self.size = 0
+        self.skip_tag = None
+        self.skip_depth = 0
+        self.skip_raw = False
+        self.main_depth = 0
+        self.heading = None
+        self.truncated = False
+
+    def _emit(self, text: str) -> None:
+        if self.size >= self.max_chars:
+            self.truncated = True
+            return
+        text = text[: self.max_chars - self.size]
+        self.size += len(text)
+        self.parts.append(text)
+        if self.main_depth:
+            self.main_parts.append(text)
+
+    def start(self, tag, attrs) -> None:
+        tag = tag.lower() if isinstance(tag, str) else ""
+        if self.skip_tag is not None:
+            if tag in MAIN_TAGS and not self.skip_raw:
+                # The "boilerplate" wraps the page's content (e.g. <div class="modal">
+                # around everything): stop skipping it
+                self.skip_tag = None
+            else:
+                if tag == self.skip_tag:
+                    self.skip_depth += 1
+                return
+        if tag in VOID_TAGS:
+            if tag == "br":
+                self._emit("\n")
+            return
+        if tag in SKIP_TAGS:
+            # An article's own header carries its title
+            boilerplate = not (tag == "header" and self.main_depth)
+        elif tag in MAIN_TAGS or tag in ROOT_TAGS:
+            boilerplate = False
+        else:
+            tokens = f"{attrs.get('id', '')} {attrs.get('class', '')}".split()
+            boilerplate = any(BOILERPLATE_PATTERN.fullmatch(token) for token in tokens)
+        if boilerplate:
+            self.skip_tag = tag
+            self.skip_depth = 1
+            self.skip_raw = tag in RAW_TAGS
+            return
+        if tag in MAIN_TAGS:
+            self.main_depth += 1
+        if tag in HEADING_TAGS:
+            self.heading = tag
+            self._emit("\n\n" + "#" * HEADING_TAGS[tag] + " ")
+        elif tag in BLOCK_TAGS:
+            self._emit("\n")
+
+    def end(self, tag) -> None:
+        tag = tag.lower() if isinstance(tag, str) else ""
+        if self.skip_tag is not None:
+            if tag == self.skip_tag:
+                self.skip_depth -= 1
+                if self.skip_depth == 0:
+                    self.skip_tag = None
+            return
+        if tag in VOID_TAGS:
+            return
+        if tag in MAIN_TAGS and self.main_depth:
+            self.main_depth -= 1
+        if tag in HEADING_TAGS and self.heading == tag:
+            self.heading = None
+            self._emit("\n")
+        elif tag in BLOCK_TAGS:
+            self._emit("\n")
+
+    def data(self, data: str) -> None:
+        if self.skip_tag is None and data:
+            self._emit(data)
+
+    def close(self):
+        return None
+
+    def text(self) -> str:
+        all_text = _tidy("".join(self.parts))
+        main_text = _tidy("".join(self.main_parts))
+        if main_text and len(main_text) >= MAIN_CONTENT_MIN_SHARE * len(all_text):
+            return main_text
+        return all_text
+
+
+def _tidy(text: str) -> str:
+    lines = (" ".join(line.split()) for line in text.split("\n"))
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+class _StdlibParser(HTMLParser):
+    def __init__(self, target):
+        super().__init__(convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag, attrs):
+        self.target.start(tag, {k: v or "" for k, v in attrs})
+
+    def handle_startendtag(self, tag, attrs):
+        self.target.start(tag, {k: v or "" for k, v in attrs})
+        self.target.end(tag)
+
+    def handle_endtag(self, tag):
+        self.target.end(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+
+class HtmlTextExtractor:
+    """
+    Incremental HTML -> main-content text. Feed decoded chunks as they arrive;
+    no DOM is built (lxml's C parser drives the callbacks when installed,
+    html.parser otherwise). Parsing stops once `time_limit` seconds have been
+    spent, and the output is capped at `max_chars`.
+    """
+    def __init__(self, max_chars: int, time_limit: float):
+        self.collector = _TextCollector(max_chars)
+        self.time_limit = time_limit
+        self.parser_name = "lxml" if etree is not None else "html.parser"
+        if etree is not None:
+            self._parser = etree.HTMLParser(target=self.collector, recover=True, no_network=True)
+        else:
+            self._parser = _StdlibParser(self.collector)
+        self.chars = 0
+        self.peak_chunk = 0
+        self.elapsed = 0.0
+        self.timed_out = False
+
+    def feed(self, chunk: str) -> bool:
+        """Parse one chunk. Returns False once the time or text budget is spent (stop feeding)."""
+        if self.timed_out:
+            return False
+        started = time.perf_counter()
+        self._parser.feed(chunk)
+        self.elapsed += time.perf_counter() - started
+        self.chars += len(chunk)
+        self.peak_chunk = max(self.peak_chunk, len(chunk))
+        if self.elapsed >= self.time_limit:
+            self.timed_out = True
+        return not (self.timed_out or self.collector.truncated)
+
+    def close(self) -> dict:
+        started = time.perf_counter()
+        try:
+            self._parser.close()
+        except Exception:
+            # lxml raises on documents it could not recover anything from
+            pass
+        text = self.collector.text()
+        self.elapsed += time.perf_counter() - started
+        return {
+            "text": text,
+            "parser": self.parser_name,
+            "chars_parsed": self.chars,
+            "truncated": self.timed_out or self.collector.truncated,
+            "elapsed_ms": round(self.elapsed * 1000, 1),
+            # Extractor-held buffers: the largest input chunk plus the collected text (UCS-4 worst case)
+            "peak_bytes": 4 * (self.peak_chunk + self.collector.size),
+        }
+
+
+def extract_main_text(html: str, max_chars: int, time_limit: float) -> dict:
+    """Run an HtmlTextExtractor over an already-downloaded page."""
+    extractor = HtmlTextExtractor(max_chars, time_limit)
+    for offset in range(0, len(html), FEED_CHUNK_CHARS):
+        if not extractor.feed(html[offset:offset + FEED_CHUNK_CHARS]):
+            break
+    return extractor.close()
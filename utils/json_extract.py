@@ -0,0 +1,111 @@
+import json
+from typing import get_type_hints
+
+# Give up after this many '{' candidates that don't parse (prose with stray braces)
+MAX_CANDIDATES = 5
+
+
+class StructuredOutputError(ValueError):
+    """A model response did not contain a JSON object matching the expected shape."""
+
+
+def _scan_object(text: str, start: int):
+    """
+    Walk one JSON object starting at text[start] == '{', dropping trailing commas
+    as it goes. Returns (cleaned_json, end_index) or (None, None) if unbalanced.
+    """
+    out = []
+    depth = 0
+    in_string = False
+    escaped = False
+    pending_comma = None  # index in `out` of a comma that may turn out to be trailing
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch in " \t\r\n":
+            out.append(ch)
+            continue
+        if ch in "}]":
+            if pending_comma is not None:
+                out[pending_comma] = ""
+            depth -= 1
+        pending_comma = None
+        if ch == ",":
+            pending_comma = len(out)
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            depth += 1
+        out.append(ch)
+        if depth == 0:
+            return "".join(out), i
+    return None, None
+
+
+def extract_json_object(text: str) -> dict:
+    """
+    Parse the first JSON object in a model response, ignoring code fences and any
+    prose around it, and tolerating trailing commas. Raises StructuredOutputError.
+    """
+    if not text:
+        raise StructuredOutputError("Empty response")
+    start = text.find("{")
+    for _ in range(MAX_CANDIDATES):
+        if start == -1:
+            break
+        candidate, end = _scan_object(text, start)
+        if candidate is None:
+            # Unbalanced (a stray '{' in prose): a real object may still follow
+            start = text.find("{", start + 1)
+            continue
+        try:
+            data = json.loads(candidate)
+        except json.JSONDecodeError:
+            start = text.find("{", start + 1)
+            continue
+        if isinstance(data, dict):
+            return data
+        start = text.find("{", end + 1)
+    raise StructuredOutputError("No JSON object found in response")
+
+
+def _coerce(field: str, value, expected):
+    if expected is str:
+        if isinstance(value, list) and all(isinstance(item, str) for item in value):
+            # Outlines and similar text fields sometimes come back as a list of lines
+            return "\n".join(value)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+    if expected is float and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    if not isinstance(value, expected):
+        raise StructuredOutputError(f"Field '{field}' should be {expected.__name__}, got {type(value).__name__}")
+    return value
+
+
+def parse_structured(text: str, result_type):
+    """
+    Extract a JSON object from `text` and validate it against `result_type`, a
+    NamedTuple whose annotated fields are the schema: fields without a default
+    are required and must be non-empty. Returns a `result_type` instance.
+    """
+    data = extract_json_object(text)
+    defaults = result_type._field_defaults
+    values = {}
+    for field, expected in get_type_hints(result_type).items():
+        value = data.get(field)
+        if value is None or value == "":
+            if field in defaults:
+                values[field] = defaults[field]
+                continue
+            raise StructuredOutputError(f"Response missing required field: {field}")
+        values[field] = _coerce(field, value, expected)
+    return result_type(**values)
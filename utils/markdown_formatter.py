@@ -0,0 +1,202 @@
+import re
+
+FENCE_RE = re.compile(r"^\s*(```|~~~)")
+# "#1 reason" isn't a heading, and the "#" in "Learning C#" isn't a closing sequence
+ATX_HEADING_RE = re.compile(r"^(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+SETEXT_H1_RE = re.compile(r"^=+\s*$")
+SETEXT_H2_RE = re.compile(r"^-{2,}\s*$")
+BULLET_RE = re.compile(r"^(\s*)(?:[*+-][ \t]+|[•●▪][ \t]*|–[ \t]+)(?=\S)(.*)$")
+ORDERED_RE = re.compile(r"^(\s*)(\d{1,3})[.)][ \t]+(?=\S)(.*)$")
+HR_RE = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+BOLD_HEADING_RE = re.compile(r"^\*\*([^*]{1,120})\*\*:?$")
+
+# [text] (url) -> [text](url), [ text ]( url ) -> [text](url)
+LINK_SPACING_RE = re.compile(r"\[\s*([^\]\n]+?)\s*\]\s+\(\s*([^)\s]+)\s*\)|\[\s*([^\]\n]+?)\s*\]\(\s*([^)\s]+)\s*\)")
+# (url)[text] -> [text](url)
+REVERSED_LINK_RE = re.compile(r"\((https?://[^)\s]+)\)\[([^\]\n]+)\]")
+
+
+def _fix_links(line):
+    """Normalize inline link syntax on a single line."""
+    line = REVERSED_LINK_RE.sub(lambda m: f"[{m.group(2).strip()}]({m.group(1)})", line)
+
+    def _link(m):
+        text = m.group(1) if m.group(1) is not None else m.group(3)
+        url = m.group(2) if m.group(2) is not None else m.group(4)
+        return f"[{text}]({url})"
+
+    return LINK_SPACING_RE.sub(_link, line)
+
+
+def _strip_wrapping_fence(text):
+    """Remove a ```markdown fence wrapping the whole document."""
+    stripped = text.strip()
+    match = re.match(r"^```(?:markdown|md)?[ \t]*\n(.*)\n```$", stripped, re.DOTALL | re.IGNORECASE)
+    if match and "```" not in match.group(1):
+        return match.group(1)
+    return text
+
+
+def _convert_setext_headings(lines):
+    """Turn `Title` / `=====` style headings into ATX headings."""
+    result = []
+    for line in lines:
+        if result and result[-1].strip() and not result[-1].lstrip().startswith(("#", "-", "*", "+", ">", "|")):
+            if SETEXT_H1_RE.match(line):
+                result[-1] = "# " + result[-1].strip()
+                continue
+            if SETEXT_H2_RE.match(line) and not ORDERED_RE.match(result[-1]):
+                result[-1] = "## " + result[-1].strip()
+                continue
+        result.append(line)
+    return result
+
+
+def format_markdown(content: str) -> str:
+    """
+    Deterministically normalize article markdown.
+    Fixes heading levels and spacing, list markers, link syntax, blank lines
+    and trailing whitespace. Fenced code blocks are left untouched.
+
+    >>> format_markdown("#1 reason seniors move is safety.")
+    '#1 reason seniors move is safety.'
+    >>> format_markdown("## Learning C#")
+    '## Learning C#'
+    >>> format_markdown("* item\\n* item2\\ncontinued")
+    '- item\\n- item2\\n  continued'
+    """
+    if not content:
+        return ""
+
+    text = content.replace("\r\n", "\n").replace("\r", "\n").replace("\t", "    ")
+    text = _strip_wrapping_fence(text)
+
+    # Split into code and prose segments so code blocks pass through as-is
+    segments = []
+    current, in_code = [], False
+    for line in text.split("\n"):
+        if FENCE_RE.match(line):
+            if in_code:
+                current.append(line.rstrip())
+                segments.append(("code", current))
+                current, in_code = [], False
+                continue
+            if current:
+                segments.append(("text", current))
+            current, in_code = [line.rstrip()], True
+            continue
+        current.append(line)
+    if current:
+        segments.append(("code" if in_code else "text", current))
+
+    output = []
+    seen_h1 = False
+    last_level = 0
+    section_level = 0  # level of the last heading that was a heading in the source
+    for kind, lines in segments:
+        if kind == "code":
+            if output and output[-1] != "":
+                output.append("")
+            output.extend(lines)
+            output.append("")
+            continue
+
+        lines = _convert_setext_headings([line.rstrip() for line in lines])
+        prev_list = False
+        for line in lines:
+            stripped = line.strip()
+
+            if not stripped:
+                if output and output[-1] != "":
+                    output.append("")
+                prev_list = False
+                continue
+
+            if HR_RE.match(stripped):
+                if output and output[-1] != "":
+                    output.append("")
+                output.extend(["---", ""])
+                prev_list = False
+                continue
+
+            bold_heading = BOLD_HEADING_RE.match(stripped)
+            promoted = bool(bold_heading and (not output or output[-1] == ""))
+            if promoted:
+                # A lone bold line acting as a section title, one level below the enclosing
+                # real heading, so sibling bold titles get the same level
+                stripped = "#" * max(min(section_level + 1, 3), 2) + " " + bold_heading.group(1).strip()
+
+            heading = ATX_HEADING_RE.match(stripped)
+            if heading and heading.group(2):
+                level = len(heading.group(1))
+                if level == 1:
+                    if seen_h1:
+                        level = 2
+                    seen_h1 = True
+                elif last_level and level > last_level + 1:
+                    # Don't skip levels (e.g. H2 -> H4)
+                    level = last_level + 1
+                last_level = level
+                if not promoted:
+                    section_level = level
+                if output and output[-1] != "":
+                    output.append("")
+                output.extend(["#" * level + " " + _fix_links(heading.group(2)), ""])
+                prev_list = False
+                continue
+
+            bullet = BULLET_RE.match(line)
+            ordered = ORDERED_RE.match(line)
+            if bullet or ordered:
+                if not prev_list and output and output[-1] != "":
+                    output.append("")
+                indent = (bullet or ordered).group(1)
+                indent = " " * (len(indent) // 2 * 2)
+                if bullet:
+                    output.append(f"{indent}- {_fix_links(bullet.group(2).strip())}")
+                    item_indent = indent + "  "
+                else:
+                    output.append(f"{indent}{ordered.group(2)}. {_fix_links(ordered.group(3).strip())}")
+                    item_indent = indent + " " * (len(ordered.group(2)) + 2)
+                prev_list = True
+                continue
+
+            if prev_list and not stripped.startswith((">", "|")):
+                # Continuation of a list item (lazy continuation lines included): keep it in the item
+                output.append(line.rstrip() if line.startswith("  ") else item_indent + _fix_links(stripped))
+                continue
+
+            if prev_list and output and output[-1] != "":
+                output.append("")
+            output.append(_fix_links(line.rstrip() if line.startswith("    ") else stripped))
+            prev_list = False
+
+    # Collapse runs of blank lines and trim the ends
+    result = []
+    for line in output:
+        if line == "" and (not result or result[-1] == ""):
+            continue
+        result.append(line)
+    while result and result[-1] == "":
+        result.pop()
+    return "\n".join(result)
+
+
+def find_format_issues(content: str) -> list:
+    """
+    Return problems the local formatter cannot fix on its own.
+    An empty list means format_markdown's output can be used as-is.
+    """
+    issues = []
+    fences = sum(1 for line in content.split("\n") if FENCE_RE.match(line))
+    if fences % 2:
+        issues.append("Unclosed code fence")
+
+    prose = re.sub(r"```.*?```", "", content, flags=re.DOTALL)
+    if prose.count("[") != prose.count("]"):
+        issues.append("Unbalanced link brackets")
+    if re.search(r"\]\([^)\n]*$", prose, re.MULTILINE):
+        issues.append("Unclosed link URL")
+    if re.search(r"</?(div|span|p|br|h[1-6]|ul|ol|li)\b", prose, re.IGNORECASE):
+        issues.append("Embedded HTML markup")
+    return issues
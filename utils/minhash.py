@@ -0,0 +1,73 @@
+import hashlib
+import struct
+
+_MAX_HASH = (1 << 32) - 1
+
+
+class MinHasher:
+    """
+    MinHash signatures for sets of string shingles.
+    Each shingle is expanded into `num_perm` independent 32-bit hashes with one
+    SHAKE-128 digest, and the signature is the column-wise minimum. The work stays
+    in C (hashlib, struct, zip, min) and signatures are stable across processes.
+    """
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        self.num_perm = num_perm
+        self._salt = struct.pack(">I", seed)
+        self._unpack = struct.Struct(f"<{num_perm}I").unpack
+
+    def _hashes(self, shingle: str) -> tuple:
+        return self._unpack(hashlib.shake_128(self._salt + shingle.encode("utf-8")).digest(4 * self.num_perm))
+
+    def signature(self, shingles) -> tuple:
+        rows = [self._hashes(s) for s in set(shingles)]
+        if not rows:
+            return (_MAX_HASH,) * self.num_perm
+        return tuple(map(min, zip(*rows)))
+
+
+class LSHIndex:
+    """
+    Locality-sensitive hashing over MinHash signatures.
+    Signatures are split into `bands` bands; items sharing any band become candidates.
+    With r rows per band the similarity threshold is roughly (1 / bands) ** (1 / r).
+    """
+    def __init__(self, num_perm: int = 64, bands: int = 16):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets = {}
+
+    def _band_keys(self, signature: tuple):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, signature[start:start + self.rows]
+
+    def add(self, key, signature: tuple) -> None:
+        for band_key in self._band_keys(signature):
+            self._buckets.setdefault(band_key, set()).add(key)
+
+    def candidates(self, signature: tuple) -> set:
+        found = set()
+        for band_key in self._band_keys(signature):
+            found.update(self._buckets.get(band_key, ()))
+        return found
+
+    def remove(self, key, signature: tuple) -> None:
+        for band_key in self._band_keys(signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def buckets(self):
+        """Groups of keys sharing at least one band."""
+        return self._buckets.values()
+
+
+def jaccard(a: set, b: set) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
@@ -0,0 +1,94 @@
+import re
+from urllib.parse import urlparse
+
+
+def _product_token(user_agent: str) -> str:
+    """Product token of a User-Agent string, e.g. GroverBot/1.0 -> groverbot."""
+    return re.split(r"[/\s]", user_agent.strip(), 1)[0].lower()
+
+
+def _compile(pattern: str):
+    """robots.txt path pattern -> regex: '*' matches any run of characters, a trailing '$' anchors the end."""
+    anchored = pattern.endswith("$")
+    if anchored:
+        pattern = pattern[:-1]
+    regex = ".*".join(re.escape(part) for part in pattern.split("*"))
+    return re.compile(regex + ("$" if anchored else ""))
+
+
+class RobotsRules:
+    """
+    Parsed robots.txt following RFC 9309: rules are picked from the group matching
+    the crawler's product token (falling back to "*"), the longest matching path
+    pattern wins, and Allow wins a tie. Crawl-delay is read from the same group.
+    """
+    def __init__(self, groups: dict = None, allow_all: bool = True):
+        # user-agent token -> {"rules": [(allow, pattern, regex)], "crawl_delay": float or None}
+        self.groups = groups or {}
+        self.default_allow = allow_all
+
+    @classmethod
+    def parse(cls, text: str) -> "RobotsRules":
+        groups = {}
+        current_agents = []
+        in_rules = False
+        for raw_line in text.splitlines():
+            line = raw_line.split("#", 1)[0].strip()
+            if ":" not in line:
+                continue
+            field, value = line.split(":", 1)
+            field = field.strip().lower()
+            value = value.strip()
+            if field == "user-agent":
+                if in_rules:
+                    # A user-agent line after rules starts a new group
+                    current_agents = []
+                    in_rules = False
+                agent = value.lower()
+                current_agents.append(agent)
+                groups.setdefault(agent, {"rules": [], "crawl_delay": None})
+            elif field in ("allow", "disallow"):
+                in_rules = True
+                if not value:
+                    # "Disallow:" with no path allows everything
+                    continue
+                rule = (field == "allow", value, _compile(value))
+                for agent in current_agents:
+                    groups[agent]["rules"].append(rule)
+            elif field == "crawl-delay":
+                in_rules = True
+                try:
+                    delay = float(value)
+                except ValueError:
+                    continue
+                for agent in current_agents:
+                    groups[agent]["crawl_delay"] = delay
+        return cls(groups)
+
+    @classmethod
+    def disallow_all(cls) -> "RobotsRules":
+        return cls(allow_all=False)
+
+    def _group(self, user_agent: str):
+        token = _product_token(user_agent)
+        return self.groups.get(token) or self.groups.get("*")
+
+    def can_fetch(self, user_agent: str, url: str) -> bool:
+        if not self.default_allow:
+            return False
+        group = self._group(user_agent)
+        if not group:
+            return True
+        parsed = urlparse(url)
+        path = (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+        best = None
+        for allow, pattern, regex in group["rules"]:
+            if regex.match(path):
+                key = (len(pattern), allow)
+                if best is None or key > best:
+                    best = key
+        return True if best is None else best[1]
+
+    def crawl_delay(self, user_agent: str):
+        group = self._group(user_agent)
+        return group["crawl_delay"] if group else None
@@ -0,0 +1,106 @@
+import zlib
+import struct
+import threading
+import sqlite3
+from collections import Counter
+
+# Compressed values are BLOBs: magic, dictionary id (0 = none), raw deflate stream.
+# Anything else (TEXT, NULL, short values) is stored and returned as-is.
+MAGIC = b"\x00zc"
+HEADER = struct.Struct(">3sI")
+# zlib only looks back 32KB, so a longer preset dictionary is never referenced
+MAX_DICTIONARY_BYTES = 32 * 1024
+MIN_LINE_CHARS = 8
+
+
+def header_for(dictionary_id: int) -> bytes:
+    return HEADER.pack(MAGIC, dictionary_id)
+
+
+def is_compressed(value) -> bool:
+    return isinstance(value, bytes) and value.startswith(MAGIC)
+
+
+def train_dictionary(samples, size: int = MAX_DICTIONARY_BYTES) -> bytes:
+    """
+    Build a zlib preset dictionary from sample documents: the lines that repeat
+    across documents (boilerplate paragraphs, shared headings, copied sections),
+    scored by how many bytes they would save. The best lines go last, where
+    deflate reaches them with the shortest distances.
+    """
+    counts = Counter()
+    for text in samples:
+        for line in set(text.splitlines()):
+            line = line.strip()
+            if len(line) >= MIN_LINE_CHARS:
+                counts[line] += 1
+    scored = sorted(((count - 1) * len(line), line) for line, count in counts.items() if count > 1)
+    chosen = []
+    total = 0
+    for _, line in reversed(scored):
+        encoded = (line + "\n").encode("utf-8")
+        if total + len(encoded) > size:
+            continue
+        chosen.append(encoded)
+        total += len(encoded)
+    return b"".join(reversed(chosen))
+
+
+class TextCodec:
+    """
+    Transparent zlib compression for large text columns. Dictionaries live in the
+    compression_dictionaries table; the newest one is used for new values, and
+    older ones stay loadable so existing rows always decode.
+    """
+    def __init__(self, min_chars: int, level: int = 6):
+        self.min_chars = min_chars
+        self.level = level
+        self._lock = threading.Lock()
+        self._dictionaries = {0: None}
+        self._active_id = None
+
+    def _load(self, conn) -> None:
+        try:
+            rows = conn.execute("SELECT id, dictionary FROM compression_dictionaries").fetchall()
+        except sqlite3.OperationalError:
+            rows = []
+        with self._lock:
+            for dictionary_id, dictionary in rows:
+                self._dictionaries[dictionary_id] = bytes(dictionary)
+            self._active_id = max(self._dictionaries)
+
+    def active_id(self, conn) -> int:
+        if self._active_id is None:
+            self._load(conn)
+        return self._active_id
+
+    def reload(self, conn) -> None:
+        """Pick up a newly trained dictionary."""
+        self._load(conn)
+
+    def encode(self, conn, text):
+        """Value to store for `text`: compressed BLOB if it is long enough, else unchanged."""
+        if not isinstance(text, str) or len(text) < self.min_chars:
+            return text
+        dictionary_id = self.active_id(conn)
+        dictionary = self._dictionaries[dictionary_id]
+        if dictionary:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15, zdict=dictionary)
+        else:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15)
+        data = compressor.compress(text.encode("utf-8")) + compressor.flush()
+        return header_for(dictionary_id) + data
+
+    def decode(self, conn, value):
+        """Stored value -> text. Uncompressed values pass through."""
+        if not is_compressed(value):
+            return value
+        _, dictionary_id = HEADER.unpack_from(value)
+        if dictionary_id not in self._dictionaries:
+            self._load(conn)
+        dictionary = self._dictionaries[dictionary_id]
+        if dictionary:
+            decompressor = zlib.decompressobj(-15, zdict=dictionary)
+        else:
+            decompressor = zlib.decompressobj(-15)
+        return (decompressor.decompress(value[HEADER.size:]) + decompressor.flush()).decode("utf-8")